@@ -64,4 +64,5 @@ else:
 ### Challenge:
 # 1️⃣ Modify the dataframe (add new columns or different data).
 # 2️⃣ Add an input box for users to type names and filter results.
+#    (For big tables, see Step 4 of Week_4_2_streamlit_data_FINAL.py: text_search.py searches as you type without rescanning every row.)
 # 3️⃣ Make a simple chart using st.bar_chart().
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import pandas as pd
 
@@ -43,17 +44,35 @@ st.dataframe(df[df["City"] == city])
 # This teaches students how to work with external data in Streamlit
 # # Ensure the "data" folder exists with the CSV file
 # Display the imported dataset
-df2 = pd.read_csv("data\sample_data.csv")
-st.dataframe(df2) #can use the end half of the computer file path to make it a local file path
+# Optional: query a Parquet copy of the file with DuckDB so only the matching rows are loaded
+use_duckdb = st.toggle("Query with DuckDB (large datasets)", value=False)
+if use_duckdb:
+    import shared_path  # noqa: F401  (duckdb_backend lives in ../shared)
+    from duckdb_backend import ParquetTable, csv_to_parquet
+
+    @st.cache_resource
+    def load_table(path, mtime):
+        return ParquetTable(csv_to_parquet(path))
+
+    table = load_table("data/sample_data.csv", os.path.getmtime("data/sample_data.csv"))
+    st.dataframe(table.query(limit=10_000))
+    min_salary, max_salary = table.min_max("Salary")
+else:
+    df2 = pd.read_csv("data/sample_data.csv")  # (forward slashes work on Windows, macOS and Linux)
+    st.dataframe(df2) #can use the end half of the computer file path to make it a local file path
+    min_salary, max_salary = df2["Salary"].min(), df2["Salary"].max()
 
 # Using a selectbox to allow users to filter data by city
 # Students learn how to use widgets in Streamlit for interactivity
 salary = st.slider("Choose a maximum salary:",
-          min_value = df2["Salary"].min(),
-          max_value = df2["Salary"].max())
+          min_value = min_salary,
+          max_value = max_salary)
 
 st.write(f"Salaries under {salary}:")
-st.dataframe(df2[df2["Salary"] <= salary])
+if use_duckdb:
+    st.dataframe(table.query(filters=[("Salary", "<=", salary)], limit=10_000))
+else:
+    st.dataframe(df2[df2["Salary"] <= salary])
 
 # Filtering the DataFrame based on user selection
 
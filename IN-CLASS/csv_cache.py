@@ -0,0 +1,212 @@
+"""
+Cached CSV ingestion for the in-class data apps.
+
+Instead of calling pd.read_csv on every Streamlit rerun, load_csv():
+  1. Fingerprints the file by its modification time and size.
+  2. Infers a compact schema (integer downcasts + categorical columns) once per file version.
+  3. Reads the CSV in chunks using that schema and appends each chunk to a columnar Parquet cache
+     as it goes, so only one chunk of the file is ever in memory as a DataFrame.
+  4. Loads the table from the Parquet cache, so the next run skips parsing entirely.
+
+Categorical columns are stored as dictionary columns (each chunk with its own dictionary) and come
+back from the cache as one pandas categorical. Integer columns are downcast after loading.
+
+A file is only re-ingested when its mtime or size actually changes.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+try:
+    import pyarrow as pa  # only needed for the on-disk Parquet cache
+    import pyarrow.parquet as pq
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+CACHE_DIR = Path(__file__).parent / ".csv_cache"
+CHUNK_ROWS = 250_000       # rows parsed per chunk for large files
+SCHEMA_SAMPLE_ROWS = 100_000  # rows used to infer the schema
+CATEGORY_MAX_RATIO = 0.5   # text columns with at most this share of unique values become categoricals
+
+
+def file_version(path):
+    """Return the (mtime_ns, size) pair that identifies one version of a file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _path_key(path):
+    return hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:12]
+
+
+def _cache_stem(path, version):
+    # One cache entry per (absolute path, file version):
+    return CACHE_DIR / f"{_path_key(path)}-{version[0]}-{version[1]}"
+
+
+def infer_schema(path, sample_rows=SCHEMA_SAMPLE_ROWS):
+    """
+    Infer a compact schema from the first rows of a CSV.
+
+    Returns a dict with:
+      - "columns": column names in file order
+      - "categorical": text columns that repeat often enough to store as pandas categoricals
+      - "integer": integer columns that can be downcast to the smallest integer type
+      - "dtypes": the pandas dtype name of every column in the sample
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, memory_map=True)
+    categorical = []
+    integer = []
+    for col in sample.columns:
+        series = sample[col]
+        if pd.api.types.is_integer_dtype(series):
+            integer.append(col)
+        elif pd.api.types.is_object_dtype(series) and len(series) > 0:
+            if series.nunique(dropna=True) / len(series) <= CATEGORY_MAX_RATIO:
+                categorical.append(col)
+    return {
+        "columns": list(sample.columns),
+        "categorical": categorical,
+        "integer": integer,
+        "dtypes": {col: str(dtype) for col, dtype in sample.dtypes.items()},
+    }
+
+
+def load_schema(path):
+    """Return the cached schema for the current version of a file, inferring it if needed."""
+    version = file_version(path)
+    schema_path = _cache_stem(path, version).with_suffix(".schema.json")
+    if schema_path.exists():
+        return json.loads(schema_path.read_text())
+
+    schema = infer_schema(path)
+    CACHE_DIR.mkdir(exist_ok=True)
+    schema_path.write_text(json.dumps(schema, indent=2))
+    return schema
+
+
+def _compact(df, schema):
+    # Downcast integer columns one at a time (a column that later turned out to have gaps is float):
+    for col in schema["integer"]:
+        if col in df and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+def _read_chunks(path, schema, chunk_rows, overrides=None):
+    dtype = {col: "category" for col in schema["categorical"]}
+    dtype.update(overrides or {})
+    return pd.read_csv(path, dtype=dtype, chunksize=chunk_rows)
+
+
+def _arrow_schema(chunk, schema):
+    # The Parquet file's columns, from the first chunk: every integer as int64 (later chunks may hold
+    # bigger numbers) and every categorical as a dictionary of strings
+    fields = []
+    for field in pa.Schema.from_pandas(chunk, preserve_index=False):
+        if field.name in schema["categorical"]:
+            field = pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+        elif pa.types.is_integer(field.type):
+            field = pa.field(field.name, pa.int64())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _misfits(chunk, arrow_schema):
+    # dtype overrides for the columns of chunk that don't fit arrow_schema: numbers become floats
+    # (e.g. an integer column with gaps), anything else is read as text
+    overrides = {}
+    for field in arrow_schema:
+        try:
+            pa.array(chunk[field.name], type=field.type, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError, TypeError):
+            numeric = pd.api.types.is_numeric_dtype(chunk[field.name]) and (
+                pa.types.is_integer(field.type) or pa.types.is_floating(field.type))
+            overrides[field.name] = "float64" if numeric else str
+    return overrides
+
+
+def write_parquet_cache(path, schema, cache_path, chunk_rows=CHUNK_ROWS):
+    """
+    Read a CSV in chunks and append each one to a Parquet file as it's read.
+
+    The columns' types come from the first chunk. If a later chunk doesn't fit them (an integer
+    column with gaps, text in a number column), the file is written again with those columns read
+    as floats / text, which is what reading the whole CSV at once would give.
+    """
+    cache_path = Path(cache_path)
+    partial = cache_path.with_suffix(".partial")
+    overrides = {}
+    while True:
+        writer = None
+        misfits = {}
+        try:
+            with _read_chunks(path, schema, chunk_rows, overrides) as chunks:
+                for chunk in chunks:
+                    if writer is None:
+                        writer = pq.ParquetWriter(partial, _arrow_schema(chunk, schema))
+                    try:
+                        table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError, TypeError):
+                        misfits = _misfits(chunk, writer.schema)
+                        if not misfits:
+                            raise
+                        break
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if not misfits:
+            break
+        overrides.update(misfits)
+
+    if writer is None:
+        # (an empty CSV: just the header)
+        pd.DataFrame(columns=schema["columns"]).to_parquet(partial, index=False)
+    os.replace(partial, cache_path)
+
+
+def ingest_csv(path, schema, chunk_rows=CHUNK_ROWS):
+    """Read a CSV in chunks and return one compact DataFrame (used when pyarrow isn't installed)."""
+    chunks = list(_read_chunks(path, schema, chunk_rows))
+    if not chunks:
+        return pd.DataFrame(columns=schema["columns"])
+
+    # Each chunk has its own set of categories; give them all the union, so concat keeps them categorical:
+    for col in schema["categorical"]:
+        categories = pd.api.types.union_categoricals([chunk[col] for chunk in chunks], ignore_order=True).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return _compact(pd.concat(chunks, ignore_index=True), schema)
+
+
+def _load_version(path, version):
+    cache_path = _cache_stem(path, version).with_suffix(".parquet")
+    schema = load_schema(path)
+    if not HAS_PARQUET:
+        return ingest_csv(path, schema)
+
+    if not cache_path.exists():
+        CACHE_DIR.mkdir(exist_ok=True)
+        # Drop cache files left behind by older versions of this same CSV:
+        for old in CACHE_DIR.glob(f"{_path_key(path)}-*"):
+            if not old.name.startswith(cache_path.stem):
+                old.unlink()
+        write_parquet_cache(path, schema, cache_path)
+    return _compact(pd.read_parquet(cache_path), schema)
+
+
+@st.cache_data(show_spinner="Loading data...")
+def _cached_load(path, version):
+    # The version tuple is part of the cache key, so a changed file misses the cache:
+    return _load_version(path, version)
+
+
+def load_csv(path):
+    """Load a CSV through the schema + Parquet cache. Re-ingests only when the file changes."""
+    return _cached_load(str(path), file_version(path))
@@ -0,0 +1,234 @@
+"""
+Search-as-you-type index for free-text name / city search in the data apps.
+
+Filtering with df[df["Name"].str.contains(text)] rescans every string on every keystroke. Instead,
+SearchIndex is built once per dataset version (cache it with st.cache_resource, keyed by the file
+version) and answers each keystroke from precomputed structures:
+
+  - Matching works on the distinct values of the column (names and cities repeat a lot); a CSR-style
+    mapping (rows sorted by value, plus offsets) turns matched values back into row numbers.
+  - Values are normalized once: lower-cased, accents removed ("José" matches "jose").
+  - Prefix matches come from binary search in the sorted values ("new y" -> "New York"), word prefix
+    matches from binary search in the sorted words ("york" -> "New York"). Either way the matches
+    are one slice of a sorted array.
+  - Substring matches come from a trigram index: for each 3-character sequence, the sorted ids of
+    the values containing it. A query's candidates are the intersection of its trigrams' lists, and
+    only those candidates are checked. (Two-letter queries use all the trigrams starting with them.)
+  - Fuzzy matches (typos: "chicgo" -> "Chicago") score values by the share of trigrams they have in
+    common with the query (Dice coefficient). Candidates are the values in the query's rarest trigram
+    lists; the common lists are only binary-searched for the candidates that can still reach the
+    minimum score, so a typo made of common trigrams doesn't mean counting hundreds of thousands of ids.
+
+Results are ranked by kind (exact, prefix, word prefix, substring, fuzzy), then by score, then by
+the number of rows with the value. A kind is only looked for while the better kinds have found
+fewer than `limit` values, and only the best `limit` of each kind are picked (np.argpartition), so a
+one-letter query over millions of names costs about as much as a rare one.
+"""
+import bisect
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+START, END = "\x02", "\x03"  # mark the start / end of a value, so fuzzy matching favors the same beginning and end
+FUZZY_MIN_SCORE = 0.35    # minimum share of trigrams in common for a fuzzy match
+MAX_CANDIDATES = 100_000  # substring candidates checked one by one at most (for very common trigrams)
+FUZZY_CANDIDATES = 50_000  # ids read from the rarest trigram lists to find fuzzy candidates
+
+
+def normalize(text):
+    """Lower-case and strip accents, so searching is case- and accent-insensitive."""
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _trigram_keys(codes):
+    # One int64 key per 3-character window of a code point array (code points fit in 21 bits)
+    codes = codes.astype(np.int64)
+    return codes[:-2] << 42 | codes[1:-1] << 21 | codes[2:]
+
+
+def _codes(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _prefix_range(sorted_texts, prefix):
+    # [first, last) positions of the texts starting with prefix
+    return (bisect.bisect_left(sorted_texts, prefix),
+            bisect.bisect_left(sorted_texts, prefix + "\U0010ffff"))
+
+
+class SearchIndex:
+    """Prefix / substring / fuzzy search over one text column."""
+
+    def __init__(self, values):
+        # Distinct values and, for each row, which distinct value it has:
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        self.values = [str(value) for value in uniques]
+        self.normalized = [normalize(value) for value in self.values]
+        n = len(self.values)
+
+        # Rows grouped by value: the rows with value v are row_order[row_starts[v]:row_starts[v + 1]]
+        valid = codes >= 0
+        self.row_order = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        self.row_counts = np.bincount(codes[valid], minlength=n)
+        self.row_starts = np.r_[0, np.cumsum(self.row_counts)]
+
+        # Sorted values and words (after the first one, which the values already cover), for prefix searches:
+        order = sorted(range(n), key=self.normalized.__getitem__)
+        self.sorted_values = [self.normalized[i] for i in order]
+        self.sorted_value_ids = np.array(order, dtype=np.int64)
+        words, owners = [], []
+        for i, text in enumerate(self.normalized):
+            for word in text.split()[1:]:
+                words.append(word)
+                owners.append(i)
+        order = sorted(range(len(words)), key=words.__getitem__)
+        self.sorted_words = [words[i] for i in order]
+        self.sorted_word_ids = np.array(owners, dtype=np.int64)[order] if words else np.zeros(0, dtype=np.int64)
+
+        # Trigram index over "\x02value\x03" (built with numpy over all values at once):
+        padded = [START + text + END for text in self.normalized]
+        lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=n)
+        self.gram_counts = np.maximum(lengths - 2, 0)  # trigrams per value (with repeats)
+        if n:
+            keys = _trigram_keys(_codes("".join(padded)))
+            owner = np.repeat(np.arange(n), lengths)
+            # (keep the windows that don't cross from one value into the next)
+            inside = owner[:-2] == owner[2:]
+            keys, owner = keys[inside], owner[:-2][inside]
+            order = np.lexsort((owner, keys))
+            keys, owner = keys[order], owner[order]
+            first = np.r_[True, (keys[1:] != keys[:-1]) | (owner[1:] != owner[:-1])]
+            keys, owner = keys[first], owner[first]
+        else:
+            keys = owner = np.zeros(0, dtype=np.int64)
+        self.gram_keys, gram_starts = np.unique(keys, return_index=True)
+        self.gram_starts = np.r_[gram_starts, len(keys)]
+        self.gram_values = owner
+
+    def __len__(self):
+        return len(self.values)
+
+    def _postings(self, key):
+        i = np.searchsorted(self.gram_keys, key)
+        if i == len(self.gram_keys) or self.gram_keys[i] != key:
+            return self.gram_values[:0]
+        return self.gram_values[self.gram_starts[i]:self.gram_starts[i + 1]]
+
+    def search(self, query, limit=20, fuzzy=True):
+        """
+        The best `limit` values matching query, as a DataFrame with columns "value", "match" (exact,
+        prefix, word prefix, substring or fuzzy), "score" (1.0 for exact kinds, the trigram overlap for
+        fuzzy ones), "rows" (number of rows with the value) and "id" (to pass to rows()).
+        """
+        query = normalize(query).strip()
+        picked = []   # (id, match, score), best first
+        taken = set()
+
+        def take(ids, match, scores=None):
+            # Add the best of ids (by score, then rows) that aren't already in a better kind
+            if len(ids) == 0 or len(picked) >= limit:
+                return
+            scores = np.ones(len(ids)) if scores is None else np.round(scores, 3)
+            rank = scores * 1e12 + self.row_counts[ids]
+            need = limit - len(picked)
+            # Partition out the best few, then skip the ones already taken (ids can repeat, e.g. when two
+            # words of a value match); look further only if that left too few
+            size = 2 * (need + len(taken))
+            while True:
+                best = np.argpartition(-rank, size - 1)[:size] if len(ids) > size else np.arange(len(ids))
+                best = sorted(best.tolist(), key=lambda j: (-rank[j], self.values[ids[j]]))
+                fresh = []
+                for j in best:
+                    if int(ids[j]) not in taken:
+                        taken.add(int(ids[j]))
+                        fresh.append(j)
+                    if len(fresh) == need:
+                        break
+                if len(fresh) == need or len(best) == len(ids):
+                    break
+                for j in fresh:
+                    taken.discard(int(ids[j]))
+                size *= 4
+            picked.extend((int(ids[j]), match, float(scores[j])) for j in fresh)
+
+        if query:
+            first, last = _prefix_range(self.sorted_values, query)
+            exact = bisect.bisect_right(self.sorted_values, query, first, last)
+            take(self.sorted_value_ids[first:exact], "exact")
+            take(self.sorted_value_ids[exact:last], "prefix")
+            first, last = _prefix_range(self.sorted_words, query)
+            take(self.sorted_word_ids[first:last], "word prefix")
+            if len(query) >= 2 and len(picked) < limit:
+                take(self._substring(query), "substring")
+            if fuzzy and len(query) >= 3 and len(picked) < limit:
+                ids, scores = self._fuzzy(query)
+                take(ids, "fuzzy", scores)
+
+        ids = np.array([i for i, _, _ in picked], dtype=np.int64)
+        return pd.DataFrame({
+            "value": [self.values[i] for i in ids],
+            "match": [match for _, match, _ in picked],
+            "score": [score for _, _, score in picked],
+            "rows": self.row_counts[ids],
+            "id": ids,
+        })
+
+    def _substring(self, query):
+        # Ids of the values containing query
+        if len(query) == 2:
+            # (the trigrams starting with these two characters are next to each other in gram_keys, and
+            # a value contains the query if it has one of them, since END follows its last character)
+            low = int(_trigram_keys(_codes(query + "\0"))[0])
+            first, last = np.searchsorted(self.gram_keys, [low, low + (1 << 21)])
+            return self.gram_values[self.gram_starts[first]:self.gram_starts[last]]
+        # Intersect the trigram lists (shortest first, each looked up in the next with a binary search);
+        # with more than one trigram, check the candidates
+        lists = sorted((self._postings(key) for key in np.unique(_trigram_keys(_codes(query)))), key=len)
+        candidates = lists[0]
+        for postings in lists[1:]:
+            if len(candidates) == 0:
+                break
+            where = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+            candidates = candidates[postings[where] == candidates]
+        if len(query) == 3:
+            return candidates
+        candidates = candidates[:MAX_CANDIDATES]
+        return candidates[[query in self.normalized[i] for i in candidates.tolist()]]
+
+    def _fuzzy(self, query):
+        # Values sharing enough trigrams with the query: Dice = 2 * shared / (grams in query + grams in value)
+        keys = np.unique(_trigram_keys(_codes(START + query + END)))
+        postings = sorted((self._postings(key) for key in keys), key=len)
+        if not any(len(p) for p in postings):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        # Candidates are the values in the rarest lists (up to FUZZY_CANDIDATES ids). The common lists are
+        # only binary-searched for the candidates (never counted in full), and before each one the
+        # candidates that can't reach FUZZY_MIN_SCORE even with all the lists left are dropped
+        rare = max(int(np.searchsorted(np.cumsum([len(p) for p in postings]), FUZZY_CANDIDATES, side="right")), 1)
+        candidates, shared = np.unique(np.concatenate(postings[:rare]), return_counts=True)
+        needed = FUZZY_MIN_SCORE * (len(keys) + self.gram_counts[candidates]) / 2
+        for left, p in zip(range(len(postings) - rare, 0, -1), postings[rare:]):
+            possible = shared + left >= needed
+            candidates, shared, needed = candidates[possible], shared[possible], needed[possible]
+            if len(candidates) == 0:
+                break
+            where = np.minimum(np.searchsorted(p, candidates), len(p) - 1)
+            shared += p[where] == candidates
+        scores = 2 * shared / (len(keys) + self.gram_counts[candidates])
+        keep = scores >= FUZZY_MIN_SCORE
+        return candidates[keep], scores[keep]
+
+    def rows(self, ids, limit=None):
+        """Row numbers (positions in the original column) of the rows with these value ids, in that order (at most limit)."""
+        found, count = [], 0
+        for i in ids:
+            found.append(self.row_order[self.row_starts[i]:self.row_starts[i + 1]])
+            count += len(found[-1])
+            if limit is not None and count >= limit:
+                break
+        return np.concatenate(found)[:limit] if found else np.zeros(0, dtype=np.int64)
@@ -1,10 +1,61 @@
-import streamlit as st
-import spacy
-import spacy.cli 
-nlp = spacy.load("en_core_web_sm")
-
-from spacy.pipeline import EntityRuler
+import hashlib
 
+import streamlit as st
+from model_registry import BUDGET_MB, DEFAULT_MODEL, ModelRegistry, installed_models
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
+from text_stream import (MAX_UPLOAD_MB, PREVIEW_MAX_CHARS, SNIFF_BYTES, detect_encoding, file_size,
+                         iter_pieces, iter_text, read_preview)
+prof = start_page("NER App")
+prof.lap("inputs")
+
+# spaCy (and the models) are only imported/loaded the first time there is text to annotate,
+# so the page paints without waiting on them. Loaded models are shared by every session and
+# the least recently used ones are dropped when they outgrow the memory budget (see model_registry.py).
+@st.cache_resource
+def model_registry():
+    return ModelRegistry(budget_mb=BUDGET_MB)
+
+def load_model(name):
+    prof.lap("model load")
+    if not model_registry().is_loaded(name):
+        with st.spinner(f"Loading the spaCy model {name}..."):
+            model_registry().load(name)
+
+# Co-occurrence across the documents annotated in this session. The text box is one document (its
+# entities are replaced whenever the text, model or rules change) and every large file is another,
+# added once it has been annotated to the end. The counts are rebuilt from the entity tables when a
+# document changes, one unit (sentence / document) at a time, the first time that unit is shown.
+def session_corpus():
+    if "corpus" not in st.session_state:
+        st.session_state["corpus"] = {"documents": {}, "counts": {}}
+    return st.session_state["corpus"]
+
+def set_corpus_document(slot, key, entities):
+    # slot: "text" or ("file", file id); key: what the entities were made from (text / file, model, rules)
+    corpus = session_corpus()
+    if corpus["documents"].get(slot, {}).get("key") != key:
+        corpus["documents"][slot] = {"key": key, "entities": entities}
+        corpus["counts"] = {}
+
+def corpus_counts(unit):
+    corpus = session_corpus()
+    if unit not in corpus["counts"]:
+        from cooccurrence import Cooccurrence
+        counts = Cooccurrence(unit=unit)
+        for doc_id, document in enumerate(corpus["documents"].values()):
+            counts.add(document["entities"], doc_id)
+        corpus["counts"][unit] = counts
+    return corpus["counts"][unit]
+
+# Load this session's custom rules into the EntityRuler (call inside model_registry().use()):
+def configure_ruler(nlp, patterns):
+    from entity_table import RULER_ID
+    ruler = nlp.get_pipe("entity_ruler")
+    ruler.clear()
+    if patterns:
+        # (tagged with an id so the entity table can tell rule matches from model predictions)
+        ruler.add_patterns([{**rule, "id": RULER_ID} for rule in patterns])
 
 sample_texts = {
     "Party Invitation": "Lads, it's that time again. We're throwing down SATURDAY in the Keenan Courtyard. Theme: Shrek Rave. Come in green, bring a freind, leave with a memory (or at least a photo on someone's finsta). Fr. Dowd will be there, as well as former president Barack Obama, and rumor has it Breen-Phillips is making swamp punch. First 50 get free glow-in-the-dark rosaries. Be there or be excommunicated.",
@@ -31,6 +82,17 @@ st.markdown(
 )
 
 
+# Any installed spaCy pipeline can be used (larger or domain models included):
+models = installed_models() or [DEFAULT_MODEL]
+model_name = st.selectbox("🧠 spaCy model:", models, index=models.index(DEFAULT_MODEL) if DEFAULT_MODEL in models else 0)
+with st.expander("🗄️ Loaded models"):
+    registry = model_registry()
+    st.caption(f"Models are loaded the first time they're used and shared by everyone using the app. "
+               f"When they add up to more than {registry.budget_mb:,.0f} MB, the least recently used are unloaded "
+               f"({registry.evictions} so far).")
+    if registry.stats():
+        st.dataframe(registry.stats(), hide_index=True)
+
 st.subheader("Choose a sample text, upload a file, or type your own text below:")
 selected_sample = st.selectbox(
     "🗂️ Choose a sample (optional):",
@@ -40,16 +102,32 @@ selected_sample = st.selectbox(
 uploaded_file = st.file_uploader("📤 Or upload a .txt file:", type=["txt"])
 
 user_text = ""
+large_file = None  # uploads too big for the text area are annotated straight from the file, in pieces
 
 if uploaded_file is not None:
-    text = uploaded_file.read().decode("utf-8")
-    st.success("File is uploaded successfully!")
+    # Read in blocks with the detected encoding, instead of decoding the whole file at once:
+    size = file_size(uploaded_file)
+    uploaded_file.seek(0)
+    encoding = detect_encoding(uploaded_file.read(SNIFF_BYTES))
+    if size > MAX_UPLOAD_MB * 1024 * 1024:
+        st.error(f"That file is {size / 1024 / 1024:,.1f} MB; the limit is {MAX_UPLOAD_MB:g} MB.")
+        text = ""
+    else:
+        text, truncated = read_preview(uploaded_file, PREVIEW_MAX_CHARS, encoding)
+        if truncated:
+            large_file = uploaded_file
+            st.success(f"File is uploaded successfully! ({size / 1024 / 1024:,.1f} MB, {encoding})")
+            st.info(f"This file is too big to edit here, so the box below previews its first {PREVIEW_MAX_CHARS:,} characters. "
+                    "The whole file will be annotated.")
+        else:
+            st.success("File is uploaded successfully!")
 elif selected_sample in sample_texts:
     text = sample_texts[selected_sample]
 else:
     text = ""
 
-user_text = st.text_area("🖊️ Enter, view, and edit your text below:", value=text, height=200)
+user_text = st.text_area("🖊️ Enter, view, and edit your text below:", value=text, height=200,
+                         disabled=large_file is not None)
 #################
 ##################
 if "custom_patterns" not in st.session_state:
@@ -75,29 +153,6 @@ if add_rule:
 # Toggle to include/exclude spaCy's default NER
 show_all_entities = st.checkbox("👁️ Check to Show ALL named entities (default + custom)!", value=True)
 
-# Add EntityRuler and (optionally) remove default NER
-if "entity_ruler" not in nlp.pipe_names:
-    ruler = nlp.add_pipe("entity_ruler", before="ner" if "ner" in nlp.pipe_names else None)
-else:
-    ruler = nlp.get_pipe("entity_ruler")
-
-# Optional: remove spaCy's default NER if toggle is off
-if not show_all_entities and "ner" in nlp.pipe_names:
-    nlp.remove_pipe("ner")
-
-# Add custom patterns
-if st.session_state.custom_patterns:
-    ruler.add_patterns(st.session_state.custom_patterns)
-
-# Add EntityRuler to the pipeline
-if "entity_ruler" not in nlp.pipe_names:
-    ruler = nlp.add_pipe("entity_ruler", before="ner")
-else:
-    ruler = nlp.get_pipe("entity_ruler")
-
-# Add all stored custom patterns to the ruler
-if st.session_state.custom_patterns:
-    ruler.add_patterns(st.session_state.custom_patterns)
 if st.button("Reset All Custom Rules"):
     st.session_state.custom_patterns = []
     st.success("All custom rules have been cleared.")
@@ -110,20 +165,83 @@ if st.session_state.custom_patterns:
 
 
 # --- Display Results ---
-from spacy import displacy
-import streamlit.components.v1 as components
-
-doc = nlp(user_text)
-if not doc.ents:
+doc = None
+entities = None  # Arrow entity table (see entity_table.py): the entity list, charts and exports all use it
+settings = (model_name, show_all_entities, str(st.session_state.custom_patterns))
+if large_file is not None:
+    from entity_table import doc_entities, entity_table, sentence_count
+    # Annotate the whole file piece by piece; results are kept for this file + rules so reruns don't re-parse it:
+    run_key = (large_file.file_id, encoding, *settings)
+    if st.session_state.get("large_file_run", {}).get("key") != run_key:
+        load_model(model_name)
+        prof.lap("nlp parse")
+        progress = st.progress(0.0, text="Annotating the file...")
+        batches, first_doc, token_offset, sent_offset = [], None, 0, 0
+        with model_registry().use(model_name) as nlp:
+            configure_ruler(nlp, st.session_state.custom_patterns)
+            disabled = [] if show_all_entities or "ner" not in nlp.pipe_names else ["ner"]
+            with nlp.select_pipes(disable=disabled):
+                pieces = ((piece, offset) for offset, piece in iter_pieces(iter_text(large_file, encoding)))
+                for piece_doc, offset in nlp.pipe(pieces, as_tuples=True, batch_size=4):
+                    if first_doc is None:
+                        first_doc = piece_doc
+                    batches.append(doc_entities(piece_doc, char_offset=offset, token_offset=token_offset,
+                                                sent_offset=sent_offset))
+                    token_offset += len(piece_doc)
+                    sent_offset += sentence_count(piece_doc)
+                    progress.progress(min(large_file.tell() / max(size, 1), 1.0),
+                                      text=f"Annotating the file... {sum(b.num_rows for b in batches):,} entities so far")
+        progress.empty()
+        st.session_state["large_file_run"] = {"key": run_key, "entities": entity_table(batches), "first_doc": first_doc}
+    doc = st.session_state["large_file_run"]["first_doc"]
+    entities = st.session_state["large_file_run"]["entities"]
+    # (only a finished run gets here: a rerun in the middle of the file starts it over)
+    set_corpus_document(("file", large_file.file_id), run_key, entities)
+elif user_text:
+    from entity_table import doc_entities, entity_table
+    load_model(model_name)
+    prof.lap("nlp parse")
+    with model_registry().use(model_name) as nlp:
+        configure_ruler(nlp, st.session_state.custom_patterns)
+
+        # Optional: skip spaCy's default NER if the toggle is off
+        disabled = [] if show_all_entities or "ner" not in nlp.pipe_names else ["ner"]
+        with nlp.select_pipes(disable=disabled):
+            doc = nlp(user_text)
+    entities = entity_table([doc_entities(doc)])
+    set_corpus_document("text", (hashlib.sha1(user_text.encode("utf-8")).hexdigest(), *settings), entities)
+
+prof.lap("entity table + displacy")
+if doc is not None and entities.num_rows == 0:
     st.write("No named entities found.")
-else:
+elif doc is not None:
+    from spacy import displacy
+    import streamlit.components.v1 as components
+    from entity_table import display_table, export_bytes
+
     st.subheader("🔍 Recognized Entities:")
-    ent_data = [{"Text": ent.text, "Label": ent.label_} for ent in doc.ents]
-    st.dataframe(ent_data)
+    st.dataframe(display_table(entities))
+
+    # Download every entity with its offsets, for use outside the app:
+    with st.expander("💾 Export Entities"):
+        export_format = st.radio("Format", ["Parquet", "JSONL"], horizontal=True)
+        if large_file is not None:
+            # (kept with the run, so a big table isn't re-serialized on every rerun)
+            exports = st.session_state["large_file_run"].setdefault("exports", {})
+            if export_format not in exports:
+                exports[export_format] = export_bytes(entities, export_format.lower())
+            export_data = exports[export_format]
+        else:
+            export_data = export_bytes(entities, export_format.lower())
+        st.download_button(f"Download {entities.num_rows:,} entities", data=export_data,
+                           file_name=f"entities.{export_format.lower()}",
+                           mime="application/octet-stream" if export_format == "Parquet" else "application/jsonl")
 
     st.subheader("👀 Visual Highlighting 👀:")
     
     st.subheader("📄 Full Text with Highlighted Entities:")
+    if large_file is not None:
+        st.caption("Highlighting shows the first part of the file.")
 
     # Get raw displacy HTML
     html = displacy.render(doc, style="ent", jupyter=False)
@@ -135,20 +253,14 @@ else:
     )
     components.html(custom_html, height=500, scrolling=True)
 
-import matplotlib.pyplot as plt
-import pandas as pd
-
 # Only show chart if user has entered text
-if user_text:
-    doc = nlp(user_text)
-    label_frequency = {}
-
-    for ent in doc.ents:
-        label_frequency[ent.label_] = label_frequency.get(ent.label_, 0) + 1
+prof.lap("charts")
+if doc is not None:
+    if entities.num_rows:
+        import matplotlib.pyplot as plt
+        from entity_table import label_counts
 
-    if label_frequency:
-        df = pd.DataFrame(label_frequency.items(), columns=["Entity Type", "Frequency"])
-        df = df.sort_values("Frequency", ascending=False)
+        df = label_counts(entities)
 
         # ND colors
         nd_colors = ["#0C2340", "#007A33", "#F3C613", "#004225", "#FFD100"]
@@ -185,3 +297,46 @@ if user_text:
         st.info("No entities found to chart yet!")
 else:
     st.info("👀 Enter some text above to see entity frequency results!")
+
+# --- Entity Co-occurrence ---
+prof.lap("co-occurrence")
+corpus = session_corpus()
+if corpus["documents"]:
+    n_documents = len(corpus["documents"])
+    st.subheader("🕸️ Entity Co-occurrence")
+    st.write(f"Which entities show up together across the {n_documents:,} document{'s' if n_documents > 1 else ''} you've annotated "
+             "this session? The text box counts as one document (edit it and its counts are replaced), and every large "
+             "file you annotate is added as another. Pairs are counted within each sentence (or document), and **PMI** "
+             "(pointwise mutual information) shows how much more often two entities appear together than chance would predict.")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        unit = st.radio("Count pairs within each", ["sentence", "document"], horizontal=True)
+    with col2:
+        min_count = st.number_input("Minimum co-occurrences", min_value=1, value=1)
+    with col3:
+        max_edges = st.slider("Connections shown in the network", 5, 200, 50)
+    if unit == "document" and n_documents == 1:
+        st.info("Only one document so far, so every entity pairs with every other and PMI is 0. "
+                "Annotate large files to compare across documents.")
+
+    pairs = corpus_counts(unit)
+    summary = pairs.summary()
+    st.caption(f"{summary['entities']:,} distinct entities, {summary['pairs']:,} co-occurring pairs in {summary['units']:,} {unit}s"
+               + (f" ({summary['skipped_units']:,} {unit}s with too many entities to pair up were left out)" if summary["skipped_units"] else ""))
+
+    tab1, tab2 = st.tabs(["🔗 Top Pairs", "🕸️ Network"])
+    with tab1:
+        rank_by = st.radio("Rank pairs by", ["Co-occurrences", "PMI"], horizontal=True)
+        st.dataframe(pairs.top_pairs(25, min_count, by="count" if rank_by == "Co-occurrences" else "pmi"),
+                     hide_index=True, use_container_width=True)
+    with tab2:
+        if summary["pairs"]:
+            st.graphviz_chart(pairs.graph(max_edges, min_count))
+        else:
+            st.info("No entities appear together yet!")
+    if st.button("🧹 Clear Co-occurrence Counts"):
+        del st.session_state["corpus"]
+        st.rerun()
+
+prof.finish()
+
@@ -0,0 +1,123 @@
+"""
+Headless batch annotation: run the NER app's pipeline over many .txt files without Streamlit.
+
+The model (and gazetteer) is loaded once in this process, frozen out of the garbage collector's
+reach, and then worker processes are forked that share it copy-on-write (see prefork.py), so adding
+workers adds almost no model memory. Each file is streamed and decoded like an upload in the app
+(text_stream.py), annotated piece by piece, and its entities are written as one Parquet or JSONL
+file with the entity_table.py columns (doc_id is the file's position in the input list).
+
+Usage (Linux/macOS, from this folder):
+
+    python batch_ner.py texts/*.txt --out entities --workers 4
+    python batch_ner.py book.txt --out entities --format jsonl --gazetteer gazetteer.jsonl
+
+At the end, each worker's memory is reported: RSS counts shared pages in full for every process,
+PSS splits them between the processes sharing them, so the PSS total is what the run really used.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+from entity_table import doc_entities, entity_table, sentence_count, write_jsonl, write_parquet
+from model_registry import DEFAULT_MODEL, PRELOADED, freeze_preloaded, load_gazetteer, preload
+from text_stream import SNIFF_BYTES, detect_encoding, iter_pieces, iter_text
+
+
+def memory_usage():
+    """This process's RSS, PSS and private memory in MB (Linux only; {} elsewhere)."""
+    fields = {"Rss": "rss_mb", "Pss": "pss_mb", "Private_Clean": "private_mb", "Private_Dirty": "private_mb"}
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            for line in rollup:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    usage[fields[name]] = usage.get(fields[name], 0) + int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return usage
+
+
+def annotate_file(job):
+    """Annotate one file with the preloaded pipeline and write its entities; returns a summary dict."""
+    doc_id, path, model, out_dir, fmt = job
+    nlp = PRELOADED[model][0]
+    start = time.perf_counter()
+    batches, characters, token_offset, sent_offset = [], 0, 0, 0
+    # (the app's custom-rule ruler is always empty in batch runs, so it's skipped)
+    with open(path, "rb") as text_file, nlp.select_pipes(disable=["entity_ruler"]):
+        encoding = detect_encoding(text_file.read(SNIFF_BYTES))
+        pieces = ((piece, offset) for offset, piece in iter_pieces(iter_text(text_file, encoding)))
+        for doc, offset in nlp.pipe(pieces, as_tuples=True, batch_size=4):
+            batches.append(doc_entities(doc, doc_id=doc_id, char_offset=offset, token_offset=token_offset,
+                                        sent_offset=sent_offset))
+            characters = offset + len(doc.text)
+            token_offset += len(doc)
+            sent_offset += sentence_count(doc)
+    table = entity_table(batches)
+
+    out_path = Path(out_dir) / f"{Path(path).stem}.entities.{fmt}"
+    if fmt == "parquet":
+        write_parquet(table, out_path)
+    else:
+        with open(out_path, "w", encoding="utf-8") as sink:
+            write_jsonl(table, sink)
+    return {"file": str(path), "output": str(out_path), "encoding": encoding, "characters": characters,
+            "tokens": token_offset, "entities": table.num_rows, "seconds": time.perf_counter() - start,
+            "worker": os.getpid(), **memory_usage()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", type=Path, help=".txt files to annotate")
+    parser.add_argument("--out", type=Path, required=True, help="folder for the entity files")
+    parser.add_argument("--format", choices=["parquet", "jsonl"], default="parquet")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="spaCy pipeline (or blank:<lang>)")
+    parser.add_argument("--gazetteer", default=os.environ.get("NER_GAZETTEER"), help="JSONL file of EntityRuler patterns")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    preload([args.model], load_gazetteer(args.gazetteer))
+    print(f"Loaded {args.model} ({PRELOADED[args.model][1]:,.0f} MB) in {time.perf_counter() - start:.1f} s", flush=True)
+
+    jobs = [(doc_id, path, args.model, args.out, args.format) for doc_id, path in enumerate(args.files)]
+    workers = min(args.workers, len(jobs))
+    start = time.perf_counter()
+    if workers > 1:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            sys.exit("More than one worker needs the fork start method (Linux or macOS); use --workers 1.")
+        freeze_preloaded()
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            results = list(_report(pool.imap_unordered(annotate_file, jobs)))
+    else:
+        results = list(_report(map(annotate_file, jobs)))
+    elapsed = time.perf_counter() - start
+
+    tokens = sum(r["tokens"] for r in results)
+    print(f"{len(results)} files, {tokens:,} tokens, {sum(r['entities'] for r in results):,} entities "
+          f"in {elapsed:.1f} s ({tokens / elapsed:,.0f} tokens/s with {workers} worker(s))")
+    by_worker = {}
+    for r in results:
+        by_worker[r["worker"]] = r  # (each worker's most recent report)
+    if by_worker and "pss_mb" in next(iter(by_worker.values())):
+        print(f"Worker memory: RSS {sum(r['rss_mb'] for r in by_worker.values()):,.0f} MB in total, "
+              f"PSS {sum(r['pss_mb'] for r in by_worker.values()):,.0f} MB "
+              f"(private {sum(r['private_mb'] for r in by_worker.values()):,.0f} MB)")
+    return 0
+
+
+def _report(results):
+    for result in results:
+        print(f"  {result['file']}: {result['entities']:,} entities, {result['tokens']:,} tokens "
+              f"in {result['seconds']:.1f} s -> {result['output']}", flush=True)
+        yield result
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Corpus-level entity co-occurrence for the NER app, kept as a sparse matrix.
+
+Two entities co-occur when they appear in the same unit: a sentence (default) or a whole document.
+Entities are keyed by (text, label), so "Jordan" the PERSON and "Jordan" the GPE are different.
+
+    counts = Cooccurrence(unit="sentence")
+    for doc_id, entities in enumerate(documents):   # entity tables from entity_table.py, as documents
+        counts.add(entities, doc_id=doc_id)         # (or pieces of one) are annotated
+    counts.top_pairs(20)                            # DataFrame with counts and PMI
+    counts.graph(max_edges=100)                     # pruned network as a Graphviz DOT string
+
+Only non-zero counts are stored: pairs are collected as (row, col) index arrays and summed into a
+scipy.sparse CSR matrix (upper triangle only), which grows as new entities appear. PMI is computed
+on the stored entries, so nothing the size of entities x entities is ever allocated.
+
+A unit's pairs grow with the square of its distinct entities, so units with more than
+max_unit_entities (e.g. a whole book as one document) are counted as units but left out of the pairs.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import scipy.sparse as sp
+
+FOLD_PAIRS = 1_000_000  # pending pairs summed into the matrix at a time
+KEY_SEP = "\x1f"        # joins an entity's text and label into one key
+
+
+class Cooccurrence:
+    """Incrementally built entity x entity co-occurrence counts."""
+
+    def __init__(self, unit="sentence", max_unit_entities=2_000):
+        if unit not in ("sentence", "document"):
+            raise ValueError(f"Unknown unit: {unit}")
+        self.unit = unit
+        self.max_unit_entities = max_unit_entities
+        self.index = {}      # (text, label) -> row / column number
+        self.entities = []   # (text, label) for each row
+        self.matrix = sp.csr_matrix((0, 0), dtype=np.int64)
+        self.entity_units = np.zeros(0, dtype=np.int64)  # units each entity appears in
+        self.n_units = 0
+        self.skipped_units = 0
+        self._pending = []   # (rows, cols) arrays not yet summed into the matrix
+        self._pending_size = 0
+        self._open = None    # (unit keys, entity ids) of the last unit seen, which may continue in the next batch
+
+    def add(self, batch, doc_id=None):
+        """
+        Count the entities of a record batch (or table) with the entity_table.py columns. doc_id counts
+        them as (part of) that document, whatever their doc_id column says; documents are added in order.
+        """
+        if isinstance(batch, pa.Table):
+            for record_batch in batch.to_batches():
+                self.add(record_batch, doc_id)
+            return
+        if batch.num_rows == 0:
+            return
+        # Look up each distinct (text, label) of the batch once:
+        keys = pc.binary_join_element_wise(batch.column("text"), batch.column("label").cast(pa.string()), KEY_SEP)
+        keys = keys.dictionary_encode()
+        distinct_ids = np.empty(len(keys.dictionary), dtype=np.int64)
+        for i, key in enumerate(keys.dictionary.to_pylist()):
+            key = tuple(key.split(KEY_SEP, 1))
+            if key not in self.index:
+                self.index[key] = len(self.entities)
+                self.entities.append(key)
+            distinct_ids[i] = self.index[key]
+        ids = distinct_ids[keys.indices.to_numpy()]
+
+        doc_ids = batch.column("doc_id").to_numpy() if doc_id is None else np.full(batch.num_rows, doc_id)
+        if self.unit == "sentence":
+            unit_keys = doc_ids.astype(np.int64) << 32 | batch.column("sent_id").to_numpy().astype(np.int64)
+        else:
+            unit_keys = doc_ids.astype(np.int64)
+        if self._open is not None:
+            # (the last unit of the previous batch may continue here)
+            unit_keys = np.concatenate([self._open[0], unit_keys])
+            ids = np.concatenate([self._open[1], ids])
+            self._open = None
+
+        # Hold back the last unit (the highest key), which may continue in the next batch:
+        last = unit_keys == unit_keys.max()
+        self._open = (unit_keys[last], ids[last])
+        self._count_units(unit_keys[~last], ids[~last])
+
+    def _count_units(self, unit_keys, ids):
+        # Count complete units: sort by (unit, entity), drop repeats of an entity within a unit
+        self._grow_entity_units()
+        if len(ids) == 0:
+            return
+        order = np.lexsort((ids, unit_keys))
+        unit_keys, ids = unit_keys[order], ids[order]
+        keep = np.r_[True, (unit_keys[1:] != unit_keys[:-1]) | (ids[1:] != ids[:-1])]
+        unit_keys, ids = unit_keys[keep], ids[keep]
+
+        starts = np.flatnonzero(np.r_[True, unit_keys[1:] != unit_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(ids)])
+        self.n_units += len(starts)
+        self.entity_units += np.bincount(ids, minlength=len(self.entity_units))
+
+        # Units with too many distinct entities are left out of the pairs:
+        too_big = sizes > self.max_unit_entities
+        self.skipped_units += int(too_big.sum())
+        in_pairs = np.repeat(~too_big, sizes)
+
+        # Pair every entity with the ones after it in its unit (ids are sorted, so rows < cols):
+        group_end = np.repeat(starts + sizes, sizes)
+        position = np.arange(len(ids))
+        partners = np.where(in_pairs, group_end - position - 1, 0)
+        total = int(partners.sum())
+        if total == 0:
+            return
+        first = np.cumsum(partners) - partners  # where each entity's pairs start in the output
+        step = np.arange(total) - np.repeat(first, partners)
+        rows = np.repeat(ids, partners)
+        cols = ids[np.repeat(position + 1, partners) + step]
+        self._pending.append((rows, cols))
+        self._pending_size += total
+        if self._pending_size >= FOLD_PAIRS:
+            self._fold()
+
+    def _grow_entity_units(self):
+        missing = len(self.index) - len(self.entity_units)
+        if missing > 0:
+            self.entity_units = np.concatenate([self.entity_units, np.zeros(missing, np.int64)])
+
+    def _fold(self):
+        # Sum the pending pairs into the matrix, growing it to the current number of entities
+        n = len(self.index)
+        if self.matrix.shape != (n, n):
+            self.matrix.resize((n, n))
+        if self._pending:
+            rows = np.concatenate([r for r, _ in self._pending])
+            cols = np.concatenate([c for _, c in self._pending])
+            self.matrix = self.matrix + sp.csr_matrix((np.ones(len(rows), np.int64), (rows, cols)), shape=(n, n))
+        self._pending, self._pending_size = [], 0
+
+    def flush(self):
+        """Finish the last unit (call when a document is done; the results below call it for you)."""
+        if self._open is not None:
+            self._count_units(*self._open)
+            self._open = None
+        self._fold()
+        self._grow_entity_units()
+
+    def pairs(self, min_count=1):
+        """Every co-occurring pair seen at least min_count times: (rows, cols, counts, pmi) arrays."""
+        self.flush()
+        coo = self.matrix.tocoo()
+        keep = coo.data >= min_count
+        rows, cols, counts = coo.row[keep], coo.col[keep], coo.data[keep]
+        # PMI = log( P(a, b) / (P(a) P(b)) ), with probabilities over units
+        pmi = np.log(counts * self.n_units / (self.entity_units[rows] * self.entity_units[cols]))
+        return rows, cols, counts, pmi
+
+    def top_pairs(self, n=20, min_count=1, by="count"):
+        """DataFrame of the n pairs with the highest count (or PMI, by="pmi")."""
+        rows, cols, counts, pmi = self.pairs(min_count)
+        score = counts if by == "count" else pmi
+        top = np.argsort(-score, kind="stable")[:n]
+        return pd.DataFrame({
+            "Entity A": [self.entities[r][0] for r in rows[top]],
+            "Label A": [self.entities[r][1] for r in rows[top]],
+            "Entity B": [self.entities[c][0] for c in cols[top]],
+            "Label B": [self.entities[c][1] for c in cols[top]],
+            "Co-occurrences": counts[top],
+            "PMI": pmi[top].round(2),
+        })
+
+    def graph(self, max_edges=100, min_count=2):
+        """Graphviz DOT for the strongest pairs: the max_edges highest counts of at least min_count."""
+        rows, cols, counts, pmi = self.pairs(min_count)
+        top = np.argsort(-counts, kind="stable")[:max_edges]
+        widest = counts[top].max() if len(top) else 1
+        lines = ["graph {", '  node [shape=box, style="rounded,filled", fillcolor="#F3C613", fontname="Helvetica"];']
+        for r in sorted(set(rows[top]) | set(cols[top])):
+            text, label = self.entities[r]
+            lines.append(f'  n{r} [label="{_escape(text)}\\n({_escape(label)})"];')
+        for r, c, count, score in zip(rows[top], cols[top], counts[top], pmi[top]):
+            lines.append(f'  n{r} -- n{c} [penwidth={1 + 4 * count / widest:.1f}, tooltip="{count} co-occurrences, PMI {score:.2f}"];')
+        lines.append("}")
+        return "\n".join(lines)
+
+    def summary(self):
+        self.flush()
+        return {"entities": len(self.index), "units": self.n_units, "pairs": self.matrix.nnz,
+                "skipped_units": self.skipped_units}
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
@@ -0,0 +1,120 @@
+"""
+Columnar (Arrow) entity table for the NER app.
+
+Every recognized entity is one row:
+    doc_id                 which document the entity came from (0 for a single text)
+    sent_id                which sentence of the document it's in (the piece number, for pipelines
+                           that don't split sentences)
+    start_char, end_char   character offsets in the whole document
+    start_token, end_token token offsets in the whole document
+    label                  entity label (dictionary-encoded)
+    text                   the entity's text
+    source                 "ruler" (a custom rule), "gazetteer" (a pattern from the deployment's
+                           gazetteer file) or "model" (spaCy's NER)
+
+The entity list, the frequency charts and the exports all read this one table, so a document is
+parsed once. A large file parsed in pieces adds one record batch per piece (with the piece's
+offsets), and the batches are joined into a table without copying. Parquet is written straight from
+the Arrow buffers; JSONL is written one batch at a time.
+"""
+import io
+import json
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Pattern ids given to custom rules and gazetteer patterns, so their entities can be told apart from the model's:
+RULER_ID = "ruler"
+GAZETTEER_ID = "gazetteer"
+SOURCES = {RULER_ID: "ruler", GAZETTEER_ID: "gazetteer"}
+
+ENTITY_SCHEMA = pa.schema([
+    ("doc_id", pa.int32()),
+    ("sent_id", pa.int32()),
+    ("start_char", pa.int64()),
+    ("end_char", pa.int64()),
+    ("start_token", pa.int64()),
+    ("end_token", pa.int64()),
+    ("label", pa.dictionary(pa.int32(), pa.string())),
+    ("text", pa.string()),
+    ("source", pa.dictionary(pa.int8(), pa.string())),
+])
+
+# Display names for the entity list:
+DISPLAY_COLUMNS = {"text": "Text", "label": "Label", "start_char": "Start", "end_char": "End", "source": "Source"}
+
+
+def sentence_count(doc):
+    """Number of sentences in a Doc (1 if the pipeline doesn't split sentences)."""
+    return sum(1 for _ in doc.sents) if doc.has_annotation("SENT_START") else 1
+
+
+def doc_entities(doc, doc_id=0, char_offset=0, token_offset=0, sent_offset=0):
+    """
+    One record batch with the entities of a spaCy Doc. For docs that are pieces of a bigger text,
+    the offsets (characters, tokens, sentences) of the piece shift the entity positions.
+    """
+    ents = doc.ents
+    if doc.has_annotation("SENT_START"):
+        sent_starts = np.array([sent.start for sent in doc.sents])
+        sent_ids = np.searchsorted(sent_starts, [ent.start for ent in ents], side="right") - 1 + sent_offset
+    else:
+        sent_ids = np.full(len(ents), sent_offset)
+    columns = [
+        pa.array([doc_id] * len(ents), pa.int32()),
+        pa.array(sent_ids, pa.int32()),
+        pa.array([ent.start_char + char_offset for ent in ents], pa.int64()),
+        pa.array([ent.end_char + char_offset for ent in ents], pa.int64()),
+        pa.array([ent.start + token_offset for ent in ents], pa.int64()),
+        pa.array([ent.end + token_offset for ent in ents], pa.int64()),
+        pa.array([ent.label_ for ent in ents], pa.string()).dictionary_encode(),
+        pa.array([ent.text for ent in ents], pa.string()),
+        pa.array([SOURCES.get(ent.ent_id_, "model") for ent in ents], pa.string()).dictionary_encode(),
+    ]
+    columns[6] = columns[6].cast(ENTITY_SCHEMA.field("label").type)
+    columns[8] = columns[8].cast(ENTITY_SCHEMA.field("source").type)
+    return pa.RecordBatch.from_arrays(columns, schema=ENTITY_SCHEMA)
+
+
+def entity_table(batches):
+    """Join record batches from doc_entities into one table (no copy of the columns)."""
+    return pa.Table.from_batches(list(batches), schema=ENTITY_SCHEMA)
+
+
+def label_counts(table):
+    """DataFrame of entity labels and how often each appears, most frequent first."""
+    # (each piece's batch has its own label dictionary, and group_by needs them to be the same)
+    counts = table.unify_dictionaries().group_by("label").aggregate([("label", "count")])
+    df = counts.to_pandas().rename(columns={"label": "Entity Type", "label_count": "Frequency"})
+    df["Entity Type"] = df["Entity Type"].astype(str)
+    return df.sort_values("Frequency", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def display_table(table):
+    """The columns shown in the app's entity list, renamed for display (still an Arrow table)."""
+    return table.select(list(DISPLAY_COLUMNS)).rename_columns(list(DISPLAY_COLUMNS.values()))
+
+
+def write_parquet(table, sink):
+    """Write the table to a Parquet file (path or binary file object)."""
+    pq.write_table(table, sink)
+
+
+def write_jsonl(table, sink, batch_size=10_000):
+    """Write the table as JSON lines (one entity per line) to a text file object, one batch at a time."""
+    for batch in table.to_batches(max_chunksize=batch_size):
+        sink.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in batch.to_pylist())
+
+
+def export_bytes(table, fmt):
+    """The table as a Parquet or JSONL file, for a download button."""
+    if fmt == "parquet":
+        sink = pa.BufferOutputStream()
+        write_parquet(table, sink)
+        return sink.getvalue().to_pybytes()
+    if fmt == "jsonl":
+        sink = io.StringIO()
+        write_jsonl(table, sink)
+        return sink.getvalue().encode("utf-8")
+    raise ValueError(f"Unknown export format: {fmt}")
@@ -0,0 +1,213 @@
+"""
+Registry of spaCy pipelines shared by every session of the NER app.
+
+Usage:
+
+    registry = ModelRegistry(budget_mb=2048)
+    with registry.use("en_core_web_sm") as nlp:   # loads the pipeline the first time it's asked for
+        doc = nlp(text)
+
+- Pipelines are loaded lazily, the first time a session asks for them, with an EntityRuler added
+  before the NER component (see load_pipeline).
+- Each pipeline's resident memory is estimated as the growth of the process's RSS while it loads.
+  Loads happen one at a time, so the numbers don't overlap.
+- When the loaded pipelines add up to more than the budget, the least recently used ones that no
+  session is using right now are dropped. A pipeline that's still in use is never evicted from
+  under a session.
+- use() also holds the pipeline's own lock, since each session reconfigures the shared
+  EntityRuler with its custom rules before parsing.
+- Pipelines loaded with preload() before the server forks its workers (see prefork.py and
+  batch_ner.py) are used as they are: every worker shares the parent's copy, so they don't count
+  against the budget and are never evicted.
+
+A gazetteer (a JSONL file of EntityRuler patterns, named by the NER_GAZETTEER environment variable)
+is added to every pipeline as its own ruler, after the session's custom rules, so custom rules win
+when both match.
+
+The budget comes from the NER_MODEL_BUDGET_MB environment variable (default 2048). Memory freed by
+an evicted pipeline goes back to Python's allocator; how much of it the operating system gets back
+depends on the allocator.
+"""
+import gc
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from importlib.metadata import entry_points
+
+DEFAULT_MODEL = "en_core_web_sm"
+BUDGET_MB = float(os.environ.get("NER_MODEL_BUDGET_MB", 2048))
+
+# Pipelines loaded before forking: name -> (nlp, memory in MB)
+PRELOADED = {}
+
+
+def rss_mb():
+    """Current resident memory of this process in MB (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        # (ru_maxrss is KB on Linux, bytes on macOS)
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def installed_models():
+    """Names of the spaCy pipeline packages installed in this environment (read from package metadata, without importing spaCy)."""
+    return sorted({entry_point.name for entry_point in entry_points(group="spacy_models")})
+
+
+def load_gazetteer(path=None):
+    """
+    EntityRuler patterns from a JSONL file (one {"label": ..., "pattern": ...} per line); [] without a path.
+    The default path is NER_GAZETTEER, read when called (prefork.py sets it from --gazetteer after import).
+    """
+    if path is None:
+        path = os.environ.get("NER_GAZETTEER")
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as lines:
+        return [json.loads(line) for line in lines if line.strip()]
+
+
+def load_pipeline(name, gazetteer=None):
+    """
+    Load a spaCy pipeline (or "blank:<lang>" for just a tokenizer) and add the EntityRuler the app
+    fills with custom rules, plus a ruler with the gazetteer patterns (default: NER_GAZETTEER).
+    """
+    import spacy
+    from entity_table import GAZETTEER_ID
+    nlp = spacy.blank(name.split(":", 1)[1]) if name.startswith("blank:") else spacy.load(name)
+    before = "ner" if "ner" in nlp.pipe_names else None
+    nlp.add_pipe("entity_ruler", before=before)
+    patterns = load_gazetteer() if gazetteer is None else gazetteer
+    if patterns:
+        ruler = nlp.add_pipe("entity_ruler", name="gazetteer", before=before)
+        # (phrase patterns are run through the pipeline, which would include the still-empty session ruler)
+        with nlp.select_pipes(disable=["entity_ruler"]):
+            ruler.add_patterns([{**rule, "id": GAZETTEER_ID} for rule in patterns])
+    return nlp
+
+
+def preload(names, gazetteer=None):
+    """Load pipelines into PRELOADED (in a parent process, before forking workers that share them)."""
+    for name in names:
+        before = rss_mb()
+        nlp = load_pipeline(name, gazetteer)
+        with nlp.select_pipes(disable=["entity_ruler"]):  # (the session ruler has no patterns yet)
+            nlp("Warm up the pipeline once, so lazily built tables exist before the fork.")
+        PRELOADED[name] = (nlp, max(rss_mb() - before, 0.0))
+
+
+def freeze_preloaded():
+    """
+    Move everything allocated so far out of the garbage collector's reach (gc.freeze), so GC passes
+    in forked workers don't write to -- and so copy -- the pages holding the shared pipelines.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+class _Entry:
+    def __init__(self, nlp, memory_mb, load_seconds, preloaded=False):
+        self.nlp = nlp
+        self.memory_mb = memory_mb
+        self.load_seconds = load_seconds
+        self.preloaded = preloaded    # shared with the parent process; not counted against the budget
+        self.lock = threading.Lock()  # held while a session configures the ruler and parses
+        self.users = 0                # sessions inside use() right now
+        self.last_used = time.time()
+
+
+class ModelRegistry:
+    """Lazily loaded, LRU-evicted spaCy pipelines under a memory budget (thread-safe)."""
+
+    def __init__(self, budget_mb=BUDGET_MB, loader=load_pipeline):
+        self.budget_mb = budget_mb
+        self.loader = loader
+        self._entries = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()       # guards _entries and the users counts
+        self._load_lock = threading.Lock()  # one load at a time, so RSS deltas belong to one pipeline
+        self.evictions = 0
+
+    def is_loaded(self, name):
+        with self._lock:
+            return name in self._entries
+
+    def _checkout(self, name):
+        # Mark a loaded pipeline as in use (and most recently used); None if it isn't loaded
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                entry.users += 1
+                entry.last_used = time.time()
+                self._entries.move_to_end(name)
+            return entry
+
+    def _acquire(self, name):
+        entry = self._checkout(name)
+        if entry is not None:
+            return entry
+        with self._load_lock:
+            entry = self._checkout(name)  # another session may have loaded it while we waited
+            if entry is not None:
+                return entry
+            if name in PRELOADED:
+                entry = _Entry(*PRELOADED[name], 0.0, preloaded=True)
+            else:
+                before, start = rss_mb(), time.perf_counter()
+                nlp = self.loader(name)
+                entry = _Entry(nlp, max(rss_mb() - before, 0.0), time.perf_counter() - start)
+            with self._lock:
+                entry.users = 1
+                self._entries[name] = entry
+                self._evict()
+            return entry
+
+    def _release(self, entry):
+        with self._lock:
+            entry.users -= 1
+            self._evict()
+
+    def _evict(self):
+        # (called with self._lock held) Drop idle pipelines, oldest first, until the rest fit the budget.
+        # The most recently used one always stays, even if it's bigger than the budget on its own.
+        evicted = False
+        for name in list(self._entries)[:-1]:
+            if self.memory_mb() <= self.budget_mb:
+                break
+            if self._entries[name].users == 0 and not self._entries[name].preloaded:
+                del self._entries[name]
+                self.evictions += 1
+                evicted = True
+        if evicted:
+            gc.collect()
+
+    def memory_mb(self):
+        return sum(entry.memory_mb for entry in self._entries.values() if not entry.preloaded)
+
+    def load(self, name):
+        """Load the pipeline called name now if it isn't loaded yet (use() does this too)."""
+        self._release(self._acquire(name))
+
+    @contextmanager
+    def use(self, name):
+        """Load (if needed) and lock the pipeline called name for the duration of the block."""
+        entry = self._acquire(name)
+        try:
+            with entry.lock:
+                yield entry.nlp
+        finally:
+            self._release(entry)
+
+    def stats(self):
+        """One dict per loaded pipeline, most recently used first."""
+        with self._lock:
+            return [{"model": name, "memory_mb": round(entry.memory_mb, 1), "load_s": round(entry.load_seconds, 2),
+                     "in_use": entry.users, "preloaded": entry.preloaded, "last_used": time.strftime("%H:%M:%S", time.localtime(entry.last_used))}
+                    for name, entry in reversed(self._entries.items())]
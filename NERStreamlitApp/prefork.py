@@ -0,0 +1,108 @@
+"""
+Pre-forked multi-process deployment for the NER app.
+
+Running N separate `streamlit run` processes means N copies of every spaCy model (and N model loads,
+paid by each worker's first visitor). Instead, this script loads the models (and the gazetteer) once,
+freezes them out of the garbage collector's reach, and then forks N Streamlit servers on consecutive
+ports. The forked workers share the parent's memory pages copy-on-write, so the model weights,
+vocab and vectors exist once however many workers there are, and no worker pays a model load.
+
+Usage (Linux/macOS, from this folder):
+
+    python prefork.py --workers 4 --port 8501 --models en_core_web_sm
+    NER_GAZETTEER=gazetteer.jsonl python prefork.py --workers 4
+
+Put a load balancer with sticky sessions in front of ports port..port+workers-1 (a Streamlit session
+lives in one worker). Workers that exit are restarted; Ctrl+C / SIGTERM stops them all.
+
+Models other than the preloaded ones still work, but each worker loads its own copy on first use
+(see model_registry.py).
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+from model_registry import DEFAULT_MODEL, PRELOADED, freeze_preloaded, load_gazetteer, preload
+
+APP_SCRIPT = Path(__file__).resolve().parent / "app.py"
+
+
+def run_worker(port, script=APP_SCRIPT):
+    """Run one Streamlit server in this (forked) process."""
+    from streamlit.web import bootstrap
+    flag_options = {"server_port": port, "server_headless": True}
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(str(script), False, [], flag_options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8501, help="port of the first worker")
+    parser.add_argument("--models", nargs="+", default=[DEFAULT_MODEL], help="spaCy pipelines to load before forking")
+    parser.add_argument("--gazetteer", default=os.environ.get("NER_GAZETTEER"), help="JSONL file of EntityRuler patterns")
+    args = parser.parse_args(argv)
+    if not hasattr(os, "fork"):
+        sys.exit("prefork.py needs os.fork (Linux or macOS); run `streamlit run app.py` instead.")
+
+    # Workers loading models on their own (ones not preloaded here) use the same gazetteer:
+    if args.gazetteer:
+        os.environ["NER_GAZETTEER"] = args.gazetteer
+    start = time.perf_counter()
+    preload(args.models, load_gazetteer(args.gazetteer))
+    import streamlit.web.bootstrap  # noqa: F401  (imported once here, shared by the workers too)
+    freeze_preloaded()
+    for name, (_, memory_mb) in PRELOADED.items():
+        print(f"Loaded {name} ({memory_mb:,.0f} MB)")
+    print(f"Models ready in {time.perf_counter() - start:.1f} s; starting {args.workers} workers", flush=True)
+
+    workers = {}  # pid -> port
+    stopping = False
+
+    def spawn(port):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                run_worker(port)
+            finally:
+                os._exit(0)
+        workers[pid] = port
+        print(f"Worker {pid} serving http://localhost:{port}", flush=True)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for i in range(args.workers):
+        spawn(args.port + i)
+
+    # Supervise: restart workers that exit, until asked to stop
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        port = workers.pop(pid, None)
+        if port is not None and not stopping:
+            print(f"Worker {pid} on port {port} exited ({status}); restarting", flush=True)
+            time.sleep(1)
+            spawn(port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
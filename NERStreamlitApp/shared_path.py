@@ -0,0 +1,13 @@
+"""
+Puts the repository's shared/ folder on the import path, for the modules several apps use
+(rerun_profiler, duckdb_backend). Import it before them:
+
+    import shared_path  # noqa: F401
+    from rerun_profiler import start_page
+"""
+import sys
+from pathlib import Path
+
+SHARED_DIR = str(Path(__file__).resolve().parent.parent / "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
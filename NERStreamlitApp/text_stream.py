@@ -0,0 +1,128 @@
+"""
+Streaming text uploads for the NER app.
+
+Uploaded files are read in blocks and decoded incrementally, so a large transcript is never held as
+one big bytes object plus one big string plus a copy in the text area. The decoded stream is cut into
+pieces at paragraph / sentence boundaries and fed to spaCy piece by piece (see iter_pieces), with
+each piece's character offset in the whole file.
+
+Encoding detection looks at the first block: a byte-order mark wins, then UTF-8 if it decodes
+cleanly, then charset_normalizer's guess for multi-byte encodings (when installed; it comes with
+Streamlit's requests dependency), then Windows-1252. Bytes that still don't decode become U+FFFD
+instead of crashing.
+"""
+import codecs
+import os
+import re
+
+BLOCK_SIZE = 1 << 20  # bytes read per block
+PIECE_CHARS = 100_000  # characters per piece sent to spaCy (well under nlp.max_length)
+SNIFF_BYTES = 64 * 1024  # bytes looked at for encoding detection
+
+# Upload limits (override with environment variables):
+MAX_UPLOAD_MB = float(os.environ.get("NER_MAX_UPLOAD_MB", 200))
+PREVIEW_MAX_CHARS = int(os.environ.get("NER_PREVIEW_MAX_CHARS", 50_000))  # bigger files aren't put in the text area
+
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Where a piece may end, best first:
+BREAKS = [re.compile(r"\n\s*\n"), re.compile(r"[.!?][\"')\]]*\s"), re.compile(r"\s")]
+
+
+def file_size(fileobj):
+    """Size of a seekable file object in bytes (the position is left unchanged)."""
+    position = fileobj.tell()
+    size = fileobj.seek(0, os.SEEK_END)
+    fileobj.seek(position)
+    return size
+
+
+def detect_encoding(head):
+    """Guess the encoding of a file from its first bytes."""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        # (final=False: the sample may end in the middle of a multi-byte character)
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return "cp1252"
+    # Single-byte code pages are hard to tell apart from a sample, so those go to Windows-1252 (the
+    # usual non-UTF-8 encoding of English .txt files); trust the guess for multi-byte encodings (e.g. Shift JIS):
+    best = from_bytes(head).best()
+    if best is not None and len("\u3042".encode(best.encoding, errors="ignore")) > 1:
+        return best.encoding
+    return "cp1252"
+
+
+def iter_text(fileobj, encoding=None, block_size=BLOCK_SIZE):
+    """
+    Decode a binary file object block by block, yielding strings.
+
+    The encoding is detected from the first block unless given. Undecodable bytes are replaced
+    with U+FFFD.
+    """
+    fileobj.seek(0)
+    if encoding is None:
+        encoding = detect_encoding(fileobj.read(SNIFF_BYTES))
+        fileobj.seek(0)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    while True:
+        block = fileobj.read(block_size)
+        text = decoder.decode(block, final=not block)
+        if text:
+            yield text
+        if not block:
+            return
+
+
+def read_preview(fileobj, max_chars=PREVIEW_MAX_CHARS, encoding=None):
+    """First max_chars characters of the file, and whether the file is longer than that."""
+    preview = []
+    length = 0
+    for text in iter_text(fileobj, encoding, block_size=min(BLOCK_SIZE, max_chars * 4 + 4)):
+        preview.append(text)
+        length += len(text)
+        if length > max_chars:
+            return "".join(preview)[:max_chars], True
+    return "".join(preview), False
+
+
+def _cut(text, max_chars):
+    # Latest good break point within the first max_chars characters:
+    window = text[:max_chars]
+    for pattern in BREAKS:
+        ends = [m.end() for m in pattern.finditer(window, max_chars // 2)]
+        if ends:
+            return ends[-1]
+    return max_chars
+
+
+def iter_pieces(texts, max_chars=PIECE_CHARS):
+    """
+    Re-cut a stream of strings into pieces of at most max_chars, ending at paragraph or sentence
+    breaks where possible. Yields (offset, piece), where offset is the piece's character position
+    in the whole stream.
+    """
+    buffer = ""
+    offset = 0
+    for text in texts:
+        buffer += text
+        while len(buffer) > max_chars:
+            cut = _cut(buffer, max_chars)
+            yield offset, buffer[:cut]
+            offset += cut
+            buffer = buffer[cut:]
+    if buffer:
+        yield offset, buffer
@@ -1,6 +1,10 @@
 import streamlit as st
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
 
 st.set_page_config(page_title="Multifamily RE Deal Tool", layout="centered")
+prof = start_page("Home")
+prof.lap("page content")
 
 # Header Image
 #st.image("pictures/Fundamentals-of-Value-Add-Real-Estate-Investing-01.png", use_column_width=True, caption="Source: CRE Knowledge Base")
@@ -35,6 +39,9 @@ This Streamlit-powered app lets you simulate and visualize a full investment mod
 - 🧮 **Deal Visualizer**: Adjust key inputs like unit count, rent, renovations, debt, and cap rates
 - 📊 **Pro Forma**: View projected income, expenses, and cash flow across the investment period
 - 💧 **Waterfall Modeling**: Structure equity splits between Limited Partners (LPs) and General Partners (GPs), including preferred returns and promotes
+- 🧪 **Scenario Sweep**: Run thousands (or millions) of assumption combinations in parallel and see the range of investor returns
+- 🕰️ **Vintage Backtest**: Replay your deal for every purchase month in a market history and see how much returns depend on timing
+- 💾 **Saved Scenarios**: Save deals and sweeps to disk, find the best ones by any key metric, and reopen them later
 - 📘 **Glossary**: Learn what every financial term means in plain English
 
 You'll see how assumptions affect investor returns — and walk away with a better grasp of how real estate private equity works.
@@ -46,6 +53,7 @@ st.markdown("""
 1. Head to the **📊 Deal Visualizer** page to set up your base assumptions
 2. Go to **📉 Waterfall Modeling** to customize your capital stack and return splits
 3. Explore the **🧾 Pro Forma** and **📘 Glossary** pages to reinforce your understanding
+4. Stress-test your deal on the **🧪 Scenario Sweep** page
 """)
 
 # (Optional Image/Diagram — uncomment when ready)
@@ -54,3 +62,5 @@ st.markdown("""
 # 👣 Footer
 st.markdown("---")
 st.caption("Created by Cameron Oglesby • Elements of Computing II Final Project • University of Notre Dame • Spring 2025")
+
+prof.finish()
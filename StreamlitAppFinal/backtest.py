@@ -0,0 +1,118 @@
+"""
+Vintage backtest: replay the deal model for every acquisition month and hold period in a market history.
+
+The history is a monthly CSV with columns:
+    month          YYYY-MM
+    rent_growth    year-over-year market rent growth (%)
+    cap_rate       market cap rate (%)
+    interest_rate  benchmark interest rate (%), e.g. the 10-year Treasury
+
+For an acquisition at the start of month v held for H years:
+  - renovated rents grow with the market from month v (each year's rent is the average of its 12 months)
+  - the loan rate is the benchmark rate in month v plus a spread
+  - the purchase price is optionally set by the market cap rate in month v (current NOI / cap rate)
+  - the exit value capitalizes the final year's NOI at the market cap rate in month v + 12H, plus a spread
+
+Every vintage of a hold period is built at once: the rent paths come from strided sliding-window views
+of the cumulative rent index (no copy per vintage), and all vintages go through the vectorized deal
+model in one call. The only loop is over hold periods.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from deal_model import DEFAULT_INPUTS, evaluate_deals
+
+HISTORY_COLUMNS = ["month", "rent_growth", "cap_rate", "interest_rate"]
+# Synthetic, illustrative sample data (not actual market history):
+SAMPLE_HISTORY = Path(__file__).parent / "data" / "market_history_sample.csv"
+
+
+def load_history(source=SAMPLE_HISTORY):
+    """Read and check a market history CSV (path or uploaded file). Lines starting with # are comments."""
+    history = pd.read_csv(source, comment="#")
+    missing = [c for c in HISTORY_COLUMNS if c not in history.columns]
+    if missing:
+        raise ValueError(f"Market history is missing columns: {', '.join(missing)}")
+    history = history[HISTORY_COLUMNS].dropna()
+    history["month"] = pd.PeriodIndex(history["month"], freq="M")
+    history = history.sort_values("month").reset_index(drop=True)
+    if len(history) > 1 and (history["month"].diff().iloc[1:] != history["month"].iloc[0].freq).any():
+        raise ValueError("Market history must have one row per month with no gaps.")
+    return history
+
+
+def vintage_paths(history, hold_period):
+    """
+    Market inputs for every vintage that has a full hold_period of history after it.
+
+    Returns a dict with "vintage" (the acquisition months), "rent_index" shaped (vintages, hold_period)
+    with each year's average rent relative to the month of acquisition, and per-vintage percents
+    "rent_cagr" (market rent growth per year over the hold), "entry_cap", "exit_cap" and "entry_rate".
+    """
+    months = hold_period * 12
+    n = max(len(history) - months, 0)
+    if n == 0:
+        return {"vintage": history["month"].to_numpy()[:0], "rent_index": np.empty((0, hold_period)),
+                **{name: np.empty(0) for name in ("rent_cagr", "entry_cap", "exit_cap", "entry_rate")}}
+
+    # Log rent index at the start of each month (annual growth spread evenly over 12 months):
+    monthly_log_growth = np.log1p(history["rent_growth"].to_numpy() / 100) / 12
+    log_index = np.concatenate([[0.0], np.cumsum(monthly_log_growth)])
+
+    # windows[v, j] is the log index j months after vintage v (a strided view, not a copy):
+    windows = sliding_window_view(log_index, months + 1)[:n]
+    relative = np.exp(windows[:, :months] - windows[:, :1])
+    rent_index = relative.reshape(n, hold_period, 12).mean(axis=2)
+
+    cap_rate = history["cap_rate"].to_numpy()
+    return {
+        "vintage": history["month"].to_numpy()[:n],
+        "rent_index": rent_index,
+        "rent_cagr": np.expm1((windows[:, -1] - windows[:, 0]) / hold_period) * 100,
+        "entry_cap": cap_rate[:n],
+        "exit_cap": cap_rate[months:months + n],
+        "entry_rate": history["interest_rate"].to_numpy()[:n],
+    }
+
+
+def run_backtest(history, hold_periods, base=None, loan_spread=2.0, exit_cap_spread=0.0, price_at_market_cap=True):
+    """
+    Run the deal model for every vintage x hold period.
+
+    base: deal inputs (session_state names, like deal_model.DEFAULT_INPUTS); its exit cap and interest
+    rate are replaced by the market's, and its purchase price too when price_at_market_cap.
+    loan_spread / exit_cap_spread are in percentage points.
+
+    Returns a DataFrame with one row per (vintage, hold period): the market inputs used plus the
+    deal model results.
+    """
+    base = {**DEFAULT_INPUTS, **(base or {})}
+    frames = []
+    for hold_period in hold_periods:
+        market = vintage_paths(history, hold_period)
+        if len(market["vintage"]) == 0:
+            continue
+        loan_rate = market["entry_rate"] + loan_spread
+        inputs = {**base, "hold_period": hold_period, "stabilized_year": min(base["stabilized_year"], hold_period),
+                  "loan_term": max(base["loan_term"], hold_period),  # the loan doesn't mature before the sale
+                  "exit_cap_rate": (market["exit_cap"] + exit_cap_spread) / 100,
+                  "interest_rate": loan_rate, "refi_rate": loan_rate}
+        if price_at_market_cap:
+            noi_current = (base["units"] * base["current_rent"] * 12 * base["occupancy_pre"] / 100
+                           * (1 - base["expense_ratio"] / 100))
+            inputs["purchase_price"] = noi_current / (market["entry_cap"] / 100)
+        results = evaluate_deals(rent_index=market["rent_index"], **inputs)
+        frames.append(pd.DataFrame({
+            "vintage": market["vintage"],
+            "hold_period": hold_period,
+            "entry_cap_rate": market["entry_cap"],
+            "exit_cap_rate": market["exit_cap"] + exit_cap_spread,
+            "loan_rate": loan_rate,
+            "rent_growth_cagr": market["rent_cagr"],
+        }).join(results))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
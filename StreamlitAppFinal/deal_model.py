@@ -0,0 +1,232 @@
+"""
+The Deal Visualizer + Waterfall Modeling calculations as one pure, vectorized function.
+
+evaluate_deals() takes the same inputs the pages keep in st.session_state (same names, same units:
+percents where the page stores percents, decimals where it stores decimals) as scalars or arrays,
+and returns each scenario's headline results. It has no Streamlit dependency, so it can run in
+worker processes (see sweep.py) and evaluate thousands of scenarios per call.
+
+Only the single-promote waterfall (with optional catch-up) is modeled here.
+"""
+import numpy as np
+import pandas as pd
+
+from debt import debt_metrics, hold_period_debt
+from waterfall_engine import irr, run_waterfall
+
+# Page defaults, keyed like st.session_state:
+DEFAULT_INPUTS = {
+    "purchase_price": 1000000,
+    "units": 10,
+    "current_rent": 1000,
+    "renovated_rent": 1200,
+    "renovation_cost_per_unit": 10000,
+    "occupancy_pre": 90,           # %
+    "occupancy_post": 95,          # %
+    "expense_ratio": 40,           # %
+    "hold_period": 5,              # years
+    "stabilized_year": 2,
+    "exit_cap_rate": 0.05,         # decimal
+    "pref_rate": 8.0,              # %
+    "gp_equity_pct": 0.10,         # decimal
+    "promote_pct": 0.20,           # decimal
+    "show_catchup": False,
+    "interest_rate": 5.0,          # %
+    "debt_ratio": 0.6,             # decimal
+    "loan_term": 10,               # years (at least the hold period, see loan_defaults)
+    "amort_years": 0,              # 0 = interest-only for the whole term
+    "io_months": 0,
+    "refi_year": 0,                # 0 = no refinance
+    "refi_ltv": 0.65,              # decimal
+    "refi_rate": 5.0,              # %
+}
+
+def loan_defaults(hold_period):
+    """
+    Loan terms for a deal whose terms were never set: interest-only, with a term no shorter than the
+    hold so the loan is repaid from the sale (how every page modeled the loan before loan terms existed).
+    """
+    return {"loan_term": max(DEFAULT_INPUTS["loan_term"], int(hold_period)),
+            "amort_years": DEFAULT_INPUTS["amort_years"], "io_months": DEFAULT_INPUTS["io_months"]}
+
+
+def deal_inputs(state):
+    """Every model input from a mapping like st.session_state, with the defaults above for missing ones."""
+    hold_period = state.get("hold_period", DEFAULT_INPUTS["hold_period"])
+    defaults = {**DEFAULT_INPUTS, **loan_defaults(hold_period)}
+    return {name: state.get(name, default) for name, default in defaults.items()}
+
+
+RESULT_COLUMNS = [
+    "noi_renovated", "value_after_renovation", "total_project_cost", "value_created",
+    "equity", "lp_irr", "gp_irr", "equity_irr", "equity_multiple", "min_dscr",
+]
+
+# Year-by-year line items of pro_forma() / scenario_tables():
+PRO_FORMA_COLUMNS = ["Gross Income", "Operating Expenses", "NOI", "Debt Service", "Proceeds from Sale", "Cash Flow to Equity"]
+CASH_FLOW_COLUMNS = ["Equity Contribution", "Cash to Equity", "Project Cash Flow", "LP Cash Flow", "GP Cash Flow"]
+WATERFALL_COLUMNS = ["LP Return of Capital", "GP Return of Capital", "LP Preferred Return", "GP Preferred Return",
+                     "GP Catch-Up", "LP Residual", "GP Residual", "Unreturned Capital", "Accrued Pref"]
+
+
+def _evaluate_group(inputs, hold_period, catchup, rent_index=None, tables=False):
+    # Every scenario in this group has the same hold period and catch-up setting, so their cash flows
+    # line up as one (scenarios, years) array:
+    col = {name: values[:, None] for name, values in inputs.items()}
+    n = len(inputs["units"])
+
+    gross_income_current = inputs["units"] * inputs["current_rent"] * 12 * inputs["occupancy_pre"] / 100
+    gross_income_renovated = inputs["units"] * inputs["renovated_rent"] * 12 * inputs["occupancy_post"] / 100
+    noi_current = gross_income_current * (1 - inputs["expense_ratio"] / 100)
+    noi_renovated = gross_income_renovated * (1 - inputs["expense_ratio"] / 100)
+    if rent_index is None:
+        rent_index = np.ones((n, hold_period))
+    # The exit value capitalizes the final year's NOI:
+    value_after_renovation = noi_renovated * rent_index[:, -1] / inputs["exit_cap_rate"]
+    total_project_cost = inputs["purchase_price"] + inputs["renovation_cost_per_unit"] * inputs["units"]
+    debt = total_project_cost * inputs["debt_ratio"]
+    equity = total_project_cost - debt
+
+    refi_year = np.where(inputs["refi_year"] < hold_period, inputs["refi_year"], 0)
+    loan = hold_period_debt(debt, inputs["interest_rate"], hold_period, inputs["loan_term"], inputs["amort_years"],
+                            inputs["io_months"], refi_year=refi_year, refi_amount=value_after_renovation * inputs["refi_ltv"],
+                            refi_rate_pct=inputs["refi_rate"])
+
+    years = np.arange(1, hold_period + 1)
+    noi = np.where(years >= col["stabilized_year"], noi_renovated[:, None] * rent_index, 0)
+    debt_service = loan["payment"] + loan["balloon"] - loan["proceeds"]
+    equity_cash = np.zeros((n, hold_period + 1))
+    equity_cash[:, 1:] = noi - debt_service
+    equity_cash[:, -1] += value_after_renovation
+    contributions = np.zeros_like(equity_cash)
+    contributions[:, 0] = equity
+
+    waterfall = run_waterfall(contributions, equity_cash, pref_rate=col["pref_rate"] / 100,
+                              promote_pct=col["promote_pct"], lp_pct=1 - col["gp_equity_pct"], catchup=catchup)
+    project_cf = equity_cash - contributions
+
+    results = {
+        "noi_current": noi_current,
+        "noi_renovated": noi_renovated,
+        "value_after_renovation": value_after_renovation,
+        "total_project_cost": total_project_cost,
+        "value_created": value_after_renovation - total_project_cost,
+        "equity": equity,
+        "lp_irr": irr(waterfall["lp_cf"]),
+        "gp_irr": irr(waterfall["gp_cf"]),
+        "equity_irr": irr(project_cf),
+        "equity_multiple": np.maximum(equity_cash, 0).sum(axis=1) / equity,
+        "min_dscr": np.nanmin(np.where(noi > 0, debt_metrics(noi, loan, periods_per_year=1)["dscr"], np.inf), axis=1),
+    }
+    if not tables:
+        return results
+
+    # With tables=True, also the line items behind the results: (scenarios, years 1..N) for the pro forma,
+    # (scenarios, years 0..N) for the cash flows and waterfall
+    gross_income = np.where(years >= col["stabilized_year"], gross_income_renovated[:, None] * rent_index, 0)
+    sale = np.zeros((n, hold_period))
+    sale[:, -1] = value_after_renovation
+    return {
+        "results": results,
+        "pro_forma": dict(zip(PRO_FORMA_COLUMNS, [
+            gross_income, gross_income * col["expense_ratio"] / 100, noi, debt_service, sale, equity_cash[:, 1:]])),
+        "cash_flows": dict(zip(CASH_FLOW_COLUMNS, [
+            contributions, equity_cash, project_cf, waterfall["lp_cf"], waterfall["gp_cf"]])),
+        "waterfall": dict(zip(WATERFALL_COLUMNS, [
+            waterfall[key] for key in ("lp_roc", "gp_roc", "lp_pref", "gp_pref", "gp_catchup", "lp_residual",
+                                       "gp_residual", "unreturned_capital", "accrued_pref")])),
+    }
+
+
+def _inputs(inputs):
+    # Every input as an array of the same length (missing ones from DEFAULT_INPUTS)
+    unknown = set(inputs) - set(DEFAULT_INPUTS)
+    if unknown:
+        raise KeyError(f"Unknown deal inputs: {sorted(unknown)}")
+    values = {name: np.asarray(inputs.get(name, default)) for name, default in DEFAULT_INPUTS.items()}
+    values = dict(zip(values, np.broadcast_arrays(*(np.atleast_1d(v) for v in values.values()))))
+    values = {name: v.astype(bool if name == "show_catchup" else float) for name, v in values.items()}
+    values["hold_period"] = values["hold_period"].astype(int)
+    if np.any(values["hold_period"] < 1):
+        raise ValueError("Hold period must be at least 1 year.")
+    return values
+
+
+def evaluate_deals(rent_index=None, **inputs):
+    """
+    Evaluate one or many deals.
+
+    Any input from DEFAULT_INPUTS can be passed as a scalar or a 1-D array (arrays must all have the
+    same length); missing inputs use the page defaults. Returns a DataFrame with one row per scenario
+    and the columns in RESULT_COLUMNS (IRRs as decimals; min_dscr is the lowest DSCR over the
+    stabilized years, inf without debt service).
+
+    rent_index optionally grows the renovated rents year by year: an array shaped (scenarios, hold
+    period) of each year's rent relative to the renovated rent (1.0 = no growth). It needs a single
+    hold period for all scenarios. The exit value then capitalizes the final year's NOI.
+    """
+    values = _inputs(inputs)
+    n = len(values["units"])
+    if rent_index is not None:
+        rent_index = np.broadcast_to(np.asarray(rent_index, dtype=float), (n, int(values["hold_period"][0])))
+        if np.any(values["hold_period"] != values["hold_period"][0]):
+            raise ValueError("rent_index needs the same hold period for every scenario.")
+    results = {name: np.full(n, np.nan) for name in RESULT_COLUMNS}
+    groups = pd.DataFrame({"hold": values["hold_period"], "catchup": values["show_catchup"]}).groupby(["hold", "catchup"]).indices
+    for (hold_period, catchup), rows in groups.items():
+        group = _evaluate_group({name: v[rows] for name, v in values.items()}, int(hold_period), bool(catchup),
+                                None if rent_index is None else rent_index[rows])
+        for name in RESULT_COLUMNS:
+            results[name][rows] = group[name]
+    return pd.DataFrame(results)
+
+
+def pro_forma(**inputs):
+    """
+    Year-by-year pro forma of one deal (scalar inputs, missing ones from DEFAULT_INPUTS): a DataFrame
+    with a Year column and PRO_FORMA_COLUMNS. These are the cash flows evaluate_deals() computes the
+    IRRs from, so income starts in the stabilized year.
+    """
+    values = _inputs(inputs)
+    if len(values["units"]) != 1:
+        raise ValueError("pro_forma() takes the inputs of a single deal.")
+    hold_period = int(values["hold_period"][0])
+    lines = _evaluate_group(values, hold_period, bool(values["show_catchup"][0]), tables=True)["pro_forma"]
+    table = pd.DataFrame({name: lines[name][0] for name in PRO_FORMA_COLUMNS})
+    table.insert(0, "Year", np.arange(1, hold_period + 1))
+    return table
+
+
+def scenario_tables(scenario_ids=None, **inputs):
+    """
+    Year-by-year tables of many deals at once (inputs as for evaluate_deals), in long format: one row
+    per scenario and year, with a "scenario" column (scenario_ids, default 0..n-1) and a "year" column.
+
+    Returns {"scenarios": ..., "pro_forma": ..., "cash_flows": ..., "waterfall": ...} DataFrames:
+    "scenarios" has one row per scenario with every input and RESULT_COLUMNS; the others have the
+    columns in PRO_FORMA_COLUMNS (years 1..N), CASH_FLOW_COLUMNS and WATERFALL_COLUMNS (years 0..N,
+    year 0 being the equity contribution). All are sorted by scenario (and year).
+    """
+    values = _inputs(inputs)
+    n = len(values["units"])
+    scenario_ids = np.arange(n) if scenario_ids is None else np.asarray(scenario_ids)
+    parts = {"scenarios": [], "pro_forma": [], "cash_flows": [], "waterfall": []}
+    groups = pd.DataFrame({"hold": values["hold_period"], "catchup": values["show_catchup"]}).groupby(["hold", "catchup"]).indices
+    for (hold_period, catchup), rows in groups.items():
+        group_inputs = {name: v[rows] for name, v in values.items()}
+        lines = _evaluate_group(group_inputs, int(hold_period), bool(catchup), tables=True)
+        results = lines.pop("results")
+        parts["scenarios"].append(pd.DataFrame({"scenario": scenario_ids[rows], **group_inputs,
+                                                **{name: results[name] for name in RESULT_COLUMNS}}))
+        for table, columns in lines.items():
+            periods = next(iter(columns.values())).shape[1]
+            first_year = 1 if table == "pro_forma" else 0
+            parts[table].append(pd.DataFrame({
+                "scenario": np.repeat(scenario_ids[rows], periods),
+                "year": np.tile(np.arange(first_year, first_year + periods), len(rows)),
+                **{name: np.ravel(values) for name, values in columns.items()},
+            }))
+    return {table: frames[0] if len(frames) == 1 else
+            pd.concat(frames, ignore_index=True).sort_values(["scenario", "year"][:1 if table == "scenarios" else 2],
+                                                             kind="stable", ignore_index=True)
+            for table, frames in parts.items()}
@@ -0,0 +1,177 @@
+"""
+Shared debt module: amortization schedules, refinancing, DSCR and debt yield.
+
+Schedules are monthly by default and built in closed form from each loan's rate, term, amortization
+period and interest-only (IO) months. Every loan input can be an array, so schedules for thousands of
+loans come out of one set of array operations, shaped (..., periods):
+
+    schedule = amortization_schedule(principal=[6e5, 7e5], annual_rate=0.055, term_years=10,
+                                     amort_years=30, io_months=24, periods=120)
+
+Rates are nominal annual rates in decimals (5.5% -> 0.055), compounded monthly like a standard mortgage.
+"""
+import numpy as np
+
+SCHEDULE_FIELDS = ["balance_begin", "interest", "principal", "payment", "balloon", "proceeds", "balance_end"]
+
+
+def _level_payment(principal, rate, n):
+    # Payment that fully amortizes `principal` over n periods (straight-line when the rate is 0;
+    # n = 0 is an interest-only loan, which has no amortizing payment):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amortizing = principal * rate / (1 - (1 + rate) ** -n)
+    return np.where(n == 0, 0, np.where(rate == 0, principal / np.maximum(n, 1), amortizing))
+
+
+def _balance_after(principal, rate, payment, k):
+    # Balance after k level payments: P(1+r)^k - PMT((1+r)^k - 1)/r
+    growth = (1 + rate) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balance = principal * growth - payment * (growth - 1) / rate
+        return np.where(rate == 0, principal - payment * k, balance)
+
+
+def amortization_schedule(principal, annual_rate, term_years, amort_years=30, io_months=0,
+                          periods=None, start_period=0, periods_per_year=12):
+    """
+    Build the payment schedule of one loan or an array of loans.
+
+    principal, annual_rate, term_years, amort_years, io_months and start_period may all be arrays
+    (broadcast together into the loan shape). amort_years=0 means interest-only for the whole term.
+    The loan funds at the start of start_period and its remaining balance is paid as a balloon in
+    its last period.
+
+    Returns a dict of arrays shaped (loan shape..., periods) with the fields in SCHEDULE_FIELDS;
+    "payment" is regular debt service (interest + scheduled principal) and excludes the balloon.
+    """
+    principal, annual_rate, term_years, amort_years, io_months, start_period = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (principal, annual_rate, term_years, amort_years, io_months, start_period))
+    )
+    term_n = np.rint(term_years * periods_per_year)
+    amort_n = np.rint(amort_years * periods_per_year)
+    io_n = np.rint(io_months * periods_per_year / 12)
+    if periods is None:
+        periods = int(np.max(start_period + term_n)) if term_n.size else 0
+
+    # Loan-shaped arrays get a trailing period axis:
+    P, r, n_term, n_amort, n_io, start = (
+        x[..., None] for x in (principal, annual_rate / periods_per_year, term_n, amort_n, io_n, start_period)
+    )
+    age = np.arange(periods) - start  # loan age in periods
+    active = (age >= 0) & (age < n_term)
+    interest_only = (n_amort == 0) | (age < n_io)
+
+    pmt = _level_payment(P, r, n_amort)
+    paid = np.clip(age - n_io, 0, None)  # amortizing payments already made before this period
+    balance_begin = np.where(interest_only, P, _balance_after(P, r, pmt, paid))
+    balance_begin = np.where(active, np.maximum(balance_begin, 0), 0)
+
+    interest = balance_begin * r
+    principal_paid = np.where(interest_only, 0, np.minimum(pmt - interest, balance_begin))
+    balance_end = balance_begin - principal_paid
+
+    # The remaining balance is repaid in the loan's final period:
+    maturing = active & (age == n_term - 1)
+    balloon = np.where(maturing, balance_end, 0)
+    balance_end = np.where(maturing, 0, balance_end)
+    proceeds = np.where(age == 0, P, 0)
+
+    return {
+        "balance_begin": balance_begin,
+        "interest": interest,
+        "principal": principal_paid,
+        "payment": interest + principal_paid,
+        "balloon": balloon,
+        "proceeds": proceeds,
+        "balance_end": balance_end,
+    }
+
+
+def refinanced_schedule(principal, annual_rate, term_years, amort_years, io_months,
+                        refi_period, refi_principal, refi_rate, refi_term_years, refi_amort_years=30,
+                        refi_io_months=0, periods=None, periods_per_year=12):
+    """
+    Schedule of a loan that is refinanced at the start of refi_period (vectorized like amortization_schedule).
+
+    The original loan is paid off in full (as a balloon) at the end of the period before refi_period and
+    the new loan funds at that point; "proceeds" carries both loans' funding, so
+    proceeds - balloon is the net cash-out (or cash-in) of the refinance. Loans with refi_period <= 0
+    are not refinanced.
+    """
+    refi_period = np.asarray(refi_period, dtype=float)
+    refinances = refi_period > 0
+    old_term = np.where(refinances, np.minimum(term_years, refi_period / periods_per_year), term_years)
+    old = amortization_schedule(principal, annual_rate, old_term, amort_years, io_months,
+                                periods=periods, periods_per_year=periods_per_year)
+    periods = old["balance_begin"].shape[-1]
+
+    # The new loan's first period is refi_period; fund it at the end of the period before:
+    new = amortization_schedule(np.where(refinances, refi_principal, 0), refi_rate, refi_term_years,
+                                refi_amort_years, refi_io_months, periods=periods,
+                                start_period=np.where(refinances, refi_period, periods),
+                                periods_per_year=periods_per_year)
+    shifted_proceeds = np.zeros_like(new["proceeds"])
+    shifted_proceeds[..., :-1] = new["proceeds"][..., 1:]
+    new["proceeds"] = shifted_proceeds
+    return {field: old[field] + new[field] for field in SCHEDULE_FIELDS}
+
+
+def to_annual(values, periods_per_year=12):
+    """Sum a (..., periods) array into (..., years), padding a partial final year with zeros."""
+    values = np.asarray(values, dtype=float)
+    years = -(-values.shape[-1] // periods_per_year)
+    padded = np.zeros(values.shape[:-1] + (years * periods_per_year,))
+    padded[..., :values.shape[-1]] = values
+    return padded.reshape(values.shape[:-1] + (years, periods_per_year)).sum(axis=-1)
+
+
+def debt_metrics(noi, schedule, periods_per_year=12):
+    """
+    DSCR and debt yield for each period.
+
+    noi is net operating income per period, broadcastable to the schedule's shape.
+    DSCR = NOI / regular debt service; debt yield = annualized NOI / loan balance at the start of the period.
+    Periods with no debt service or no balance get NaN.
+    """
+    noi = np.asarray(noi, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dscr = np.where(schedule["payment"] > 0, noi / schedule["payment"], np.nan)
+        debt_yield = np.where(schedule["balance_begin"] > 0, noi * periods_per_year / schedule["balance_begin"], np.nan)
+    return {"dscr": dscr, "debt_yield": debt_yield}
+
+
+def hold_period_debt(debt, interest_rate_pct, hold_period, term_years=10, amort_years=0, io_months=0,
+                     refi_year=0, refi_amount=0, refi_rate_pct=None, monthly=False):
+    """
+    Year-by-year debt cash flows of the deal's loan over the hold period (the pages' shared entry point).
+
+    interest_rate_pct / refi_rate_pct are percents, as stored in st.session_state["interest_rate"]
+    (5.0 -> 5%), so every page scales the rate the same way. amort_years=0 is an interest-only loan.
+    With refi_year > 0 the loan is refinanced into a new loan of refi_amount (same term and
+    amortization) at the end of that year. Any balance left at the end of the hold is repaid from
+    the sale. debt and the other loan inputs may be arrays for a batch of deals.
+
+    Returns a dict of (..., hold_period) arrays: "payment" (regular debt service), "interest",
+    "principal", "balloon" (repaid at maturity, refinance or sale), "proceeds" (new refinance loans),
+    "balance_begin" and "balance_end" (balance at the start / end of each year).
+    With monthly=True the arrays are (..., hold_period * 12), one value per month.
+    """
+    periods = int(hold_period) * 12
+    rate = np.asarray(interest_rate_pct, dtype=float) / 100
+    refi_rate = rate if refi_rate_pct is None else np.asarray(refi_rate_pct, dtype=float) / 100
+    schedule = refinanced_schedule(debt, rate, term_years, amort_years, io_months,
+                                  refi_period=np.asarray(refi_year) * 12, refi_principal=refi_amount,
+                                  refi_rate=refi_rate, refi_term_years=term_years,
+                                  refi_amort_years=amort_years, refi_io_months=io_months, periods=periods)
+
+    # Repay what's left at sale; the original loan funds at closing, not from operations:
+    schedule["balloon"][..., -1] += schedule["balance_end"][..., -1]
+    schedule["balance_end"][..., -1] = 0
+    schedule["proceeds"][..., 0] -= np.broadcast_to(np.asarray(debt, dtype=float), schedule["proceeds"].shape[:-1])
+    if monthly:
+        return schedule
+
+    annual = {field: to_annual(schedule[field]) for field in ("interest", "principal", "payment", "balloon", "proceeds")}
+    annual["balance_begin"] = schedule["balance_begin"][..., ::12]
+    annual["balance_end"] = schedule["balance_end"][..., 11::12]
+    return annual
@@ -1,10 +1,15 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import numpy_financial as npf
-import matplotlib.pyplot as plt
+from deal_model import loan_defaults
+from debt import hold_period_debt
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
+from waterfall_engine import irr, run_hurdle_waterfall, run_waterfall
 
 st.set_page_config(page_title="Waterfall Modeling", layout="wide")
+prof = start_page("Waterfall Modeling")
+prof.lap("inputs")
 st.title("📉 Equity Waterfall Modeling")
 
 st.markdown("""
@@ -98,6 +103,29 @@ with col1a:
     show_catchup = st.checkbox("Enable GP Catch-Up Tier?", value=default_show_catchup)
     st.session_state["show_catchup"] = show_catchup
 
+    default_promote_structure = st.session_state.get("promote_structure", "Single Promote")
+    promote_structure = st.radio(
+        "Promote Structure",
+        ["Single Promote", "IRR Hurdles"],
+        index=["Single Promote", "IRR Hurdles"].index(default_promote_structure),
+        horizontal=True,
+    )
+    st.session_state["promote_structure"] = promote_structure
+    if promote_structure == "IRR Hurdles":
+        hurdle_table = st.data_editor(
+            pd.DataFrame({"LP IRR Hurdle (%)": [8.0, 12.0, 15.0], "GP Promote Above Hurdle (%)": [20.0, 30.0, 40.0]}),
+            num_rows="dynamic",
+            hide_index=True,
+            key="hurdle_tiers",
+        )
+        with st.expander("What are IRR Hurdles?"):
+            st.markdown("""
+            Many deals have **several promote tiers** instead of one. Each tier starts once the LP has earned a target **IRR**.
+
+            For example: cash is split pro rata until the LP earns an 8% IRR, then the GP receives a 20% promote until the LP earns 12%,
+            a 30% promote until 15%, and a 40% promote after that. (The Preferred Return and Promote % inputs above are not used in this mode.)
+            """)
+
 with col1b:
     st.markdown("### 🏦 Debt Assumptions:")
 
@@ -140,30 +168,65 @@ with col1b:
         - Higher debt increases risk but can boost returns if the investment performs well.
         """)
 
+    # Loan terms (the defaults keep the loan interest-only over the hold):
+    loan_default = loan_defaults(hold_period)
+    loan_term = st.number_input("Loan Term (Years)", min_value=1, max_value=40,
+                                value=st.session_state.get("loan_term", loan_default["loan_term"]))
+    amort_years = st.number_input("Amortization (Years, 0 = Interest-Only)", min_value=0, max_value=40,
+                                  value=st.session_state.get("amort_years", loan_default["amort_years"]))
+    io_months = st.number_input("Interest-Only Period (Months)", min_value=0, max_value=480,
+                                value=st.session_state.get("io_months", loan_default["io_months"]), step=12)
+    refinance = st.checkbox("Refinance During the Hold?", value=st.session_state.get("refi_year", 0) > 0)
+    refi_year, refi_ltv, refi_rate = 0, st.session_state.get("refi_ltv", 0.65), st.session_state.get("refi_rate", interest_rate_rounded)
+    if refinance and hold_period > 1:
+        refi_year = st.slider("Refinance at End of Year", 1, hold_period - 1,
+                              value=min(max(st.session_state.get("refi_year", 1), 1), hold_period - 1))
+        refi_ltv = st.slider("Refinance Loan-to-Value (%)", 0, 80, value=int(refi_ltv * 100)) / 100
+        refi_rate = st.number_input("Refinance Interest Rate (%)", min_value=0.0, max_value=20.0,
+                                    value=float(refi_rate), step=0.25)
+    elif refinance:
+        st.warning("A refinance needs a hold period of at least 2 years.")
+
+    st.session_state["loan_term"] = loan_term
+    st.session_state["amort_years"] = amort_years
+    st.session_state["io_months"] = io_months
+    st.session_state["refi_year"] = refi_year
+    st.session_state["refi_ltv"] = refi_ltv
+    st.session_state["refi_rate"] = refi_rate
+    with st.expander("What are Amortization, Interest-Only and Refinancing?"):
+        st.markdown("""
+        - **Amortization** is the number of years over which the loan's principal is paid down with level monthly payments.
+        - During the **interest-only** period you only pay interest, so the balance stays flat and cash flow is higher.
+        - A loan that isn't fully paid off at the end of its **term** (or at sale) repays its remaining balance as a **balloon**.
+        - A **refinance** replaces the loan with a new one sized at a % of the renovated value. If the new loan is bigger
+          than the old balance, the difference (cash-out) goes to equity.
+        """)
+
 
 
 st.divider()
 
 
 # Capital structure calculations:
+prof.lap("cash flows")
 equity = total_project_cost * (1 - debt_ratio)
 debt = total_project_cost * debt_ratio
 gp_equity = equity * gp_equity_pct
 lp_equity = equity * lp_equity_pct
 
-# Build annual project-level cash flows:
-annual_debt_service = debt * interest_rate #if interest_only else 0
+# Build annual project-level cash flows (the loan schedule comes from the shared debt module):
+loan = hold_period_debt(debt, interest_rate_rounded, hold_period, loan_term, amort_years, io_months,
+                        refi_year=refi_year, refi_amount=value_after_renovation * refi_ltv, refi_rate_pct=refi_rate)
 
 annual_cash_flows = []
 for year in range(1, hold_period + 1):
     noi = noi_renovated if year >= stabilized_year else 0
-    if year < hold_period:
-        debt_payment = annual_debt_service
-        equity_cf = noi - debt_payment
-    else:
+    # Regular payments, plus loan payoffs (maturity, refinance or sale) net of any refinance proceeds:
+    debt_payment = loan["payment"][year - 1] + loan["balloon"][year - 1] - loan["proceeds"][year - 1]
+    equity_cf = noi - debt_payment
+    if year == hold_period:
         # Add sale proceeds to final year:
-        debt_payment = annual_debt_service + debt #(0 if interest_only else debt)
-        equity_cf = noi + value_after_renovation - debt_payment
+        equity_cf += value_after_renovation
 
     annual_cash_flows.append({
         "Year": year,
@@ -174,93 +237,92 @@ for year in range(1, hold_period + 1):
 
 cf_df = pd.DataFrame(annual_cash_flows)
 
-# Create year-by-year LP and GP cash flows:
-lp_cf = [-lp_equity]  # Initial investment
-gp_cf = [-gp_equity]  # Initial investment
-
-for year_data in annual_cash_flows:
-    annual_equity_cf = year_data["Cash to Equity"]
-
-    # Apply promote to final year only (like your original logic)
-    if year_data["Year"] == hold_period:
-        lp_share = annual_equity_cf * (1 - promote_pct)
-        gp_share = annual_equity_cf * promote_pct
-    else:
-        # Before sale year, assume 100% to LP until preferred return tiers are built
-        lp_share = annual_equity_cf
-        gp_share = 0
-
-    lp_cf.append(lp_share)
-    gp_cf.append(gp_share)
-
-# Calculate final cash available at exit:
-sale_proceeds = value_after_renovation
-total_exit_cash = (noi_renovated + sale_proceeds)  # Exit-year NOI + sale
-debt_repayment = debt  # Assume balloon payment at end
-cash_to_equity = total_exit_cash - debt_repayment
-
-# Defining the Waterfall function:
-def waterfall_distribution(lp_equity, pref_rate, hold_period, cash_to_equity, promote_pct, gp_equity, catchup=False):
+# Run the waterfall period by period (year 0 = equity contribution, years 1..N = cash to equity).
+# Unreturned capital and a compounding pref balance are tracked every year, so the IRRs and the
+# distribution table come from the same LP/GP cash flows:
+prof.lap("waterfall + IRR")
+contributions = np.zeros(hold_period + 1)
+contributions[0] = equity
+equity_cash = np.array([0.0] + [row["Cash to Equity"] for row in annual_cash_flows])
+
+if promote_structure == "IRR Hurdles":
+    hurdle_rows = hurdle_table.dropna().sort_values("LP IRR Hurdle (%)")
+    hurdle_tiers = [(h / 100, p / 100) for h, p in hurdle_rows.itertuples(index=False)]
+    waterfall = run_hurdle_waterfall(contributions, equity_cash, hurdle_tiers, lp_pct=lp_equity_pct)
+
+    # Name each tier by the LP IRR range it covers:
+    bounds = [f"{h * 100:g}%" for h, _ in hurdle_tiers]
+    tier_names = [f"Up to {bounds[0]} IRR"] if bounds else []
+    tier_names += [f"{lo} to {hi} IRR" for lo, hi in zip(bounds, bounds[1:])]
+    tier_names += [f"Above {bounds[-1]} IRR" if bounds else "All Cash"]
+
     results = {}
+    for i, name in enumerate(tier_names):
+        results[f"LP: {name}"] = waterfall["lp_tiers"][:, i].sum()
+        results[f"GP: {name}"] = waterfall["gp_tiers"][:, i].sum()
+    results["Total LP Distribution"] = waterfall["lp_total"].sum()
+    results["Total GP Distribution"] = waterfall["gp_total"].sum()
+
+    distribution_df = pd.DataFrame(waterfall["tier_cash"], columns=tier_names)
+    distribution_df.insert(0, "Cash to Equity", equity_cash)
+    distribution_df.index.name = "Year"
+    chart_tiers = [(name, waterfall["tier_cash"][:, i].sum()) for i, name in enumerate(tier_names)]
+else:
+    waterfall = run_waterfall(
+        contributions,
+        equity_cash,
+        pref_rate=pref_rate,
+        promote_pct=promote_pct,
+        lp_pct=lp_equity_pct,
+        catchup=show_catchup  # this is your checkbox value
+    )
 
-    # Tier 1: Return of Capital to LP
-    tier1 = min(lp_equity, cash_to_equity)
-    cash_remaining = cash_to_equity - tier1
-
-    # Tier 2: Preferred Return to LP 
-    lp_pref_total = lp_equity * pref_rate * hold_period
-    tier2 = min(lp_pref_total, cash_remaining)
-    cash_remaining -= tier2
-
-    results["LP Return of Capital"] = tier1
-    results["LP Preferred Return"] = tier2
-
-    # Tier 3: GP Catch-Up (if enabled)
-    tier3_gp = 0
-    tier3_lp = 0
-
-    if catchup:
-        # GP catch-up amount needed to "true up" to promote % of total profits:
-        profits_so_far = tier1 + tier2  # LP only so far
-        target_gp_share = promote_pct / (1 - promote_pct) * profits_so_far
-        tier3_gp = min(cash_remaining, target_gp_share)
-        cash_remaining -= tier3_gp
-
-    results["GP Catch-Up"] = tier3_gp
-
-    # Tier 4: Residual Split
-    tier4_lp = cash_remaining * (1 - promote_pct)
-    tier4_gp = cash_remaining * promote_pct
-
-    # Final distributions:
-    total_lp = tier1 + tier2 + tier4_lp
-    total_gp = gp_equity + tier3_gp + tier4_gp
-
-    results["LP Residual Split"] = tier4_lp
-    results["GP Residual Split"] = tier4_gp
-    results["Total LP Distribution"] = total_lp
-    results["Total GP Distribution"] = total_gp
-
-    return results
-
-# Compute the Waterfall:
-results = waterfall_distribution(
-    lp_equity=lp_equity,
-    pref_rate=pref_rate,
-    hold_period=hold_period,
-    cash_to_equity=cash_to_equity,
-    promote_pct=promote_pct,
-    gp_equity=gp_equity,
-    catchup=show_catchup  # this is your checkbox value
-)
-
-# Compute the IRR cash flows:
-lp_irr = npf.irr(lp_cf)
-gp_irr = npf.irr(gp_cf)
+    results = {
+        "LP Return of Capital": waterfall["lp_roc"].sum(),
+        "LP Preferred Return": waterfall["lp_pref"].sum(),
+        "GP Return of Capital": waterfall["gp_roc"].sum(),
+        "GP Preferred Return": waterfall["gp_pref"].sum(),
+        "GP Catch-Up": waterfall["gp_catchup"].sum(),
+        "LP Residual Split": waterfall["lp_residual"].sum(),
+        "GP Residual Split": waterfall["gp_residual"].sum(),
+        "Total LP Distribution": waterfall["lp_total"].sum(),
+        "Total GP Distribution": waterfall["gp_total"].sum(),
+    }
+
+    # Year-by-year distributions by tier:
+    distribution_df = pd.DataFrame({
+        "Year": np.arange(hold_period + 1),
+        "Cash to Equity": equity_cash,
+        "Return of Capital": waterfall["lp_roc"] + waterfall["gp_roc"],
+        "Preferred Return": waterfall["lp_pref"] + waterfall["gp_pref"],
+        "GP Catch-Up": waterfall["gp_catchup"],
+        "Residual to LP": waterfall["lp_residual"],
+        "Residual to GP": waterfall["gp_residual"],
+        "Unreturned Capital": waterfall["unreturned_capital"],
+        "Accrued Pref": waterfall["accrued_pref"],
+    }).set_index("Year")
+
+    chart_tiers = [
+        ("Return of Capital", results["LP Return of Capital"] + results["GP Return of Capital"]),
+        ("Preferred Return", results["LP Preferred Return"] + results["GP Preferred Return"]),
+    ]
+    if show_catchup:
+        chart_tiers.append(("GP Catch-Up", results["GP Catch-Up"]))
+    chart_tiers += [
+        ("Residual to LP", results["LP Residual Split"]),
+        ("Residual to GP", results["GP Residual Split"]),
+    ]
+
+cash_to_equity = np.maximum(equity_cash, 0).sum()
+
+# Compute the IRRs from the same cash flows:
+lp_irr = irr(waterfall["lp_cf"])
+gp_irr = irr(waterfall["gp_cf"])
 project_cf = [-equity] + [row["Cash to Equity"] for row in annual_cash_flows]
-total_equity_irr = npf.irr(project_cf)
+total_equity_irr = irr(project_cf)
 
 # Display the results:
+prof.lap("results tables")
 col2a, col2b = st.columns(2)
 with col2a :
     st.markdown("### 📈 Waterfall Summary")
@@ -278,24 +340,19 @@ with col2b:
     st.write("### 💰 Cash Distribution Breakdown")
     st.write(pd.DataFrame.from_dict(results, orient="index", columns=["Amount ($)"]))
 
+st.markdown("### 📅 Year-by-Year Distributions")
+st.dataframe(distribution_df.style.format("${:,.0f}"))
+st.caption("Negative cash to equity is funded as an additional capital contribution. In the single-promote structure, Unreturned Capital and Accrued Pref are the balances still owed to investors at the end of each year.")
+
 # Visualize the waterfall with chart:
 
 # First, build tiers dynamically:
-tiers = [
-    ("Cash to Equity", cash_to_equity),
-    ("Return of Capital (LP)", -results["LP Return of Capital"]),
-    ("Preferred Return (LP)", -results["LP Preferred Return"]),
-]
-
-if show_catchup:
-    tiers.append(("GP Catch-Up", -results["GP Catch-Up"]))
-
-tiers += [
-    ("Residual to LP", -results["LP Residual Split"]),
-    ("Residual to GP", -results["GP Residual Split"]), #  Negative signs mean "outflow" from total--> used to simulate how cash steps down through the tiers.
-]
+# Negative signs mean "outflow" from total--> used to simulate how cash steps down through the tiers.
+tiers = [("Cash to Equity", cash_to_equity)] + [(name, -amount) for name, amount in chart_tiers]
 
 # Then, plot the waterfall:
+prof.lap("waterfall chart")
+import matplotlib.pyplot as plt
 st.markdown("### 💧 Cash Flow Waterfall")
 
 labels, values = zip(*tiers)
@@ -320,28 +377,31 @@ for i in range(len(values)):
     )
 
 # Labels and aesthetics:
-ax.set_title("Equity Distribution at Sale: Final-Year Waterfall")
+ax.set_title("Equity Distributions Over the Hold Period")
 ax.set_ylabel("Dollars ($)")
 ax.axhline(0, color="black", linewidth=0.8)
 plt.xticks(range(len(labels)), labels, rotation=30)
 st.pyplot(fig)
-st.caption("This chart shows how equity is distributed at the end of the hold period, after debt is repaid and sale proceeds are realized.")
+st.caption("This chart shows how all cash to equity over the hold period (operating cash flow plus sale proceeds, after debt) is distributed through the tiers.")
 
 
 # Disclosure of my modeling assumptions:
 with st.expander("📘 Modeling Assumptions"):
     st.markdown("""
     - All equity and debt are deployed at the beginning of the hold period.
-    - Cash flows are modeled as a single distribution at exit (NOI + Sale Proceeds).
-    - Debt is assumed to be interest-only unless otherwise selected.
+    - Each year's cash to equity (NOI after debt service, plus sale proceeds in the final year) runs through the waterfall in that year.
+    - Debt is interest-only for the interest-only period, then amortizes with level monthly payments; any balance left at maturity, refinance or sale is repaid in full.
     - No taxes, fees, or reversion costs are included.
+    - LP and GP co-invest equity is treated pari passu in the first two tiers.
     - Waterfall includes the following tiers:
-        1. LP return of capital  
-        2. LP preferred return (simple interest, not compounded)  
+        1. Return of capital  
+        2. Preferred return (compounded annually on unreturned capital and unpaid pref)  
         3. GP catch-up (if enabled) to reach target promote share  
         4. Residual split per the promote structure
-    - IRRs are calculated on a single-entry, single-exit cash flow basis.
+    - IRRs are calculated from the same year-by-year LP and GP distributions shown in the table.
     """)
 
 # Storing inputs to be used across pages:
-st.session_state["debt"] = debt
\ No newline at end of file
+st.session_state["debt"] = debt
+
+prof.finish()
@@ -1,9 +1,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from deal_model import loan_defaults
+from debt import debt_metrics, hold_period_debt, to_annual
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
+from table_render import show_wide_table
+
+STYLER_MAX_COLUMNS = 30  # wider tables render with the fast path by default
+PAGE_SIZE = 24  # periods per page on the fast path
 
 st.set_page_config(page_title="Pro Forma Statement", layout="centered")
+prof = start_page("Pro Forma")
+prof.lap("inputs")
 st.title("📄 Pro Forma Statement")
 
 st.markdown("""
@@ -29,42 +38,47 @@ value_after_renovation = st.session_state["value_after_renovation"]
 debt = st.session_state["debt"]
 interest_rate = st.session_state["interest_rate"]
 
-# Next, build Pro Forma Table:
-annual_debt_service = debt * (interest_rate / 100)
+# Next, build Pro Forma Table (same loan schedule as the Waterfall Modeling page):
+prof.lap("pro forma build")
+loan_default = loan_defaults(hold_period)
+loan_terms = dict(
+    term_years=st.session_state.get("loan_term", loan_default["loan_term"]),
+    amort_years=st.session_state.get("amort_years", loan_default["amort_years"]),
+    io_months=st.session_state.get("io_months", loan_default["io_months"]),
+    refi_year=st.session_state.get("refi_year", 0),
+    refi_amount=value_after_renovation * st.session_state.get("refi_ltv", 0),
+    refi_rate_pct=st.session_state.get("refi_rate", interest_rate),
+)
+loan_monthly = hold_period_debt(debt, interest_rate, hold_period, monthly=True, **loan_terms)
+loan = hold_period_debt(debt, interest_rate, hold_period, **loan_terms)
 
-rows = []
+# Every line item is built month by month as one array (assuming no rent or expense growth to keep things simple):
+months = hold_period * 12
 occupancy = occupancy/100
 gross_income = units * rent * 12 * occupancy
-
-for year in range(1, hold_period + 1):
-    # Assuming no rent or expense growth to keep things simple:
-    income = gross_income
-    expenses = income * expense_ratio
-    noi = income - expenses
-    sale_proceeds = value_after_renovation if year == hold_period else 0
-
-    if year < hold_period:
-        debt_service = annual_debt_service
-        cash_flow = noi - debt_service
-    else:
-        debt_service = annual_debt_service + debt # Add debt repayment
-        cash_flow = noi - debt_service + value_after_renovation # Add sale proceeds
-
-    rows.append({
-        "Year": year,
-        "Gross Income": income,
-        "Operating Expenses": expenses,
-        "NOI": noi,
-        "Debt Service": debt_service,
-        "Proceeds from Sale": sale_proceeds,
-        "Cash Flow to Equity": cash_flow
-    })
-
-# Transpose the pro forma to match RE industry format:
-proforma_df = pd.DataFrame(rows)
+monthly_items = {"Gross Income": np.full(months, gross_income / 12)}
+monthly_items["Operating Expenses"] = monthly_items["Gross Income"] * expense_ratio
+monthly_items["NOI"] = monthly_items["Gross Income"] - monthly_items["Operating Expenses"]
+# Regular payments, plus loan payoffs (maturity, refinance or sale) net of any refinance proceeds:
+monthly_items["Debt Service"] = loan_monthly["payment"] + loan_monthly["balloon"] - loan_monthly["proceeds"]
+monthly_items["Proceeds from Sale"] = np.zeros(months)
+monthly_items["Proceeds from Sale"][-1] = value_after_renovation
+monthly_items["Cash Flow to Equity"] = monthly_items["NOI"] - monthly_items["Debt Service"] + monthly_items["Proceeds from Sale"]
+
+proforma_df = pd.DataFrame({name: to_annual(values) for name, values in monthly_items.items()})
+proforma_df.insert(0, "Year", np.arange(1, hold_period + 1))
+
+# Choose the table's periods:
+periods = st.radio("Pro Forma Periods", ["Annual", "Monthly"], horizontal=True)
+if periods == "Monthly":
+    # Transpose the pro forma to match RE industry format:
+    proforma_df_transposed = pd.DataFrame(monthly_items, index=pd.RangeIndex(1, months + 1, name="Month")).T
+    proforma_df_transposed.index.name = "Month:"
+else:
+    proforma_df_transposed = proforma_df.set_index("Year").T
+    proforma_df_transposed.index.name = "Year:"
 
 # Color coding & bolding pro forma line items for clarity and visual storytelling:
-proforma_df_transposed = proforma_df.set_index("Year").T
 def style_rows(row):
     if row.name == "Cash Flow to Equity":
         return ["font-weight: bold;" for _ in row]
@@ -72,18 +86,35 @@ def style_rows(row):
         return ["color: red;" for _ in row]
     else:
         return ["color: green" for _ in row]
-proforma_df_transposed.index.name = "Year:" 
+
+# The fast path marks rows with a prefix instead of per-cell CSS:
+ROW_MARKERS = {
+    "Gross Income": "🟢 ",
+    "Operating Expenses": "🔴 ",
+    "NOI": "🟢 ",
+    "Debt Service": "🔴 ",
+    "Proceeds from Sale": "🟢 ",
+    "Cash Flow to Equity": "💰 ",
+}
 
 # Finally, display Pro Forma Table:
+prof.lap("table serialization")
 st.markdown(f"### {hold_period}-Year Simple Pro Forma")
 #st.dataframe(
     #proforma_df_transposed.style.format("${:,.0f}")
 #)
-st.dataframe(
-    proforma_df_transposed.style
-        .format("${:,.0f}")
-        .apply(style_rows, axis=1)
-)
+# Styler builds HTML cell by cell, so wide tables (long holds, monthly periods) use the fast path:
+fast_rendering = st.toggle("Fast table rendering", value=proforma_df_transposed.shape[1] > STYLER_MAX_COLUMNS,
+                           help="Formats the numbers in bulk and shows one page of periods at a time. Used automatically for wide tables.")
+if fast_rendering:
+    show_wide_table(proforma_df_transposed, ROW_MARKERS, page_size=PAGE_SIZE, key="proforma_page",
+                    label="Months" if periods == "Monthly" else "Years")
+else:
+    st.dataframe(
+        proforma_df_transposed.style
+            .format("${:,.0f}")
+            .apply(style_rows, axis=1)
+    )
 
 st.markdown("""
 The table above shows key financial projections for each year of the investment:
@@ -95,8 +126,26 @@ The table above shows key financial projections for each year of the investment:
 - **Cash Flow**: The money available to investors each year 
 """)
 
+# Debt coverage metrics (from the regular loan payments, before payoffs):
+metrics = debt_metrics(proforma_df["NOI"].to_numpy(), loan, periods_per_year=1)
+debt_df = pd.DataFrame({
+    "Loan Balance (Start of Year)": loan["balance_begin"],
+    "DSCR": metrics["dscr"],
+    "Debt Yield": metrics["debt_yield"],
+}, index=proforma_df["Year"]).T
+st.markdown("### 🏦 Debt Metrics")
+st.dataframe(debt_df.style.format("${:,.0f}", subset=pd.IndexSlice[["Loan Balance (Start of Year)"], :])
+             .format("{:.2f}x", subset=pd.IndexSlice[["DSCR"], :], na_rep="-")
+             .format("{:.1%}", subset=pd.IndexSlice[["Debt Yield"], :], na_rep="-"))
+st.markdown("""
+- **DSCR** (Debt Service Coverage Ratio): NOI divided by the year's loan payments. Lenders usually want at least 1.20x–1.25x.
+- **Debt Yield**: NOI divided by the loan balance — the lender's return if it had to take the property back.
+""")
+
 
 # Adding a Visualization:
+prof.lap("chart")
+import matplotlib.pyplot as plt  # imported on first use to keep cold starts fast
 
 st.markdown("### 📊 Annual Cash Flow Components (Bar Chart)")
 
@@ -121,3 +170,6 @@ ax3.set_title("Annual Cash Flow Components")
 ax3.axhline(0, color="gray", linewidth=0.8)
 ax3.legend()
 st.pyplot(fig3)
+
+prof.finish()
+
@@ -0,0 +1,228 @@
+import os
+import time
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+from deal_model import DEFAULT_INPUTS, deal_inputs
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
+from scenario_export import EXPORT_DIR, FORMATS, bundle, export_scenarios
+from scenario_store import ScenarioStore
+from sweep import grid_size, run_sweep
+
+st.set_page_config(page_title="Scenario Sweep", layout="wide")
+prof = start_page("Scenario Sweep")
+prof.lap("inputs")
+st.title("🧪 Scenario Sweep")
+
+st.markdown("""
+A **scenario sweep** runs the Deal Visualizer and Waterfall model for every combination of assumptions you choose —
+for example every exit cap rate from 4% to 7% against every interest rate from 4% to 7% and every hold period from 3 to 10 years.
+
+It shows you which assumptions the returns are most sensitive to, and how bad the downside can get.
+The scenarios are split into chunks and run in parallel on every CPU core, and results appear as each chunk finishes.
+""")
+
+# Inputs that can be swept, labelled in the units the model uses:
+INPUT_LABELS = {
+    "purchase_price": "Acquisition Cost ($)",
+    "units": "Number of Units",
+    "current_rent": "Current Rent per Unit ($)",
+    "renovated_rent": "Renovated Rent per Unit ($)",
+    "renovation_cost_per_unit": "Renovation Cost per Unit ($)",
+    "occupancy_pre": "Current Occupancy Rate (%)",
+    "occupancy_post": "Stabilized Occupancy Rate (%)",
+    "expense_ratio": "Operating Expense Ratio (%)",
+    "hold_period": "Hold Period (Years)",
+    "stabilized_year": "Year Stabilized",
+    "exit_cap_rate": "Exit Cap Rate (decimal, 0.05 = 5%)",
+    "pref_rate": "Preferred Return (%)",
+    "gp_equity_pct": "GP Equity (decimal)",
+    "promote_pct": "Promote (decimal)",
+    "show_catchup": "GP Catch-Up (0 = off, 1 = on)",
+    "interest_rate": "Interest Rate (%)",
+    "debt_ratio": "Debt Ratio (decimal)",
+    "loan_term": "Loan Term (Years)",
+    "amort_years": "Amortization (Years, 0 = Interest-Only)",
+    "io_months": "Interest-Only Period (Months)",
+    "refi_year": "Refinance at End of Year (0 = none)",
+    "refi_ltv": "Refinance Loan-to-Value (decimal)",
+    "refi_rate": "Refinance Interest Rate (%)",
+}
+INPUT_NAMES = {label: name for name, label in INPUT_LABELS.items()}
+WHOLE_NUMBER_INPUTS = {"units", "hold_period", "stabilized_year", "loan_term", "amort_years", "io_months", "refi_year", "show_catchup"}
+
+RESULT_LABELS = {
+    "lp_irr": "LP IRR",
+    "gp_irr": "GP IRR",
+    "equity_irr": "Total Equity IRR",
+    "equity_multiple": "Equity Multiple",
+    "value_created": "Value Created ($)",
+    "min_dscr": "Minimum DSCR",
+}
+TOP_N = 25
+FORMAT_LABELS = {"parquet": "Parquet", "csv": "CSV", "xlsx": "Excel"}
+EXCEL_MAX_SCENARIOS = 20_000  # Excel is slow to write; bigger sweeps get a warning
+DOWNLOAD_MAX_MB = 200         # bigger exports stay on disk instead of going through the browser
+
+# Anything not swept uses the deal currently set up on the other pages:
+base = deal_inputs(st.session_state)
+if "total_project_cost" not in st.session_state:
+    st.info("Inputs you don't sweep use the app's default deal. Run the Deal Visualizer and Waterfall Modeling pages first to sweep around your own deal.")
+
+st.subheader("🎛️ Assumptions to Sweep")
+mode = st.radio("Scenarios", ["Grid of ranges", "Upload assumption sets (CSV)"], horizontal=True)
+
+grid, scenarios = None, None
+if mode == "Grid of ranges":
+    ranges = st.data_editor(
+        pd.DataFrame({
+            "Input": [INPUT_LABELS["exit_cap_rate"], INPUT_LABELS["interest_rate"], INPUT_LABELS["hold_period"]],
+            "Min": [0.04, 4.0, 3.0],
+            "Max": [0.07, 7.0, 10.0],
+            "Steps": [31, 13, 8],
+        }),
+        column_config={
+            "Input": st.column_config.SelectboxColumn("Input", options=list(INPUT_NAMES), required=True),
+            "Steps": st.column_config.NumberColumn("Steps", min_value=1, step=1),
+        },
+        num_rows="dynamic",
+        hide_index=True,
+        key="sweep_ranges",
+    )
+    grid = {}
+    for row in ranges.dropna().itertuples(index=False):
+        name = INPUT_NAMES[row.Input]
+        values = np.linspace(row.Min, row.Max, max(int(row.Steps), 1))
+        grid[name] = np.unique(np.rint(values)) if name in WHOLE_NUMBER_INPUTS else values
+    total = grid_size(grid) if grid else 0
+else:
+    st.markdown("Upload a CSV with **one row per scenario** and one column per input, named like: "
+                + ", ".join(f"`{name}`" for name in DEFAULT_INPUTS))
+    uploaded = st.file_uploader("Assumption sets (CSV)", type="csv")
+    if uploaded is not None:
+        scenarios = pd.read_csv(uploaded)
+        unknown = [c for c in scenarios.columns if c not in DEFAULT_INPUTS]
+        if unknown:
+            st.error(f"Unknown columns: {', '.join(unknown)}")
+            scenarios = None
+    total = len(scenarios) if scenarios is not None else 0
+
+st.metric("Scenarios", f"{total:,}")
+
+with st.expander("⚙️ Run Settings"):
+    cores = os.cpu_count() or 1
+    workers = st.number_input("Worker Processes", min_value=1, max_value=max(cores, 1) * 2, value=cores)
+    chunk_size = st.number_input("Scenarios per Chunk", min_value=100, max_value=200_000, value=20_000, step=1000)
+    timeout = st.number_input("Chunk Timeout (Seconds)", min_value=5, max_value=3600, value=300)
+    st.caption("Bigger chunks have less overhead; smaller chunks give more frequent progress updates.")
+
+run = st.button("▶️ Run Sweep", disabled=total == 0)
+
+# Run the sweep, streaming each finished chunk into the progress bar and tables:
+prof.lap("sweep")
+if run:
+    progress = st.progress(0.0, text="Starting worker processes...")
+    top_table = st.empty()
+    parts, failures, top = [], [], None
+    start_time, last_update = time.perf_counter(), 0.0
+    for update in run_sweep(grid=grid, scenarios=scenarios, base=base, chunk_size=int(chunk_size),
+                            workers=int(workers), timeout=timeout):
+        if update["error"]:
+            failures.append({"Scenarios": f"{update['start']:,}–{update['stop'] - 1:,}", "Error": update["error"]})
+        else:
+            parts.append(update["results"])
+            best = update["results"].nlargest(TOP_N, "lp_irr")
+            top = best if top is None else pd.concat([top, best]).nlargest(TOP_N, "lp_irr")
+
+        # Redraw at most a few times a second:
+        now = time.perf_counter()
+        if now - last_update > 0.5 or update["done"] == update["total"]:
+            last_update = now
+            rate = update["done"] / (now - start_time)
+            progress.progress(update["done"] / update["total"],
+                              text=f"{update['done']:,} of {update['total']:,} scenarios ({rate:,.0f} per second)")
+            if top is not None:
+                top_table.dataframe(top.rename(columns=RESULT_LABELS), use_container_width=True)
+
+    st.session_state["sweep_results"] = pd.concat(parts) if parts else None
+    st.session_state["sweep_base"] = base  # (the inputs that weren't swept, saved with the results)
+    st.session_state["sweep_failures"] = failures
+    top_table.empty()
+
+# Show the latest results:
+prof.lap("results")
+results = st.session_state.get("sweep_results")
+failures = st.session_state.get("sweep_failures", [])
+if failures:
+    st.warning(f"{len(failures)} chunk(s) failed; the results below are from the scenarios that finished.")
+    st.dataframe(pd.DataFrame(failures), hide_index=True)
+
+if results is not None and len(results):
+    st.subheader("📊 Results")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Scenarios Run", f"{len(results):,}")
+    col2.metric("Median LP IRR", f"{results['lp_irr'].median() * 100:.2f}%")
+    col3.metric("Worst LP IRR", f"{results['lp_irr'].min() * 100:.2f}%")
+    col4.metric("Scenarios Losing Value", f"{(results['value_created'] < 0).mean() * 100:.1f}%")
+
+    st.markdown("#### Return Distribution")
+    percentiles = results[list(RESULT_LABELS)].quantile([0.05, 0.25, 0.5, 0.75, 0.95]).rename(columns=RESULT_LABELS)
+    percentiles.index = ["5th Percentile", "25th Percentile", "Median", "75th Percentile", "95th Percentile"]
+    st.dataframe(percentiles.T.style.format("{:,.3f}"))
+
+    st.markdown(f"#### Top {TOP_N} Scenarios by LP IRR")
+    st.dataframe(results.nlargest(TOP_N, "lp_irr").rename(columns={**INPUT_LABELS, **RESULT_LABELS}), use_container_width=True)
+
+    # Sensitivity of the median LP IRR to each swept input:
+    swept = [c for c in results.columns if c in INPUT_LABELS]
+    if swept:
+        st.markdown("#### Sensitivity")
+        driver = st.selectbox("Median LP IRR by", swept, format_func=INPUT_LABELS.get)
+        st.line_chart(results.groupby(driver)["lp_irr"].median().rename("Median LP IRR"))
+
+    # Save every scenario of the sweep to the scenario store (see the Saved Scenarios page):
+    st.markdown("#### 💾 Save This Sweep")
+    col1, col2, col3 = st.columns([2, 2, 1])
+    sweep_name = col1.text_input("Sweep Name", value="Scenario Sweep")
+    sweep_tags = col2.text_input("Tags (comma-separated)", key="sweep_tags", placeholder="e.g. stress test")
+    col3.write("")
+    if col3.button("💾 Save Sweep", use_container_width=True):
+        with st.spinner(f"Saving {len(results):,} scenarios..."):
+            sweep_id = ScenarioStore().save_sweep(results, base=st.session_state.get("sweep_base", base), name=sweep_name,
+                                                  tags=[t.strip() for t in sweep_tags.split(",") if t.strip()])
+        st.success(f"Saved as sweep #{sweep_id}. Find its best scenarios on the Saved Scenarios page.")
+
+    # Export every scenario's pro forma, cash flows and waterfall, computed and written a chunk at a time:
+    st.markdown("#### 📤 Export Pro Formas & Waterfalls")
+    st.caption("Writes four tables — scenarios, pro forma, cash flows and waterfall distributions (one row per scenario and year). "
+               "Scenarios are computed and written in chunks, so even million-scenario sweeps export within a fixed amount of memory.")
+    export_format = st.radio("Format", FORMATS, format_func=FORMAT_LABELS.get, horizontal=True)
+    if export_format == "xlsx" and len(results) > EXCEL_MAX_SCENARIOS:
+        st.warning(f"Excel files are slow to write for {len(results):,} scenarios (and long tables are split across sheets). "
+                   "Parquet or CSV is much faster for big sweeps.")
+    if st.button("📤 Export"):
+        name = f"sweep-{time.strftime('%Y%m%d-%H%M%S')}"
+        out = EXPORT_DIR / (f"{name}.xlsx" if export_format == "xlsx" else f"{name}-{export_format}")
+        export_progress = st.progress(0.0, text="Exporting...")
+        for update in export_scenarios(results, out, export_format, base=st.session_state.get("sweep_base", base)):
+            export_progress.progress(update["done"] / update["total"],
+                                     text=f"{update['done']:,} of {update['total']:,} scenarios exported")
+        st.session_state["sweep_export"] = bundle(out, export_format)
+    export_path = st.session_state.get("sweep_export")
+    if export_path is not None and export_path.exists():
+        size_mb = export_path.stat().st_size / 1024 / 1024
+        if size_mb <= DOWNLOAD_MAX_MB:
+            # The file is only read into the page when asked for (not on every rerun), and let go once downloaded:
+            if st.session_state.get("sweep_download") == export_path:
+                with open(export_path, "rb") as export_file:
+                    st.download_button(f"⬇️ Download {export_path.name} ({size_mb:,.1f} MB)", data=export_file,
+                                       file_name=export_path.name, on_click=lambda: st.session_state.pop("sweep_download", None))
+            elif st.button(f"📦 Prepare Download ({size_mb:,.1f} MB)"):
+                st.session_state["sweep_download"] = export_path
+                st.rerun()
+        else:
+            st.info(f"Exported to `{export_path}` ({size_mb:,.0f} MB) — too big to download through the browser.")
+
+prof.finish()
@@ -0,0 +1,115 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from backtest import load_history, run_backtest
+from deal_model import deal_inputs
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
+
+st.set_page_config(page_title="Vintage Backtest", layout="wide")
+prof = start_page("Vintage Backtest")
+prof.lap("inputs")
+st.title("🕰️ Vintage Backtest")
+
+st.markdown("""
+A **vintage backtest** asks: *if I had bought this deal in any month of the past, and held it for N years, what return would the LP have earned?*
+
+For every acquisition month (the deal's **vintage**) and hold period in a market history, the model is replayed with:
+- renovated rents growing at the market's rent growth from the month of purchase
+- a loan rate equal to the market interest rate at purchase plus a spread
+- a purchase price set by the market cap rate at purchase (optional)
+- an exit value based on the market cap rate in the month of sale
+
+The spread of results shows how much of a deal's return depends on *when* it's bought and sold.
+""")
+
+st.warning("The bundled market history is **synthetic, illustrative sample data** — it is not actual market history. "
+           "Upload your own monthly history for real analysis.")
+
+
+@st.cache_data
+def cached_history(uploaded_bytes):
+    import io
+    return load_history(io.BytesIO(uploaded_bytes)) if uploaded_bytes else load_history()
+
+
+@st.cache_data
+def cached_backtest(history, hold_periods, base, loan_spread, exit_cap_spread, price_at_market_cap):
+    return run_backtest(history, hold_periods, base, loan_spread, exit_cap_spread, price_at_market_cap)
+
+
+# Market history (bundled sample or upload):
+st.subheader("📈 Market History")
+uploaded = st.file_uploader("Upload a monthly market history (CSV with month, rent_growth, cap_rate, interest_rate)", type="csv")
+try:
+    history = cached_history(uploaded.getvalue() if uploaded is not None else None)
+except ValueError as exc:
+    st.error(f"Couldn't read that file: {exc}")
+    st.stop()
+
+st.caption(f"{len(history):,} months: {history['month'].iloc[0]} to {history['month'].iloc[-1]}")
+st.line_chart(history.assign(month=history["month"].dt.to_timestamp()).set_index("month")
+              .rename(columns={"rent_growth": "Rent Growth (%)", "cap_rate": "Cap Rate (%)", "interest_rate": "Interest Rate (%)"}))
+
+# Backtest assumptions:
+st.subheader("🎛️ Backtest Assumptions")
+max_hold = max(1, min(20, len(history) // 12 - 1))
+col1, col2 = st.columns(2)
+with col1:
+    hold_periods = st.multiselect("Hold Periods (Years)", list(range(1, max_hold + 1)),
+                                  default=[h for h in (3, 5, 7, 10) if h <= max_hold])
+    price_at_market_cap = st.checkbox("Set Purchase Price from the Market Cap Rate", value=True)
+with col2:
+    loan_spread = st.number_input("Loan Spread over Market Interest Rate (%)", 0.0, 10.0, value=2.0, step=0.25)
+    exit_cap_spread = st.number_input("Exit Cap Rate Spread over Market (%)", -2.0, 5.0, value=0.0, step=0.25)
+
+with st.expander("How are the deal's other assumptions set?"):
+    st.markdown("""
+    Units, rents, renovation costs, occupancy, expenses, the waterfall and the loan's leverage and amortization all come from
+    the deal you set up on the **Deal Visualizer** and **Waterfall Modeling** pages (or the app's defaults).
+    The loan term is extended to the hold period if it's shorter, so the loan never matures before the sale.
+    """)
+
+base = deal_inputs(st.session_state)
+
+# Run every vintage x hold period:
+prof.lap("backtest")
+if not hold_periods:
+    st.info("Pick at least one hold period.")
+    st.stop()
+results = cached_backtest(history, tuple(sorted(hold_periods)), base, loan_spread, exit_cap_spread, price_at_market_cap)
+if results.empty:
+    st.error("The market history is too short for the selected hold periods.")
+    st.stop()
+
+# Display the distribution of realized LP IRRs:
+prof.lap("results")
+st.subheader("📊 Realized LP IRRs")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Vintages x Hold Periods", f"{len(results):,}")
+col2.metric("Median LP IRR", f"{results['lp_irr'].median() * 100:.2f}%")
+col3.metric("Worst LP IRR", f"{results['lp_irr'].min() * 100:.2f}%")
+col4.metric("Vintages Losing Money", f"{(results['lp_irr'] < 0).mean() * 100:.1f}%")
+
+summary = results.groupby("hold_period")["lp_irr"].describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95])
+summary = summary.drop(columns=["mean", "std"]).rename(columns={"count": "Vintages", "min": "Worst", "max": "Best"})
+summary.index.name = "Hold Period (Years)"
+st.dataframe(summary.style.format("{:.2%}").format("{:,.0f}", subset=["Vintages"]))
+
+st.markdown("#### LP IRR by Vintage")
+by_vintage = results.pivot(index="vintage", columns="hold_period", values="lp_irr")
+by_vintage.index = by_vintage.index.to_timestamp()
+by_vintage.columns = [f"{h}-Year Hold" for h in by_vintage.columns]
+st.line_chart(by_vintage * 100)
+st.caption("Each point is the LP IRR (%) of a deal bought in that month and sold after the hold period.")
+
+st.markdown("#### Distribution")
+hold = st.selectbox("Hold Period", sorted(results["hold_period"].unique()), format_func=lambda h: f"{h} years")
+irrs = results.loc[results["hold_period"] == hold, "lp_irr"].dropna() * 100
+counts, edges = np.histogram(irrs, bins=30)
+st.bar_chart(pd.Series(counts, index=[f"{lo:.1f}%" for lo in edges[:-1]], name="Vintages"))
+
+with st.expander("📄 All Vintages"):
+    st.dataframe(results, use_container_width=True)
+
+prof.finish()
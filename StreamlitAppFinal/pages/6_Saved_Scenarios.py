@@ -0,0 +1,130 @@
+import streamlit as st
+import pandas as pd
+from deal_model import deal_inputs
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
+from scenario_store import INDEXED_COLUMNS, ScenarioStore
+
+st.set_page_config(page_title="Saved Scenarios", layout="wide")
+prof = start_page("Saved Scenarios")
+prof.lap("store")
+st.title("💾 Saved Scenarios")
+
+st.markdown("""
+Save the deal you've set up on the other pages — or a whole **Scenario Sweep** — to a scenario store on disk,
+so it's still there next time. Find the best saved scenarios by any key metric, and reopen one to see its results
+and pro forma without recalculating anything.
+""")
+
+# Labels for the stored metrics you can rank and filter by:
+METRIC_LABELS = {
+    "lp_irr": "LP IRR",
+    "gp_irr": "GP IRR",
+    "equity_irr": "Total Equity IRR",
+    "equity_multiple": "Equity Multiple",
+    "value_created": "Value Created ($)",
+    "noi_renovated": "Stabilized NOI ($)",
+    "debt_ratio": "Debt Ratio",
+}
+TABLE_COLUMNS = ["name", "sweep_id", "lp_irr", "gp_irr", "equity_irr", "equity_multiple", "value_created",
+                 "noi_renovated", "debt_ratio", "interest_rate", "exit_cap_rate", "hold_period", "purchase_price"]
+
+
+@st.cache_resource
+def scenario_store():
+    return ScenarioStore()
+
+
+store = scenario_store()
+
+# Save the deal currently set up on the other pages:
+st.subheader("📥 Save the Current Deal")
+if "total_project_cost" not in st.session_state:
+    st.info("Set up a deal on the Deal Visualizer and Waterfall Modeling pages first; until then the app's default deal is saved.")
+col1, col2, col3 = st.columns([2, 2, 1])
+deal_name = col1.text_input("Scenario Name", value="My Deal")
+deal_tags = col2.text_input("Tags (comma-separated)", placeholder="e.g. fund II, base case")
+col3.write("")
+# The store evaluates deals with the single promote, so a deal set up with IRR hurdles would be saved with the wrong IRRs:
+hurdles_active = st.session_state.get("promote_structure") == "IRR Hurdles"
+if hurdles_active:
+    st.warning("The Waterfall Modeling page is set to **IRR Hurdles**, which saved scenarios don't support yet "
+               "(they use the single promote). Switch the Promote Structure to Single Promote to save this deal.")
+if col3.button("💾 Save Deal", use_container_width=True, disabled=hurdles_active):
+    inputs = deal_inputs(st.session_state)
+    scenario_id = store.save_deal(inputs, name=deal_name, tags=[t.strip() for t in deal_tags.split(",") if t.strip()])
+    st.session_state["open_scenario"] = scenario_id
+    st.success(f"Saved scenario #{scenario_id}.")
+
+st.divider()
+
+# Find saved scenarios (the ranking metric and debt ratio have indexes, so this stays fast for millions of rows):
+prof.lap("query")
+st.subheader("🔎 Find Scenarios")
+sweeps = store.sweeps()
+all_tags = store.tags()
+col1, col2, col3, col4 = st.columns(4)
+by = col1.selectbox("Rank By", INDEXED_COLUMNS, format_func=METRIC_LABELS.get)
+lowest = col1.checkbox("Lowest first")
+top_n = col2.number_input("How Many", min_value=1, max_value=10_000, value=100, step=50)
+max_debt = col2.slider("Max Debt Ratio (%)", 0, 100, value=100)
+sweep_options = {"All scenarios": None, "Saved deals only": 0,
+                 **{f"Sweep #{i}: {row['name']} ({row['scenarios']:,} scenarios)": i for i, row in sweeps.iterrows()}}
+sweep_choice = col3.selectbox("From", list(sweep_options))
+min_value_created = col3.number_input("Min Value Created ($)", value=None, placeholder="No minimum")
+tag_filter = col4.multiselect("With Tags", list(all_tags), format_func=lambda t: f"{t} ({all_tags[t]:,})")
+
+bounds = {}
+if max_debt < 100:
+    bounds["debt_ratio"] = (None, max_debt / 100)
+if min_value_created is not None:
+    bounds["value_created"] = (min_value_created, None)
+found = store.top_scenarios(by=by, n=int(top_n), bounds=bounds, tags=tag_filter,
+                            sweep_id=sweep_options[sweep_choice], ascending=lowest)
+st.caption(f"{store.count():,} scenarios saved.")
+
+if len(found):
+    st.dataframe(found[TABLE_COLUMNS].rename(columns={**METRIC_LABELS, "name": "Name", "sweep_id": "Sweep"}),
+                 use_container_width=True)
+    picked = st.selectbox("Open Scenario", found.index,
+                          format_func=lambda i: f"#{i} {found.at[i, 'name'] or ''} — LP IRR {found.at[i, 'lp_irr'] * 100:.2f}%")
+    if st.button("📂 Open"):
+        st.session_state["open_scenario"] = int(picked)
+else:
+    st.info("No saved scenarios match.")
+
+# Show an opened scenario straight from the store:
+prof.lap("scenario")
+if "open_scenario" in st.session_state:
+    try:
+        scenario = store.load(st.session_state["open_scenario"])
+    except KeyError:
+        del st.session_state["open_scenario"]
+        st.rerun()
+    st.divider()
+    title = scenario["name"] or (f"Sweep #{scenario['sweep_id']} scenario" if scenario["sweep_id"] else "Scenario")
+    st.subheader(f"📄 #{scenario['id']}: {title}")
+    st.caption(f"Saved {scenario['created']}" + (f" • Tags: {', '.join(scenario['tags'])}" if scenario["tags"] else ""))
+    results = scenario["results"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("LP IRR", f"{results['lp_irr'] * 100:.2f}%")
+    col2.metric("GP IRR", f"{results['gp_irr'] * 100:.2f}%")
+    col3.metric("Value Created", f"${results['value_created']:,.0f}")
+    col4.metric("Stabilized NOI", f"${results['noi_renovated']:,.0f}")
+
+    st.markdown(f"#### {scenario['inputs']['hold_period']}-Year Pro Forma")
+    st.dataframe(scenario["pro_forma"].set_index("Year").T.style.format("${:,.0f}"))
+    with st.expander("Assumptions"):
+        st.dataframe(pd.Series(scenario["inputs"], name="Value").astype(str), use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    if col1.button("↩️ Use These Assumptions in the App"):
+        # The other pages read their inputs from st.session_state:
+        st.session_state.update(scenario["inputs"])
+        st.success("Loaded. Open the Deal Visualizer to continue with this deal.")
+    if col2.button("🗑️ Delete Scenario"):
+        store.delete([scenario["id"]])
+        del st.session_state["open_scenario"]
+        st.rerun()
+
+prof.finish()
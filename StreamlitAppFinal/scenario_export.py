@@ -0,0 +1,186 @@
+"""
+Streaming export of many scenarios' pro formas, cash flows and waterfall distributions.
+
+    for update in export_scenarios(sweep_results, "exports/sweep", "parquet", base=base):
+        progress.progress(update["done"] / update["total"])
+
+Four tables are written, in long format (one row per scenario and year) and keyed by a scenario column:
+    scenarios    every input and headline result (one row per scenario)
+    pro_forma    income, expenses, NOI, debt service, sale proceeds and cash flow to equity, years 1..N
+    cash_flows   equity contributions and cash flows to the project, the LPs and the GP, years 0..N
+    waterfall    each year's distributions by tier (LP / GP), unreturned capital and accrued pref
+
+Scenarios are computed a chunk at a time (deal_model.scenario_tables) and each chunk is written out
+before the next one is computed, so memory stays within a fixed budget however many scenarios there
+are:
+    parquet   one file per table, one row group per chunk (pyarrow.parquet.ParquetWriter)
+    csv       one file per table, appended chunk by chunk (pyarrow.csv.CSVWriter)
+    xlsx      one workbook with a sheet per table (openpyxl in write-only mode, which streams rows to
+              disk). A sheet holds at most 1,048,576 rows, so long tables continue on "Pro Forma (2)", ...
+              Excel is far slower to write than the other formats; use it for hundreds or thousands of
+              scenarios, Parquet or CSV for big sweeps.
+
+The chunk size comes from the memory budget (DEAL_EXPORT_MEMORY_MB, default 256) and the longest hold.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+from deal_model import DEFAULT_INPUTS, scenario_tables
+from sweep import expand_grid, grid_size
+
+FORMATS = ["parquet", "csv", "xlsx"]
+SHEET_NAMES = {"scenarios": "Scenarios", "pro_forma": "Pro Forma", "cash_flows": "Cash Flows", "waterfall": "Waterfall"}
+MEMORY_MB = float(os.environ.get("DEAL_EXPORT_MEMORY_MB", 256))
+EXPORT_DIR = Path(os.environ.get("DEAL_EXPORT_DIR", Path(__file__).parent / "exports"))
+# Bytes a chunk needs per value written: the model's intermediate arrays, the DataFrame and the
+# writer's Arrow / row buffers (measured, with some headroom):
+BYTES_PER_VALUE = 64
+VALUES_PER_YEAR = 26         # pro forma + cash flow + waterfall columns, plus scenario / year
+VALUES_PER_SCENARIO = 36     # the scenarios table
+EXCEL_MAX_ROWS = 1_048_576   # rows per worksheet, including the header
+
+
+def chunk_size(max_hold_period, memory_mb=MEMORY_MB):
+    """Scenarios per chunk so one chunk's tables fit in memory_mb."""
+    values = VALUES_PER_SCENARIO + VALUES_PER_YEAR * (int(max_hold_period) + 1)
+    return max(int(memory_mb * 1024 * 1024 / (BYTES_PER_VALUE * values)), 1)
+
+
+def export_paths(out, fmt):
+    """Where export_scenarios() writes: {table: path} (one .xlsx for every table in Excel format)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "xlsx":
+        return {table: Path(out) for table in SHEET_NAMES}
+    return {table: Path(out) / f"{table}.{fmt}" for table in SHEET_NAMES}
+
+
+def export_scenarios(scenarios=None, out="exports", fmt="parquet", grid=None, base=None, memory_mb=MEMORY_MB):
+    """
+    Compute and write the tables of every scenario, yielding {"done", "total"} after each chunk.
+
+    scenarios: a DataFrame of assumption sets, e.g. a sweep's results (columns named like DEFAULT_INPUTS
+        are used, anything else is ignored; the index becomes the scenario id), or
+    grid: {input name: [values, ...]}, expanded a chunk at a time (scenario id = position in the grid)
+    base: values for the inputs that aren't in the scenarios (defaults to DEFAULT_INPUTS)
+    out: a folder for parquet / csv, a .xlsx path for Excel
+    """
+    if (grid is None) == (scenarios is None):
+        raise ValueError("Pass either a grid or a table of scenarios.")
+    base = {**DEFAULT_INPUTS, **(base or {})}
+    if grid is not None:
+        total = grid_size(grid)
+        holds = grid.get("hold_period", [base["hold_period"]])
+    else:
+        scenarios = scenarios[[name for name in scenarios.columns if name in DEFAULT_INPUTS]]
+        total = len(scenarios)
+        holds = scenarios["hold_period"] if "hold_period" in scenarios else [base["hold_period"]]
+    size = chunk_size(np.max(holds) if len(holds) else 1, memory_mb)
+
+    writer = _WRITERS[fmt](export_paths(out, fmt))
+    try:
+        for start in range(0, total, size):
+            stop = min(start + size, total)
+            chunk = expand_grid(grid, start, stop) if grid is not None else scenarios.iloc[start:stop]
+            inputs = {**{name: value for name, value in base.items() if name not in chunk},
+                      **{name: chunk[name].to_numpy() for name in chunk.columns}}
+            tables = scenario_tables(scenario_ids=chunk.index.to_numpy(), **inputs)
+            for table, frame in tables.items():
+                if table != "scenarios":
+                    frame = frame.round(2)  # (dollar amounts, to the cent)
+                writer.write(table, frame)
+            del tables
+            yield {"done": stop, "total": total}
+    finally:
+        writer.close()
+
+
+class _ParquetWriter:
+    def __init__(self, paths):
+        import pyarrow.parquet as pq
+        self._pq = pq
+        self.paths = paths
+        self.writers = {}
+
+    def write(self, table, frame):
+        import pyarrow as pa
+        batch = pa.Table.from_pandas(frame, preserve_index=False)
+        if table not in self.writers:
+            self.paths[table].parent.mkdir(parents=True, exist_ok=True)
+            self.writers[table] = self._pq.ParquetWriter(self.paths[table], batch.schema)
+        self.writers[table].write_table(batch, row_group_size=len(frame))  # (one row group per chunk)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+class _CsvWriter:
+    def __init__(self, paths):
+        self.paths = paths
+        self.writers = {}
+
+    def write(self, table, frame):
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        batch = pa.Table.from_pandas(frame, preserve_index=False)
+        if table not in self.writers:
+            self.paths[table].parent.mkdir(parents=True, exist_ok=True)
+            self.writers[table] = pacsv.CSVWriter(self.paths[table], batch.schema)
+        self.writers[table].write_table(batch)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+class _ExcelWriter:
+    def __init__(self, paths):
+        from openpyxl import Workbook
+        self.path = next(iter(paths.values()))
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}  # table -> (current sheet, rows in it, sheets so far)
+
+    def _sheet(self, table, columns):
+        sheet, rows, count = self.sheets.get(table, (None, 0, 0))
+        if sheet is None or rows >= EXCEL_MAX_ROWS:
+            count += 1
+            sheet = self.workbook.create_sheet(SHEET_NAMES[table] + (f" ({count})" if count > 1 else ""))
+            sheet.append(list(columns))
+            rows = 1
+        self.sheets[table] = (sheet, rows, count)
+        return sheet, rows
+
+    def write(self, table, frame):
+        start = 0
+        while start < len(frame):
+            sheet, rows = self._sheet(table, frame.columns)
+            part = frame.iloc[start:start + EXCEL_MAX_ROWS - rows]
+            for row in part.itertuples(index=False, name=None):
+                sheet.append(row)
+            self.sheets[table] = (sheet, rows + len(part), self.sheets[table][2])
+            start += len(part)
+
+    def close(self):
+        if not self.sheets:
+            self.workbook.create_sheet(SHEET_NAMES["scenarios"])  # (a workbook needs a sheet)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.workbook.save(self.path)
+
+
+def bundle(out, fmt):
+    """One file to download: the workbook itself, or a .zip of the parquet / csv files (built file by file)."""
+    if fmt == "xlsx":
+        return Path(out)
+    import zipfile
+    archive = Path(out).with_suffix(".zip")
+    # (Parquet is already compressed; CSV shrinks a lot)
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED if fmt == "csv" else zipfile.ZIP_STORED) as bundle_zip:
+        for path in export_paths(out, fmt).values():
+            bundle_zip.write(path, path.name)
+    return archive
+
+
+_WRITERS = {"parquet": _ParquetWriter, "csv": _CsvWriter, "xlsx": _ExcelWriter}
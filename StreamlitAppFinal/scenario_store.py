@@ -0,0 +1,269 @@
+"""
+On-disk store of saved deal scenarios (one SQLite file), so deals and sweep results outlive the session.
+
+Usage:
+
+    store = ScenarioStore()                                    # data/scenarios.db (or DEAL_STORE_PATH)
+    scenario_id = store.save_deal(inputs, name="Base case", tags=["fund II"])
+    sweep_id = store.save_sweep(sweep_results, base, name="Cap rate x rate", tags=["stress"])
+    store.top_scenarios(by="lp_irr", n=100, bounds={"debt_ratio": (None, 0.65)})
+    store.load(scenario_id)                                    # inputs, results and pro forma, no recompute
+
+Each scenario is one row of the scenarios table: every deal input (one column per DEFAULT_INPUTS name,
+same units), every result (RESULT_COLUMNS) and the year-by-year pro forma as JSON. The key metrics
+have their own indexes, so "top N by LP IRR" walks the lp_irr index from the top and stops after N
+matching rows instead of sorting the table. Tags live in their own tables, keyed (tag, scenario) and,
+for tags given to a whole sweep, (tag, sweep), so tagging a million-scenario sweep is one row.
+
+Sweep results are inserted in batches inside one transaction. For big sweeps the metric indexes are
+dropped and rebuilt after the insert (building an index from sorted values is several times faster
+than updating it row by row). Their pro formas aren't stored up front (a year-by-year table per
+scenario would dwarf everything else); a sweep scenario's pro forma is built the first time it's
+opened and saved with it.
+
+Every call opens its own short-lived connection, so one store can be shared by all Streamlit sessions.
+The file uses write-ahead logging: readers aren't blocked while a sweep is being saved.
+"""
+import io
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from deal_model import DEFAULT_INPUTS, RESULT_COLUMNS, evaluate_deals, pro_forma
+
+STORE_PATH = os.environ.get("DEAL_STORE_PATH", str(Path(__file__).parent / "data" / "scenarios.db"))
+INSERT_BATCH = 50_000  # scenarios per executemany() call when saving a sweep
+REBUILD_ROWS = 100_000  # sweeps at least this big rebuild the metric indexes after inserting
+CACHE_MB = 256          # SQLite page cache while saving a sweep
+WIDE_TAG_ROWS = 50_000  # tags on more scenarios than this are filtered while walking the ranking index
+
+INPUT_COLUMNS = list(DEFAULT_INPUTS)
+SCENARIO_COLUMNS = INPUT_COLUMNS + RESULT_COLUMNS
+# Metrics with an index (what scenarios are usually ranked or filtered by):
+INDEXED_COLUMNS = ["lp_irr", "gp_irr", "equity_irr", "equity_multiple", "value_created", "noi_renovated", "debt_ratio"]
+METRIC_INDEXES = [f"CREATE INDEX IF NOT EXISTS scenarios_by_{name} ON scenarios({name})" for name in INDEXED_COLUMNS]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sweeps (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    created TEXT NOT NULL,
+    scenarios INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    sweep_id INTEGER REFERENCES sweeps(id) ON DELETE CASCADE,
+    created TEXT NOT NULL,
+    {", ".join(f"{name} REAL" for name in SCENARIO_COLUMNS)},
+    pro_forma TEXT
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, scenario_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sweep_tags (
+    tag TEXT NOT NULL,
+    sweep_id INTEGER NOT NULL REFERENCES sweeps(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, sweep_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_by_scenario ON tags(scenario_id);
+CREATE INDEX IF NOT EXISTS scenarios_by_sweep ON scenarios(sweep_id);
+{"".join(statement + ";" for statement in METRIC_INDEXES)}
+"""
+
+
+class ScenarioStore:
+    """Saved deals and sweep results in a SQLite file."""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One connection per call (a transaction: committed at the end, rolled back on an error)
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            db.execute("PRAGMA foreign_keys=ON")
+            db.execute("PRAGMA synchronous=NORMAL")
+            with db:
+                yield db
+
+    # -- Saving --
+
+    def save_deal(self, inputs, name=None, tags=()):
+        """
+        Evaluate one deal (a dict of DEFAULT_INPUTS values, single-promote waterfall), save it with its results
+        and pro forma; returns its id.
+        """
+        inputs = {key: inputs.get(key, default) for key, default in DEFAULT_INPUTS.items()}
+        results = evaluate_deals(**inputs).iloc[0]
+        row = [float(inputs[key]) for key in INPUT_COLUMNS] + [float(results[key]) for key in RESULT_COLUMNS]
+        with self._connect() as db:
+            cursor = db.execute(
+                f"INSERT INTO scenarios (name, created, {', '.join(SCENARIO_COLUMNS)}, pro_forma) "
+                f"VALUES (?, ?, {', '.join('?' * len(SCENARIO_COLUMNS))}, ?)",
+                [name, _now(), *row, _pro_forma_json(pro_forma(**inputs))])
+            self._tag(db, [cursor.lastrowid], tags)
+        return cursor.lastrowid
+
+    def save_sweep(self, results, base=None, name="Sweep", tags=()):
+        """
+        Save a sweep's results (a DataFrame of swept inputs + RESULT_COLUMNS, as run_sweep yields) as one
+        scenario per row; inputs that weren't swept come from base (default DEFAULT_INPUTS). Returns the sweep's id.
+        """
+        base = {**DEFAULT_INPUTS, **(base or {})}
+        rebuild = len(results) >= REBUILD_ROWS
+        with self._connect() as db:
+            db.execute(f"PRAGMA cache_size=-{CACHE_MB * 1024}")
+            sweep_id = db.execute("INSERT INTO sweeps (name, created) VALUES (?, ?)", [name, _now()]).lastrowid
+            if rebuild:
+                for column in INDEXED_COLUMNS:
+                    db.execute(f"DROP INDEX IF EXISTS scenarios_by_{column}")
+            insert = (f"INSERT INTO scenarios (sweep_id, created, {', '.join(SCENARIO_COLUMNS)}) "
+                      f"VALUES ({sweep_id}, '{_now()}', {', '.join('?' * len(SCENARIO_COLUMNS))})")
+            for start in range(0, len(results), INSERT_BATCH):
+                chunk = results.iloc[start:start + INSERT_BATCH]
+                # (one float array per batch, so sqlite3 gets plain Python floats)
+                values = np.column_stack([chunk[key].to_numpy(dtype=float) if key in chunk
+                                          else np.full(len(chunk), float(base[key])) for key in SCENARIO_COLUMNS])
+                db.executemany(insert, values.tolist())
+            if rebuild:
+                for statement in METRIC_INDEXES:
+                    db.execute(statement)
+            db.execute("UPDATE sweeps SET scenarios = ? WHERE id = ?", [len(results), sweep_id])
+            db.executemany("INSERT OR IGNORE INTO sweep_tags (tag, sweep_id) VALUES (?, ?)", [(tag, sweep_id) for tag in tags])
+        return sweep_id
+
+    def add_tags(self, scenario_ids, tags):
+        with self._connect() as db:
+            self._tag(db, scenario_ids, tags)
+
+    def _tag(self, db, scenario_ids, tags):
+        db.executemany("INSERT OR IGNORE INTO tags (tag, scenario_id) VALUES (?, ?)",
+                       [(tag, int(i)) for tag in tags for i in scenario_ids])
+
+    def delete(self, scenario_ids=(), sweep_id=None):
+        """Delete scenarios by id, or a whole sweep with its scenarios."""
+        with self._connect() as db:
+            if sweep_id is not None:
+                db.execute("DELETE FROM sweeps WHERE id = ?", [sweep_id])
+            db.executemany("DELETE FROM scenarios WHERE id = ?", [(int(i),) for i in scenario_ids])
+
+    # -- Queries --
+
+    def top_scenarios(self, by="lp_irr", n=100, bounds=None, tags=(), sweep_id=None, ascending=False):
+        """
+        The n best scenarios by a stored column (highest first, or lowest with ascending=True), as a
+        DataFrame indexed by scenario id.
+
+        bounds: {column: (low, high)} inclusive limits, None for an open end, e.g. {"debt_ratio": (None, 0.65)}
+        tags: only scenarios with every one of these tags (on the scenario or its sweep)
+        sweep_id: only scenarios from this sweep (0 = only deals saved on their own)
+        """
+        _check_columns([by, *(bounds or {})])
+        where, params = [f"{by} IS NOT NULL"], []
+        for column, (low, high) in (bounds or {}).items():
+            if low is not None:
+                where.append(f"{column} >= ?")
+                params.append(float(low))
+            if high is not None:
+                where.append(f"{column} <= ?")
+                params.append(float(high))
+        counts = self.tags() if tags else {}
+        for tag in tags:
+            # A rare tag is fastest looked up first (then sorted); for a tag on a big sweep it's faster to walk
+            # the ranking index and check each row, so the unary + keeps SQLite from using the sweep index:
+            sweep_column = "+sweep_id" if counts.get(tag, 0) > WIDE_TAG_ROWS else "sweep_id"
+            where.append(f"(id IN (SELECT scenario_id FROM tags WHERE tag = ?) "
+                         f"OR {sweep_column} IN (SELECT sweep_id FROM sweep_tags WHERE tag = ?))")
+            params += [tag, tag]
+        if sweep_id == 0:
+            where.append("sweep_id IS NULL")
+        elif sweep_id is not None:
+            where.append("sweep_id = ?")
+            params.append(int(sweep_id))
+        query = (f"SELECT id, name, sweep_id, created, {', '.join(SCENARIO_COLUMNS)} FROM scenarios "
+                 f"WHERE {' AND '.join(where)} ORDER BY {by} {'ASC' if ascending else 'DESC'} LIMIT ?")
+        with self._connect() as db:
+            table = pd.read_sql_query(query, db, params=[*params, int(n)], index_col="id")
+        table["show_catchup"] = table["show_catchup"].astype(bool)
+        return table
+
+    def load(self, scenario_id):
+        """
+        One saved scenario: {"id", "name", "sweep_id", "created", "inputs", "results", "pro_forma", "tags"}
+        (pro_forma is a DataFrame). Nothing is recomputed, except a sweep scenario's pro forma the first
+        time it's opened.
+        """
+        with self._connect() as db:
+            db.row_factory = sqlite3.Row
+            row = db.execute("SELECT * FROM scenarios WHERE id = ?", [int(scenario_id)]).fetchone()
+            if row is None:
+                raise KeyError(f"No saved scenario {scenario_id}")
+            tags = [tag for (tag,) in db.execute("SELECT tag FROM tags WHERE scenario_id = ? UNION "
+                                                 "SELECT tag FROM sweep_tags WHERE sweep_id = ? ORDER BY tag",
+                                                 [row["id"], row["sweep_id"]])]
+            inputs = {key: _input_value(key, row[key]) for key in INPUT_COLUMNS}
+            if row["pro_forma"] is None:
+                table = pro_forma(**inputs)
+                db.execute("UPDATE scenarios SET pro_forma = ? WHERE id = ?", [_pro_forma_json(table), row["id"]])
+            else:
+                table = pd.read_json(io.StringIO(row["pro_forma"]), orient="split")
+        return {
+            "id": row["id"], "name": row["name"], "sweep_id": row["sweep_id"], "created": row["created"],
+            "inputs": inputs,
+            "results": {key: np.nan if row[key] is None else row[key] for key in RESULT_COLUMNS},  # (NaN is stored as NULL)
+            "pro_forma": table,
+            "tags": tags,
+        }
+
+    def sweeps(self):
+        """Saved sweeps, newest first."""
+        with self._connect() as db:
+            return pd.read_sql_query("SELECT id, name, created, scenarios FROM sweeps ORDER BY id DESC", db, index_col="id")
+
+    def tags(self):
+        """Every tag with how many scenarios carry it."""
+        with self._connect() as db:
+            return dict(db.execute(
+                "SELECT tag, SUM(n) FROM (SELECT tag, COUNT(*) AS n FROM tags GROUP BY tag UNION ALL "
+                "SELECT sweep_tags.tag, SUM(sweeps.scenarios) FROM sweep_tags JOIN sweeps ON sweeps.id = sweep_tags.sweep_id "
+                "GROUP BY sweep_tags.tag) GROUP BY tag ORDER BY tag").fetchall())
+
+    def count(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+
+def _check_columns(columns):
+    # Column names go into the SQL text, so only stored columns are allowed
+    unknown = set(columns) - set(SCENARIO_COLUMNS)
+    if unknown:
+        raise KeyError(f"Unknown scenario columns: {sorted(unknown)}")
+
+
+def _input_value(key, value):
+    # Back to the types the pages keep in st.session_state
+    if key == "show_catchup":
+        return bool(value)
+    if isinstance(DEFAULT_INPUTS[key], int) and float(value).is_integer():
+        return int(value)
+    return value
+
+
+def _pro_forma_json(table):
+    return table.to_json(orient="split", index=False)
+
+
+def _now():
+    return time.strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,186 @@
+"""
+Parallel scenario sweeps over the deal model.
+
+A sweep is either a Cartesian grid ({input name: [values, ...]}) or a table of assumption sets
+(one row per scenario, columns named like DEFAULT_INPUTS). It is split into chunks of scenarios and
+the chunks are evaluated in a pool of worker processes, so every core is used instead of the
+Streamlit script thread. Grid chunks are sent to the workers as (start, stop) positions in the grid
+and expanded there, so even million-scenario grids cost almost nothing to hand out.
+
+run_sweep() is a generator: it yields each chunk's results as soon as that chunk finishes, so the
+page can update its progress bar and table while the rest is still running. Failures don't lose
+completed work:
+  - a chunk that raises is retried (`retries` times), then reported as failed
+  - a chunk that runs longer than `timeout` seconds is reported as timed out; its worker is killed
+    and the pool restarted
+  - if a worker process dies (e.g. out of memory) the pool is restarted and the chunks that were in it
+    are rerun one at a time, so only the chunk that actually crashes the worker is retried / reported
+"""
+import math
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from deal_model import DEFAULT_INPUTS, evaluate_deals
+
+
+def grid_size(grid):
+    """Number of scenarios in a Cartesian grid."""
+    return math.prod(len(values) for values in grid.values())
+
+
+def expand_grid(grid, start=0, stop=None):
+    """Scenarios start..stop of a Cartesian grid, as a DataFrame with one column per grid input."""
+    names = list(grid)
+    shape = [len(grid[name]) for name in names]
+    positions = np.arange(start, grid_size(grid) if stop is None else stop)
+    indexes = np.unravel_index(positions, shape) if names else []
+    return pd.DataFrame({name: np.asarray(grid[name])[idx] for name, idx in zip(names, indexes)}, index=positions)
+
+
+def evaluate_chunk(base, scenarios, grid=None, start=0, stop=None):
+    """
+    Evaluate one chunk (runs in a worker process).
+
+    scenarios is a DataFrame of assumption sets, or None to expand grid[start:stop]. Inputs not in
+    the chunk come from base. Returns the chunk's inputs joined with the model results.
+    """
+    if scenarios is None:
+        scenarios = expand_grid(grid, start, stop)
+    inputs = {**base, **{name: scenarios[name].to_numpy() for name in scenarios.columns}}
+    results = evaluate_deals(**inputs)
+    results.index = scenarios.index
+    return scenarios.join(results)
+
+
+class _SpawnContext(multiprocessing.context.SpawnContext):
+    # The "spawn" context, keeping a list of the worker processes it starts
+    def __init__(self):
+        self.processes = []
+
+    def Process(self, *args, **kwargs):
+        process = multiprocessing.context.SpawnProcess(*args, **kwargs)
+        self.processes.append(process)
+        return process
+
+
+def _new_pool(workers):
+    """A process pool and the list of its worker processes."""
+    # "spawn" starts clean worker processes (forking a running Streamlit server copies its threads):
+    context = _SpawnContext()
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context), context.processes
+
+
+def _kill_pool(pool, processes):
+    # ProcessPoolExecutor can't cancel a call that's already running, so stop its workers directly:
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_sweep(grid=None, scenarios=None, base=None, chunk_size=20_000, workers=None, timeout=300, retries=1):
+    """
+    Run a sweep in parallel, yielding one update per finished chunk.
+
+    grid: {input name: [values, ...]} for a Cartesian grid, or
+    scenarios: a DataFrame of assumption sets (one row per scenario)
+    base: values for the inputs that aren't swept (defaults to DEFAULT_INPUTS)
+    workers: worker processes (defaults to every core)
+
+    Each update is a dict with "start", "stop" (the chunk's scenario positions), "results" (a DataFrame,
+    or None if the chunk failed), "error" (None, or why the chunk failed), "done" and "total" (scenarios
+    finished so far, including failed ones, and in the whole sweep).
+    """
+    if (grid is None) == (scenarios is None):
+        raise ValueError("Pass either a grid or a table of scenarios.")
+    base = {**DEFAULT_INPUTS, **(base or {})}
+    swept = list(grid) if grid is not None else list(scenarios.columns)
+    unknown = set(swept) - set(DEFAULT_INPUTS)
+    if unknown:
+        raise KeyError(f"Unknown deal inputs: {sorted(unknown)}")
+    base = {name: value for name, value in base.items() if name not in swept}
+    if scenarios is not None:
+        scenarios = scenarios.reset_index(drop=True)
+
+    total = grid_size(grid) if grid is not None else len(scenarios)
+    workers = workers or os.cpu_count() or 1
+    pending = deque((start, min(start + chunk_size, total), 0) for start in range(0, total, chunk_size))
+    suspects = deque()  # chunks that were running when a worker died, rerun one at a time
+    running = {}  # future -> (start, stop, attempt, time it started running or None, running alone?)
+    done = 0
+
+    def submit(pool, start, stop, attempt, alone=False):
+        if grid is not None:
+            future = pool.submit(evaluate_chunk, base, None, grid, start, stop)
+        else:
+            future = pool.submit(evaluate_chunk, base, scenarios.iloc[start:stop])
+        running[future] = (start, stop, attempt, None, alone)
+
+    pool, processes = _new_pool(workers)
+    try:
+        while pending or suspects or running:
+            if suspects:
+                if not running:
+                    submit(pool, *suspects.popleft(), alone=True)
+            else:
+                # Keep every worker busy (plus one queued chunk each):
+                while pending and len(running) < 2 * workers:
+                    submit(pool, *pending.popleft())
+
+            finished, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+            restart = False
+            for future in finished:
+                start, stop, attempt, _, alone = running.pop(future)
+                try:
+                    results = future.result()
+                except BrokenProcessPool:
+                    # A worker died and took every unfinished chunk in the pool with it. Only a chunk that
+                    # was running alone is known to be the cause:
+                    restart = True
+                    if not alone:
+                        suspects.append((start, stop, attempt))
+                        continue
+                    if attempt < retries:
+                        suspects.append((start, stop, attempt + 1))
+                        continue
+                    error = "worker process crashed"
+                except Exception as exc:
+                    if attempt < retries:
+                        pending.append((start, stop, attempt + 1))
+                        continue
+                    error = f"{type(exc).__name__}: {exc}"
+                else:
+                    done += stop - start
+                    yield {"start": start, "stop": stop, "results": results, "error": None, "done": done, "total": total}
+                    continue
+                done += stop - start
+                yield {"start": start, "stop": stop, "results": None, "error": error, "done": done, "total": total}
+
+            # Time each chunk from when a worker picked it up:
+            now = time.monotonic()
+            for future, (start, stop, attempt, started, alone) in list(running.items()):
+                if started is None and future.running():
+                    running[future] = (start, stop, attempt, now, alone)
+                elif started is not None and now - started > timeout and not future.done():
+                    del running[future]
+                    restart = True
+                    done += stop - start
+                    yield {"start": start, "stop": stop, "results": None,
+                           "error": f"timed out after {timeout:g} s", "done": done, "total": total}
+
+            if restart:
+                # Everything else still in the old pool goes back to the front of the queue:
+                for start, stop, attempt, _, _ in running.values():
+                    pending.appendleft((start, stop, attempt))
+                running.clear()
+                _kill_pool(pool, processes)
+                pool, processes = _new_pool(workers)
+    finally:
+        _kill_pool(pool, processes)
@@ -0,0 +1,72 @@
+"""
+Fast rendering for wide financial tables (e.g. a 360-month pro forma).
+
+A pandas Styler builds HTML/CSS cell by cell, which gets slow once a table has hundreds of columns.
+This path instead:
+  - formats every number at once with numpy string operations (format_dollars)
+  - marks each row's style with a label prefix and sets widths / help through st.column_config,
+    instead of per-cell CSS
+  - only formats and sends one window (page) of columns to the browser, so the cost stays about
+    the same however long the hold is
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def format_dollars(values, decimals=0):
+    """Format an array of numbers as "$1,234" / "-$1,234" strings, without a Python loop over the cells."""
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    scaled = np.rint(np.abs(np.where(finite, values, 0)) * 10 ** decimals).astype(np.int64)
+    whole, fraction = np.divmod(scaled, 10 ** decimals)
+
+    # Peel off thousands groups from the right, one pass per group (a handful even for billions):
+    tail = np.zeros(values.shape, dtype="U1")
+    while np.any(whole >= 1000):
+        grouped = whole >= 1000
+        tail = np.where(grouped, np.char.add(np.char.add(",", np.char.mod("%03d", whole % 1000)), tail), tail)
+        whole = np.where(grouped, whole // 1000, whole)
+    text = np.char.add(np.char.mod("%d", whole), tail)
+    if decimals:
+        text = np.char.add(np.char.add(text, "."), np.char.zfill(np.char.mod("%d", fraction), decimals))
+
+    text = np.char.add(np.where((values < 0) & (scaled > 0), "-$", "$"), text)
+    return np.where(finite, text, "-")
+
+
+def column_window(n_columns, page_size, key, label="Periods"):
+    """Pick which slice of a wide table's columns to show (pagination widgets); returns a slice."""
+    pages = math.ceil(n_columns / page_size)
+    if pages <= 1:
+        return slice(0, n_columns)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key)
+    start = (min(page, pages) - 1) * page_size
+    stop = min(start + page_size, n_columns)
+    st.caption(f"Showing {label.lower()} {start + 1}–{stop} of {n_columns}")
+    return slice(start, stop)
+
+
+def show_wide_table(frame, row_markers=None, page_size=24, key="wide_table", label="Periods"):
+    """
+    Show a numeric table (rows = line items, columns = periods) as pre-formatted dollar strings.
+
+    row_markers maps a row label to a prefix shown before it (e.g. "🔴 " for costs), standing in for
+    per-row colors. Only page_size columns are formatted and sent at a time.
+    """
+    window = column_window(frame.shape[1], page_size, key, label)
+    shown = frame.iloc[:, window]
+    row_markers = row_markers or {}
+    formatted = pd.DataFrame(
+        format_dollars(shown.to_numpy()),
+        index=[f"{row_markers.get(name, '')}{name}" for name in shown.index],
+        columns=[str(c) for c in shown.columns],
+    )
+    formatted.index.name = frame.index.name
+    st.dataframe(
+        formatted,
+        use_container_width=True,
+        column_config={c: st.column_config.TextColumn(c, width="small") for c in formatted.columns},
+    )
@@ -0,0 +1,253 @@
+"""
+Period-by-period equity waterfall engine.
+
+Every period, the waterfall tracks two LP/GP balances:
+  - unreturned capital: equity contributed and not yet paid back
+  - accrued pref: preferred return earned on (unreturned capital + unpaid pref), compounding each period
+
+and distributes that period's cash through the tiers:
+  1. Return of capital (pro rata to LP and GP co-invest)
+  2. Preferred return (pro rata)
+  3. GP catch-up (optional): 100% to the GP until it holds promote_pct of all profits paid so far
+  4. Residual split: promote_pct to the GP as promote, the rest pro rata
+
+All inputs are numpy arrays shaped (..., periods), so a 360-month hold across thousands of
+scenarios is one call. The balance recursions are solved with cumulative sums instead of a Python
+loop over periods: a balance that is topped up and paid down but never goes negative follows
+B_t = S_t - min(0, min_k<=t S_k), where S is the running sum of (top-ups - payments), so each tier
+is a handful of cumsum / minimum.accumulate calls.
+
+Styles:
+  - "american" (deal-by-deal): each deal on the deal axis (-2) runs its own waterfall and the
+    results are summed, so the GP can earn promote on one deal while another is under water.
+  - "european" (whole-fund): the deals' cash flows are pooled first, so the GP only earns promote
+    after the whole fund has returned capital and pref.
+For a single deal (2-D input) both styles give the same answer.
+"""
+import numpy as np
+
+
+def period_rate(annual_rate, periods_per_year):
+    """Convert an annual rate into the equivalent compounding rate per period."""
+    return (1 + annual_rate) ** (1 / periods_per_year) - 1
+
+
+def _reflected(steps, axis=-1):
+    """Running balance of `steps` that is floored at zero: b_t = max(0, b_{t-1} + steps_t)."""
+    running = np.cumsum(steps, axis=axis)
+    return running - np.minimum(np.minimum.accumulate(running, axis=axis), 0)
+
+
+def _previous(balance):
+    """Balance at the end of the previous period (zero before the first period)."""
+    prev = np.zeros_like(balance)
+    prev[..., 1:] = balance[..., :-1]
+    return prev
+
+
+def hurdle_payments(contributions, distributions, rate):
+    """
+    Pay `distributions` toward a balance that grows by `contributions` and compounds at `rate` per period.
+
+    Returns (payments, balance): the amount of each period's cash absorbed by the balance, and the
+    balance left after each period's payment.
+    """
+    periods = contributions.shape[-1]
+    growth = (1 + rate) ** np.arange(periods)
+    # In today's dollars the compounding balance is a plain floored running sum:
+    discounted = _reflected((contributions - distributions) / growth)
+    balance = discounted * growth
+    before_payment = _previous(balance) * (1 + rate) + contributions
+    return before_payment - balance, balance
+
+
+def run_waterfall(contributions, distributions, pref_rate, promote_pct, lp_pct,
+                  periods_per_year=1, catchup=False, style="american"):
+    """
+    Run the waterfall over every period (and every scenario / deal in the leading axes).
+
+    contributions: equity invested each period (positive numbers), shape (..., periods)
+    distributions: cash available to equity each period, same shape. Negative values are
+        treated as additional capital calls.
+    pref_rate: annual preferred return (e.g. 0.08), compounded each period
+    promote_pct: GP share of the residual split (e.g. 0.20)
+    lp_pct: LP share of the equity (the GP co-invests the rest)
+    pref_rate, promote_pct and lp_pct can also be arrays shaped (..., 1), one value per scenario.
+
+    Returns a dict of arrays shaped like the (pooled, for "european") inputs:
+        "lp_roc", "gp_roc", "lp_pref", "gp_pref", "gp_catchup", "lp_residual", "gp_residual",
+        "gp_promote", "lp_total", "gp_total", "lp_cf", "gp_cf",
+        "unreturned_capital", "accrued_pref"
+    where lp_cf / gp_cf are each partner's net cash flow (distributions - contributions), ready for IRR.
+    """
+    contributions = np.asarray(contributions, dtype=float)
+    distributions = np.asarray(distributions, dtype=float)
+    contributions, distributions = np.broadcast_arrays(contributions, distributions)
+
+    if style == "european" and contributions.ndim >= 3:
+        contributions = contributions.sum(axis=-2)
+        distributions = distributions.sum(axis=-2)
+    elif style not in ("american", "european"):
+        raise ValueError(f"Unknown waterfall style: {style!r}")
+
+    # Operating shortfalls are funded by the partners like any other contribution:
+    contributions = contributions + np.maximum(-distributions, 0)
+    cash = np.maximum(distributions, 0)
+    rate = period_rate(pref_rate, periods_per_year)
+
+    # Tiers 1 + 2: capital and compounding pref, as one hurdle balance:
+    hurdle_paid, hurdle_balance = hurdle_payments(contributions, cash, rate)
+
+    # Capital is repaid first out of the hurdle payments (no compounding on this balance):
+    capital = _reflected(contributions - hurdle_paid)
+    roc = _previous(capital) + contributions - capital
+    pref = hurdle_paid - roc
+    residual = cash - hurdle_paid
+
+    # Tier 3: catch-up fills the GP up to promote_pct of profits (pref + catch-up) paid so far:
+    if catchup:
+        # (a 100% promote already gives the GP all the residual, so there's nothing to catch up):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            target = np.where(promote_pct < 1, promote_pct / (1 - promote_pct) * np.cumsum(pref, axis=-1), 0)
+        cum_residual = np.cumsum(residual, axis=-1)
+        cum_catchup = cum_residual + np.minimum(np.minimum.accumulate(target - cum_residual, axis=-1), 0)
+        gp_catchup = np.diff(cum_catchup, axis=-1, prepend=0)
+    else:
+        gp_catchup = np.zeros_like(cash)
+
+    # Tier 4: residual split:
+    split = residual - gp_catchup
+    gp_promote = split * promote_pct
+    pro_rata = split - gp_promote
+    gp_pct = 1 - lp_pct
+
+    results = {
+        "lp_roc": roc * lp_pct,
+        "gp_roc": roc * gp_pct,
+        "lp_pref": pref * lp_pct,
+        "gp_pref": pref * gp_pct,
+        "gp_catchup": gp_catchup,
+        "lp_residual": pro_rata * lp_pct,
+        "gp_residual": pro_rata * gp_pct + gp_promote,
+        "gp_promote": gp_promote,
+        "unreturned_capital": capital,
+        "accrued_pref": hurdle_balance - capital,
+    }
+    results["lp_total"] = results["lp_roc"] + results["lp_pref"] + results["lp_residual"]
+    results["gp_total"] = results["gp_roc"] + results["gp_pref"] + gp_catchup + results["gp_residual"]
+    results["lp_cf"] = results["lp_total"] - contributions * lp_pct
+    results["gp_cf"] = results["gp_total"] - contributions * gp_pct
+
+    if style == "american" and contributions.ndim >= 3:
+        results = {name: values.sum(axis=-2) for name, values in results.items()}
+    return results
+
+
+def run_hurdle_waterfall(contributions, distributions, tiers, lp_pct, periods_per_year=1, style="american"):
+    """
+    Multi-hurdle waterfall where the GP's promote steps up as the LP's IRR clears each hurdle.
+
+    tiers: [(hurdle_irr, promote_pct), ...] in ascending hurdle order, e.g.
+        [(0.08, 0.20), (0.12, 0.30), (0.15, 0.40)] = 20% promote once the LP has earned an 8% IRR,
+        30% above 12% and 40% above 15%. Below the first hurdle all cash is shared pro rata.
+
+    For each hurdle the LP's shortfall is tracked as a balance compounding at the hurdle rate
+    (LP contributions minus LP distributions, i.e. minus the future value of the LP's cash flows at
+    that rate). The cash needed to bring the LP's IRR exactly to a hurdle is that shortfall divided by
+    the LP's share of cash in the tier, so no IRR root-finding is needed. The loop runs over periods
+    and hurdles only; every scenario / deal in the leading axes is processed at once.
+
+    Returns a dict with:
+        "tier_cash": cash distributed in each tier, shape (..., periods, len(tiers) + 1)
+        "lp_tiers" / "gp_tiers": the LP / GP part of each tier (same shape)
+        "lp_total", "gp_total", "lp_cf", "gp_cf": per-period totals and net cash flows (..., periods)
+        "shortfall": LP shortfall vs each hurdle after the last period, shape (..., len(tiers))
+    """
+    contributions = np.asarray(contributions, dtype=float)
+    distributions = np.asarray(distributions, dtype=float)
+    contributions, distributions = np.broadcast_arrays(contributions, distributions)
+
+    if style == "european" and contributions.ndim >= 3:
+        contributions = contributions.sum(axis=-2)
+        distributions = distributions.sum(axis=-2)
+    elif style not in ("american", "european"):
+        raise ValueError(f"Unknown waterfall style: {style!r}")
+
+    hurdles = np.array([hurdle for hurdle, _ in tiers], dtype=float)
+    promotes = np.array([0.0] + [promote for _, promote in tiers])
+    if np.any(np.diff(hurdles) <= 0):
+        raise ValueError("Hurdles must be in ascending order.")
+
+    contributions = contributions + np.maximum(-distributions, 0)
+    cash = np.maximum(distributions, 0)
+    lp_contributions = contributions * lp_pct
+    growth = 1 + period_rate(hurdles, periods_per_year)
+    lp_share = lp_pct * (1 - promotes)  # LP's share of each dollar in each tier
+
+    lead_shape = cash.shape[:-1]
+    periods = cash.shape[-1]
+    shortfall = np.zeros(lead_shape + (len(hurdles),))
+    tier_cash = np.zeros(lead_shape + (periods, len(promotes)))
+
+    for t in range(periods):
+        shortfall = shortfall * growth + lp_contributions[..., t, None]
+        remaining = cash[..., t].copy()
+        lp_paid = np.zeros(lead_shape)
+        for k in range(len(hurdles)):
+            # Cash that brings the LP exactly to hurdle k (after what lower tiers already paid this period):
+            needed = np.maximum(shortfall[..., k] - lp_paid, 0) / lp_share[k] if lp_share[k] > 0 else 0
+            used = np.minimum(remaining, needed)
+            tier_cash[..., t, k] = used
+            lp_paid += used * lp_share[k]
+            remaining -= used
+        tier_cash[..., t, -1] = remaining
+        lp_paid += remaining * lp_share[-1]
+        shortfall -= lp_paid[..., None]
+
+    results = {
+        "tier_cash": tier_cash,
+        "lp_tiers": tier_cash * lp_share,
+        "gp_tiers": tier_cash * (1 - lp_share),
+    }
+    results["lp_total"] = results["lp_tiers"].sum(axis=-1)
+    results["gp_total"] = results["gp_tiers"].sum(axis=-1)
+    results["lp_cf"] = results["lp_total"] - lp_contributions
+    results["gp_cf"] = results["gp_total"] - contributions * (1 - lp_pct)
+    results["shortfall"] = shortfall
+
+    if style == "american" and contributions.ndim >= 3:
+        # Sum the deals; per-deal shortfalls are kept as they are:
+        for name in ("tier_cash", "lp_tiers", "gp_tiers"):
+            results[name] = results[name].sum(axis=-3)
+        for name in ("lp_total", "gp_total", "lp_cf", "gp_cf"):
+            results[name] = results[name].sum(axis=-2)
+    return results
+
+
+def irr(cash_flows, periods_per_year=1, low=-0.99, high=10.0, iterations=60):
+    """
+    Annualized IRR of each cash-flow series along the last axis, solved for all series at once.
+
+    Bisects the per-period rate between the per-period equivalents of the annual rates low and high,
+    so it is robust for any series with one sign change. Series whose NPV doesn't change sign in that
+    range return NaN.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    t = np.arange(cash_flows.shape[-1])
+
+    def npv(rate):
+        return np.sum(cash_flows * (1 + rate[..., None]) ** -t, axis=-1)
+
+    lo = np.full(cash_flows.shape[:-1], period_rate(low, periods_per_year))
+    hi = np.full(cash_flows.shape[:-1], period_rate(high, periods_per_year))
+    npv_lo = npv(lo)
+    valid = np.sign(npv_lo) != np.sign(npv(hi))
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        npv_mid = npv(mid)
+        same_side = np.sign(npv_mid) == np.sign(npv_lo)
+        lo = np.where(same_side, mid, lo)
+        npv_lo = np.where(same_side, npv_mid, npv_lo)
+        hi = np.where(same_side, hi, mid)
+    rate = np.where(valid, (lo + hi) / 2, np.nan)
+    return (1 + rate) ** periods_per_year - 1
@@ -0,0 +1,126 @@
+"""
+Precomputed group summaries for The Penguin App.
+
+GroupSummary keeps mergeable statistics for every (island, species) group:
+  - count, sum and sum of squares of a value column (for count / mean / std)
+  - a fixed-width histogram sketch of that column (for approximate medians and quantiles)
+
+All of these can be added together, so:
+  - per-island or per-species tables are just roll-ups of the (island, species) table, and
+  - when rows are appended to the CSV, only the new rows are read and their statistics are
+    added on top of the existing ones, instead of re-running a groupby over the whole file.
+"""
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class GroupSummary:
+    def __init__(self, path, group_cols=("island", "species"), value_col="body_mass_g", bin_width=25.0):
+        self.path = str(path)
+        self.group_cols = list(group_cols)
+        self.value_col = value_col
+        self.bin_width = bin_width
+        self._lock = threading.Lock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self.header = None
+        self.offset = 0        # bytes of the file already folded into the statistics
+        self.mtime_ns = None
+        self.rows = 0
+        self.stats = pd.DataFrame(columns=["rows", "count", "sum", "sumsq"], dtype="float64")
+        self.sketch = pd.Series(dtype="float64")  # indexed by (*group_cols, bin)
+
+    def refresh(self):
+        """Fold any rows appended since the last refresh into the statistics. Returns the number of new rows."""
+        with self._lock:
+            stat = os.stat(self.path)
+            if stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.offset:
+                return 0
+            if stat.st_size < self.offset:
+                # The file was truncated or rewritten, so appended-rows logic no longer applies:
+                self._reset()
+
+            with open(self.path, "rb") as f:
+                if self.header is None:
+                    self.header = f.readline()
+                    self.offset = f.tell()
+                f.seek(self.offset)
+                new_bytes = f.read(stat.st_size - self.offset)
+
+            # Only consume complete lines; a partially written last row is picked up next time:
+            end = new_bytes.rfind(b"\n") + 1
+            new_bytes = new_bytes[:end]
+            self.mtime_ns = stat.st_mtime_ns
+            if not new_bytes.strip():
+                self.offset += end
+                return 0
+
+            new_rows = pd.read_csv(io.BytesIO(self.header + new_bytes))
+            self._merge(new_rows)
+            self.offset += end
+            self.rows += len(new_rows)
+            return len(new_rows)
+
+    def _merge(self, df):
+        values = pd.to_numeric(df[self.value_col], errors="coerce")
+        keys = [df[col] for col in self.group_cols]
+        grouped = values.groupby(keys, dropna=False)
+        new_stats = pd.DataFrame({
+            "rows": grouped.size(),
+            "count": grouped.count(),
+            "sum": grouped.sum(),
+            "sumsq": (values ** 2).groupby(keys, dropna=False).sum(),
+        }).astype("float64")
+
+        bins = np.floor(values / self.bin_width)
+        valid = bins.notna()
+        new_sketch = (
+            bins[valid].groupby([key[valid] for key in keys] + [bins[valid].rename("bin")]).size().astype("float64")
+        )
+
+        self.stats = new_stats if self.stats.empty else self.stats.add(new_stats, fill_value=0)
+        self.sketch = new_sketch if self.sketch.empty else self.sketch.add(new_sketch, fill_value=0)
+
+    def table(self, by=None, quantiles=(0.5,)):
+        """
+        Return a summary table grouped by any subset of the group columns (default: all of them).
+
+        Columns: rows, count (non-missing values), mean, std, and one approximate column per quantile.
+        """
+        by = list(by or self.group_cols)
+        with self._lock:
+            stats = self.stats.groupby(level=by, dropna=False).sum()
+            sketch = self.sketch.groupby(level=by + ["bin"], dropna=False).sum()
+
+        n = stats["count"]
+        out = pd.DataFrame({"rows": stats["rows"].astype(int), "count": n.astype(int)})
+        out["mean"] = stats["sum"] / n.where(n > 0)
+        variance = (stats["sumsq"] - stats["sum"] ** 2 / n.where(n > 0)) / (n - 1).where(n > 1)
+        out["std"] = np.sqrt(variance.clip(lower=0))
+
+        for q in quantiles:
+            name = "median" if q == 0.5 else f"p{int(q * 100)}"
+            out[name] = [self._sketch_quantile(sketch, group, q) for group in out.index]
+        return out
+
+    def _sketch_quantile(self, sketch, group, q):
+        try:
+            hist = sketch.loc[group]
+        except KeyError:
+            return np.nan
+        hist = hist.sort_index()
+        cumulative = hist.cumsum().to_numpy()
+        if cumulative.size == 0 or cumulative[-1] == 0:
+            return np.nan
+        target = q * cumulative[-1]
+        i = int(np.searchsorted(cumulative, target))
+        # Interpolate linearly inside the bin that holds the target rank:
+        below = cumulative[i - 1] if i > 0 else 0.0
+        fraction = (target - below) / hist.iloc[i]
+        return (hist.index[i] + fraction) * self.bin_width
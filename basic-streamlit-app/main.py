@@ -1,5 +1,16 @@
+import os
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
+from group_summaries import GroupSummary
+import shared_path  # noqa: F401  (puts ../shared on the import path)
+from rerun_profiler import start_page
+
+DATA_PATH = Path(__file__).parent / "data" / "penguins.csv"
+
+prof = start_page("Penguin App")
+prof.lap("data load")
 
 #Display a title:
 st.title("Welcome to The Penguin App!")
@@ -7,21 +18,79 @@ st.title("Welcome to The Penguin App!")
 #Short description of what the app does:
 st.write("This app allows you to filter data collected from 344 different penguins by island, species, and body mass.")
 
-#Sample DataFrame:
-df = pd.read_csv("https://raw.githubusercontent.com/allisonhorst/palmerpenguins/master/inst/extdata/penguins.csv")
+#Optional backend: run the filters as DuckDB queries against a Parquet copy of the data,
+#so only the matching rows are ever loaded (useful for datasets larger than memory):
+use_duckdb = st.sidebar.toggle("Query with DuckDB (large datasets)", value=False)
+MAX_DISPLAY_ROWS = 10_000
+
+#Sample DataFrame (re-read only when the file changes):
+@st.cache_data
+def load_penguins(path, mtime_ns):
+    return pd.read_csv(path)
+
+@st.cache_resource
+def load_table(path, mtime_ns):
+    from duckdb_backend import ParquetTable, csv_to_parquet
+    return ParquetTable(csv_to_parquet(path))
+
+mtime_ns = os.stat(DATA_PATH).st_mtime_ns
+if use_duckdb:
+    table = load_table(DATA_PATH, mtime_ns)
+else:
+    df = load_penguins(DATA_PATH, mtime_ns)
+
+def unique_values(column):
+    return table.distinct(column) if use_duckdb else df[column].unique()
+
+def value_range(column):
+    return table.min_max(column) if use_duckdb else (df[column].min(), df[column].max())
+
+def show_filtered(column, op, value):
+    if use_duckdb:
+        filters = [(column, op, value)]
+        st.dataframe(table.query(filters=filters, limit=MAX_DISPLAY_ROWS))
+        matches = table.count(filters)
+        if matches > MAX_DISPLAY_ROWS:
+            st.caption(f"Showing the first {MAX_DISPLAY_ROWS:,} of {matches:,} matching rows.")
+    elif op == "==":
+        st.dataframe(df[df[column] == value])
+    else:
+        st.dataframe(df[df[column] <= value])
+
+#Group summaries are computed once and shared by every session; new rows appended to the CSV
+#are folded in incrementally on the next rerun:
+@st.cache_resource
+def load_summaries(path):
+    return GroupSummary(path, group_cols=("island", "species"), value_col="body_mass_g")
+
+summaries = load_summaries(DATA_PATH)
+summaries.refresh()
 
 #Interactive filtering options:
-island = st.selectbox("To filter by island, please select an island:", df["island"].unique())
+prof.lap("filters + tables")
+island = st.selectbox("To filter by island, please select an island:", unique_values("island"))
 st.write(f"Penguins in {island}:")
-st.dataframe(df[df["island"] == island])
+show_filtered("island", "==", island)
 
-species = st.selectbox("To filter by species, please select a species:", df["species"].unique())
+species = st.selectbox("To filter by species, please select a species:", unique_values("species"))
 st.write(f"Penguins of the {species} species:")
-st.dataframe(df[df["species"] == species])
+show_filtered("species", "==", species)
 
+min_mass, max_mass = value_range("body_mass_g")
 body_mass_g = st.slider("Choose a maximum body mass:",
-          min_value = df["body_mass_g"].min(),
-          max_value = df["body_mass_g"].max())
+          min_value = min_mass,
+          max_value = max_mass)
 
 st.write(f"Penguins with a body mass under {body_mass_g}:")
-st.dataframe(df[df["body_mass_g"] <= body_mass_g])
+show_filtered("body_mass_g", "<=", body_mass_g)
+
+#Body mass summaries by group:
+prof.lap("group summaries")
+st.subheader("Body Mass Summaries")
+group_by = st.radio("Summarize by:", ["Island", "Species", "Island & Species"], horizontal=True)
+group_cols = {"Island": ["island"], "Species": ["species"], "Island & Species": ["island", "species"]}[group_by]
+st.dataframe(summaries.table(by=group_cols).round(1))
+st.caption("Medians are approximate (25 g histogram bins).")
+
+prof.finish()
+
@@ -0,0 +1,116 @@
+"""
+Check the Week 4 data app's chunked CSV ingestion (IN-CLASS/csv_cache.py) against a plain pd.read_csv.
+
+Writes CSVs whose columns change part-way through the file, where chunked readers go wrong: integer
+columns that get gaps or bigger numbers after the first chunk, a categorical column with values the
+schema sample never saw (and a chunk where it's empty), and a number column that turns into text.
+Each is loaded through the Parquet cache with small chunks and compared value by value with reading
+the whole file at once. Then one big file is timed, with the peak memory of the ingestion (and of
+ingest_csv, which builds the whole table in memory, for comparison).
+
+Usage (from the repository root):
+
+    python benchmarks/check_csv_cache.py --rows 2000000
+"""
+import argparse
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "IN-CLASS"))
+import csv_cache  # noqa: E402
+
+CITIES = ["Chicago", "New York", "Boston", "Austin", "Denver", "Seattle"]
+
+
+def drifting_table(rows, rng):
+    """A table whose later rows don't look like its first ones."""
+    half = rows // 2
+    ids = np.arange(rows)
+    salary = rng.integers(30_000, 200_000, rows).astype(float)
+    salary[half + 3] = np.nan  # (an integer column that gets a gap)
+    big = rng.integers(0, 100, rows)
+    big[-1] = 2 ** 40  # (an integer bigger than anything in the first chunk)
+    city = rng.choice(CITIES[:3], rows).astype(object)
+    city[half:] = rng.choice(CITIES, rows - half)  # (categories the sample never saw)
+    city[half:half + 50] = None
+    code = rng.integers(0, 10, rows).astype(object)
+    code[-2] = "unknown"  # (a number column that turns into text)
+    return pd.DataFrame({"Id": ids, "Salary": salary, "Big": big, "City": city, "Code": code,
+                         "Score": rng.random(rows).round(3)})
+
+
+def check_file(path, chunk_rows):
+    expected = pd.read_csv(path, low_memory=False)
+    schema = csv_cache.infer_schema(path, sample_rows=chunk_rows)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = Path(cache_dir) / "table.parquet"
+        csv_cache.write_parquet_cache(path, schema, cache_path, chunk_rows=chunk_rows)
+        loaded = csv_cache._compact(pd.read_parquet(cache_path), schema)
+    assert list(loaded.columns) == list(expected.columns)
+    assert len(loaded) == len(expected)
+    for col in schema["categorical"]:
+        assert isinstance(loaded[col].dtype, pd.CategoricalDtype), col
+    for col in expected.columns:
+        got, want = loaded[col], expected[col]
+        if isinstance(got.dtype, pd.CategoricalDtype) or got.dtype == object or want.dtype == object:
+            got, want = got.astype(object).where(got.notna()), want.astype(object).where(want.notna())
+            assert (got.astype(str) == want.astype(str)).all(), col
+        else:
+            assert np.allclose(got.to_numpy(float), want.to_numpy(float), equal_nan=True), col
+    return loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows in the file that is timed")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "drifting.csv"
+        for rows, chunk_rows in [(1_000, 100), (10_007, 1_000), (20, 100)]:
+            drifting_table(rows, rng).to_csv(path, index=False)
+            loaded = check_file(path, chunk_rows)
+        print(f"OK: drifting columns load like pd.read_csv ({dict(loaded.dtypes.astype(str))})")
+
+        path.write_text("Name,Age\n")
+        assert check_file(path, 100).empty
+        print("OK: empty file")
+
+        # (written a slice at a time, so making the file doesn't raise the peak memory measured below)
+        big = Path(tmp) / "big.csv"
+        names = np.array([f"Person {i}" for i in range(5_000)])
+        for start in range(0, args.rows, 200_000):
+            rows = min(200_000, args.rows - start)
+            pd.DataFrame({
+                "Name": rng.choice(names, rows),
+                "City": rng.choice(CITIES, rows),
+                "Age": rng.integers(18, 90, rows),
+                "Salary": rng.integers(30_000, 200_000, rows),
+            }).to_csv(big, index=False, mode="a", header=start == 0)
+        size_mb = big.stat().st_size / 1024 / 1024
+        print(f"{args.rows:,} rows ({size_mb:,.0f} MB CSV):")
+        schema = csv_cache.infer_schema(big)
+        # (ru_maxrss is KB on Linux, bytes on macOS, and only goes up, so the chunked ingestion goes first)
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        for name, ingest in [("write_parquet_cache", lambda: csv_cache.write_parquet_cache(big, schema, Path(tmp) / "big.parquet")),
+                             ("ingest_csv (all in memory)", lambda: csv_cache.ingest_csv(big, schema))]:
+            before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.perf_counter()
+            ingest()
+            seconds = time.perf_counter() - start
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            print(f"  {name:<28} {seconds:5.1f} s, peak memory +{(peak - before) / scale:,.0f} MB")
+        loaded = csv_cache._compact(pd.read_parquet(Path(tmp) / "big.parquet"), schema)
+        print(f"  loaded table: {loaded.memory_usage(deep=True).sum() / 1024 / 1024:,.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
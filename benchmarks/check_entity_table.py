@@ -0,0 +1,68 @@
+"""
+Check the NER app's entity table on tables made of many record batches.
+
+A large upload is parsed in pieces and every piece adds one record batch with its own label and
+source dictionaries (NERStreamlitApp/entity_table.py). This builds such tables from random entities
+in a blank spaCy pipeline (no model to download) and checks that the label counts, the entity list
+and both export formats agree with a plain Python count of the same entities.
+
+Usage (from the repository root):
+
+    python benchmarks/check_entity_table.py --docs 50
+"""
+import argparse
+import io
+import json
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import spacy
+from spacy.tokens import Span
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "NERStreamlitApp"))
+from entity_table import display_table, doc_entities, entity_table, export_bytes, label_counts  # noqa: E402
+
+LABELS = ["PERSON", "GPE", "ORG", "DATE", "LOC"]
+WORDS = ["Frodo", "Bilbo", "Shire", "Hobbiton", "Gandalf", "Bag", "End", "party", "ring", "the"]
+
+
+def random_batches(nlp, docs, rng):
+    """One record batch per doc; each doc uses a random subset of LABELS, so the dictionaries differ."""
+    batches, expected = [], Counter()
+    for doc_id in range(docs):
+        doc = nlp(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 30))))
+        labels = rng.sample(LABELS, rng.randint(1, len(LABELS)))
+        ents = [Span(doc, i, i + 1, rng.choice(labels)) for i in range(0, len(doc), 2) if rng.random() < 0.7]
+        doc.ents = ents
+        expected.update(ent.label_ for ent in ents)
+        batches.append(doc_entities(doc, doc_id=doc_id))
+    return batches, expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50, help="record batches per table")
+    parser.add_argument("--trials", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    nlp = spacy.blank("en")
+    rng = random.Random(0)
+    for _ in range(args.trials):
+        batches, expected = random_batches(nlp, args.docs, rng)
+        table = entity_table(batches)
+        counts = dict(zip(*label_counts(table).to_dict("list").values()))
+        assert counts == dict(expected), (counts, expected)
+        assert Counter(display_table(table).column("Label").to_pylist()) == expected
+        parquet = pq.read_table(io.BytesIO(export_bytes(table, "parquet")))
+        assert Counter(parquet.column("label").to_pylist()) == expected
+        jsonl = export_bytes(table, "jsonl").decode("utf-8").splitlines()
+        assert Counter(json.loads(line)["label"] for line in jsonl) == expected
+    print(f"OK: {args.trials} tables of {args.docs} record batches each")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
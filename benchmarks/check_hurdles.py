@@ -0,0 +1,110 @@
+"""
+Check the multi-hurdle waterfall against a brute-force reference, and time it.
+
+The engine (StreamlitAppFinal/waterfall_engine.run_hurdle_waterfall) finds the cash that brings the
+LP's IRR to each hurdle by discounting. The reference here does it the slow, obvious way: for every
+period and every hurdle it bisects on the cash amount, recomputing the LP's IRR with numpy-financial
+each time, until the IRR hits the hurdle. Both must allocate every period's cash to the same tiers.
+
+Usage (from the repository root):
+
+    python benchmarks/check_hurdles.py --deals 200
+    python benchmarks/check_hurdles.py --scenarios 5000 --periods 360
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy_financial as npf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "StreamlitAppFinal"))
+from waterfall_engine import run_hurdle_waterfall  # noqa: E402
+
+TIERS = [(0.08, 0.20), (0.12, 0.30), (0.15, 0.40)]
+
+
+def lp_irr(flows, periods_per_year):
+    """Annualized LP IRR, or -inf while the LP has received nothing back yet."""
+    if not np.any(np.asarray(flows) > 0):
+        return -np.inf
+    rate = npf.irr(flows)
+    return -np.inf if np.isnan(rate) else (1 + rate) ** periods_per_year - 1
+
+
+def brute_force(contributions, distributions, tiers, lp_pct, periods_per_year=1, iterations=80):
+    """Reference allocation of one deal's cash to tiers using IRR root-finding (slow)."""
+    contributions = np.asarray(contributions, dtype=float) + np.maximum(-np.asarray(distributions, dtype=float), 0)
+    cash = np.maximum(np.asarray(distributions, dtype=float), 0)
+    lp_share = [lp_pct * (1 - promote) for promote in [0.0] + [p for _, p in tiers]]
+    lp_flows = []
+    tier_cash = np.zeros((len(cash), len(tiers) + 1))
+
+    for t in range(len(cash)):
+        remaining = cash[t]
+        lp_paid = 0.0
+        for k, (hurdle, _) in enumerate(tiers):
+            def irr_with(amount):
+                return lp_irr(lp_flows + [lp_paid + amount * lp_share[k] - contributions[t] * lp_pct], periods_per_year)
+
+            if irr_with(0.0) >= hurdle:
+                used = 0.0
+            elif irr_with(remaining) <= hurdle:
+                used = remaining
+            else:
+                lo, hi = 0.0, remaining
+                for _ in range(iterations):
+                    mid = (lo + hi) / 2
+                    lo, hi = (mid, hi) if irr_with(mid) < hurdle else (lo, mid)
+                used = (lo + hi) / 2
+            tier_cash[t, k] = used
+            lp_paid += used * lp_share[k]
+            remaining -= used
+        tier_cash[t, -1] = remaining
+        lp_paid += remaining * lp_share[-1]
+        lp_flows.append(lp_paid - contributions[t] * lp_pct)
+    return tier_cash
+
+
+def random_deal(rng, periods):
+    contributions = np.zeros(periods)
+    contributions[0] = 1_000_000
+    distributions = rng.normal(60_000, 40_000, periods)
+    distributions[0] = 0
+    distributions[-1] += rng.uniform(500_000, 2_500_000)
+    return contributions, distributions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deals", type=int, default=100, help="random deals to check against the reference")
+    parser.add_argument("--scenarios", type=int, default=2000, help="scenarios for the timing run")
+    parser.add_argument("--periods", type=int, default=360, help="periods for the timing run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    worst = 0.0
+    for _ in range(args.deals):
+        periods = int(rng.integers(3, 12))
+        contributions, distributions = random_deal(rng, periods)
+        fast = run_hurdle_waterfall(contributions, distributions, TIERS, lp_pct=0.9)["tier_cash"]
+        slow = brute_force(contributions, distributions, TIERS, lp_pct=0.9)
+        worst = max(worst, float(np.max(np.abs(fast - slow))))
+    print(f"Checked {args.deals} deals against the IRR root-finding reference: max tier difference ${worst:,.4f}")
+    ok = worst < 1.0
+
+    contributions = np.zeros((args.scenarios, args.periods))
+    contributions[:, 0] = 1_000_000
+    distributions = rng.normal(6_000, 3_000, (args.scenarios, args.periods))
+    distributions[:, -1] += rng.uniform(500_000, 3_000_000, args.scenarios)
+    start = time.perf_counter()
+    run_hurdle_waterfall(contributions, distributions, TIERS, lp_pct=0.9, periods_per_year=12)
+    elapsed = time.perf_counter() - start
+    print(f"{args.scenarios:,} scenarios x {args.periods} periods x {len(TIERS)} hurdles: {elapsed * 1000:.0f} ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
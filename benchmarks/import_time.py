@@ -0,0 +1,170 @@
+"""
+Cold-start import-time report for the Streamlit apps.
+
+Each app script is executed once in a fresh Python process with `-X importtime`, in Streamlit's
+"bare" mode (no server: widgets return their defaults). This is what a new server process pays
+before first paint after a deploy or autoscale event. For every app the report lists:
+  - total wall time of the cold run
+  - total time spent importing modules
+  - the slowest packages by cumulative import time, including ones imported by other packages
+  - which heavy packages (spaCy, matplotlib, numpy-financial, ...) were imported at all
+
+Results are written to benchmarks/results/. With --baseline, the run fails when an app's total
+import time is more than --threshold times the saved baseline.
+
+Usage (from the repository root):
+
+    python benchmarks/import_time.py --save-baseline
+    python benchmarks/import_time.py --baseline --top 10
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "import_time.json"
+
+APPS = [
+    ("Home", "StreamlitAppFinal", "Home.py"),
+    ("Deal Visualizer", "StreamlitAppFinal", "pages/1_Deal_Visualizer.py"),
+    ("Waterfall Modeling", "StreamlitAppFinal", "pages/2_Waterfall_Modeling.py"),
+    ("Pro Forma", "StreamlitAppFinal", "pages/3_Pro_Forma.py"),
+    ("Scenario Sweep", "StreamlitAppFinal", "pages/4_Scenario_Sweep.py"),
+    ("Vintage Backtest", "StreamlitAppFinal", "pages/5_Vintage_Backtest.py"),
+    ("NER App", "NERStreamlitApp", "app.py"),
+    ("Penguin App", "basic-streamlit-app", "main.py"),
+    ("Week 4 Data (Final)", "IN-CLASS", "Week_4_2_streamlit_data_FINAL.py"),
+]
+
+HEAVY_PACKAGES = ["spacy", "thinc", "matplotlib", "numpy_financial", "pandas", "pyarrow", "duckdb", "scipy"]
+
+# Lines look like: "import time:       512 |       1834 |   pandas.core.frame"
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Runs the script the way `streamlit run` would (script folder on sys.path, relative paths from its folder):
+RUNNER = (
+    "import runpy, sys; "
+    "sys.path.insert(0, {app_dir!r}); "
+    "runpy.run_path({script!r}, run_name='__main__')"
+)
+
+
+def parse_importtime(stderr):
+    """
+    Return ({package: cumulative microseconds}, total self microseconds).
+
+    A package is credited under each top-level import at its shallowest occurrence, so a heavy package
+    pulled in by something else (pyarrow via csv_cache, say) shows up too. Its nested imports aren't
+    added again, but the importing package's time still includes it.
+    """
+    by_package = defaultdict(int)
+    total_self = 0
+    stack = []  # (depth, package, cumulative, children) of imports whose parent hasn't been printed yet
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total_self += int(self_us)
+        # -X importtime prints a module after the modules it imports, indented two spaces per level:
+        depth = (len(indent) - 1) // 2
+        children = []
+        while stack and stack[-1][0] > depth:
+            children.append(stack.pop())
+        stack.append((depth, module.split(".")[0], int(cumulative_us), children[::-1]))
+        if depth == 0:
+            _credit(stack.pop(), by_package, set())
+    return dict(by_package), total_self
+
+
+def _credit(node, by_package, above):
+    # Add node's time to its package unless an import above it already belongs to that package
+    _, package, cumulative_us, children = node
+    outermost = package not in above
+    if outermost:
+        by_package[package] += cumulative_us
+        above.add(package)
+    for child in children:
+        _credit(child, by_package, above)
+    if outermost:
+        above.discard(package)
+
+
+def profile_app(app_dir, script):
+    app_dir = REPO_ROOT / app_dir
+    code = RUNNER.format(app_dir=str(app_dir), script=str(app_dir / script))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=app_dir, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    by_package, total_self_us = parse_importtime(proc.stderr)
+    return {
+        "returncode": proc.returncode,
+        "wall_ms": wall_ms,
+        "import_ms": total_self_us / 1000,
+        "packages_ms": {name: us / 1000 for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])},
+        "heavy_imported": [name for name in HEAVY_PACKAGES if name in by_package],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=8, help="slowest packages to print per app")
+    parser.add_argument("--only", action="append", help="profile only these app names")
+    parser.add_argument("--baseline", action="store_true", help="fail if slower than the saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown factor vs baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, app_dir, script in APPS:
+        if args.only and name not in args.only:
+            continue
+        result = profile_app(app_dir, script)
+        results[name] = result
+        status = "" if result["returncode"] == 0 else f"  (exited with {result['returncode']})"
+        print(f"{name}: cold run {result['wall_ms']:.0f} ms, imports {result['import_ms']:.0f} ms{status}")
+        for package, ms in list(result["packages_ms"].items())[:args.top]:
+            print(f"    {package:<24} {ms:8.1f} ms")
+        print(f"    heavy packages imported: {', '.join(result['heavy_imported']) or 'none'}")
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0], "results": results}
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / f"import_time-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f"Saved {out_path}")
+
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline {BASELINE_PATH}")
+
+    if args.baseline:
+        if not BASELINE_PATH.exists():
+            print("No baseline saved yet; run with --save-baseline first.")
+            return 1
+        baseline = json.loads(BASELINE_PATH.read_text())["results"]
+        regressions = [
+            f"{name}: imports {r['import_ms']:.0f} ms vs baseline {baseline[name]['import_ms']:.0f} ms"
+            for name, r in results.items()
+            if name in baseline and r["import_ms"] > baseline[name]["import_ms"] * args.threshold
+        ]
+        if regressions:
+            print(f"Import-time regressions (> {args.threshold:.2f}x baseline):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No import-time regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+NER throughput benchmark for the NER app's spaCy pipeline.
+
+Inputs are the bundled texts:
+  - IN-CLASS/The Fellowship Of The Ring_Ch1.txt, split into paragraphs (one document each)
+  - the four sample_texts from NERStreamlitApp/app.py (read from the script, not by running it)
+scaled 1x, 10x, 100x, ... by repeating the document set.
+
+Every combination of these settings is run:
+  --components   full (every pipeline component) / ner (only what NER needs, plus the EntityRuler)
+  --patterns     0 or N custom EntityRuler patterns (phrases taken from the text, like app users add)
+  --modes        call (one nlp() per document) / pipe (nlp.pipe batching)
+  --processes    1..N worker processes (nlp.pipe(n_process=...), pipe mode only)
+
+Each configuration runs in a fresh Python process, so peak RSS (the process plus its largest worker)
+is its own. The pipeline is built with the app's own loader (model_registry.load_pipeline). Reported per
+configuration: tokens/sec, documents/sec, per-document latency percentiles (for pipe mode, the time
+between consecutive documents coming out of the pipe) and peak RSS.
+
+Results are written to benchmarks/results/. With --baseline, the run fails when a configuration's
+tokens/sec drops below the saved baseline divided by --threshold.
+
+Usage (from the repository root):
+
+    python benchmarks/ner_throughput.py --scales 1,10 --save-baseline
+    python benchmarks/ner_throughput.py --scales 1,10,100,1000 --processes 1,2,4 --baseline
+    python benchmarks/ner_throughput.py --model blank:en   # tokenizer + ruler only, no model download
+"""
+import argparse
+import ast
+import json
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+from itertools import product
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "ner_throughput.json"
+NER_APP_DIR = REPO_ROOT / "NERStreamlitApp"
+FELLOWSHIP_PATH = REPO_ROOT / "IN-CLASS" / "The Fellowship Of The Ring_Ch1.txt"
+
+PERCENTILES = (50, 90, 99)
+
+
+def sample_texts():
+    """The sample_texts dict from the NER app, read from its source."""
+    tree = ast.parse((NER_APP_DIR / "app.py").read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "sample_texts" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise LookupError("sample_texts not found in NERStreamlitApp/app.py")
+
+
+def base_documents():
+    """Fellowship paragraphs + the app's sample texts (the 1x corpus)."""
+    chapter = FELLOWSHIP_PATH.read_text(encoding="utf-8", errors="replace")
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", chapter) if p.strip()]
+    return paragraphs + list(sample_texts().values())
+
+
+def custom_patterns(documents, n):
+    """n EntityRuler patterns made from the most common capitalized words and word pairs in the text."""
+    counts = Counter()
+    for text in documents:
+        counts.update(re.findall(r"\b[A-Z][a-z]+(?: [A-Z][a-z]+)?\b", text))
+    phrases = [phrase for phrase, _ in counts.most_common(n)]
+    phrases += [f"custom phrase {i}" for i in range(n - len(phrases))]  # (patterns that never match still cost)
+    return [{"label": "CUSTOM", "pattern": phrase, "id": "ruler"} for phrase in phrases]
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[round(pct / 100 * (len(sorted_values) - 1))]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux (bytes on macOS); for children it's the largest one, once it has exited
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own + children
+
+
+def load(model):
+    sys.path.insert(0, str(NER_APP_DIR))
+    from model_registry import load_pipeline
+    if model.startswith("blank:"):
+        import spacy
+        nlp = spacy.blank(model.split(":", 1)[1])
+        nlp.add_pipe("entity_ruler")
+        return nlp
+    return load_pipeline(model)
+
+
+def ner_only_disabled(nlp):
+    """Components that NER (and the EntityRuler) don't need."""
+    keep = {"ner", "entity_ruler"}
+    for name, component in nlp.pipeline:
+        # A shared tok2vec is only needed if NER listens to it:
+        if "ner" in getattr(component, "listening_components", []):
+            keep.add(name)
+    return [name for name in nlp.pipe_names if name not in keep]
+
+
+def run_config(config):
+    """Run one configuration in this process and return its measurements."""
+    start = time.perf_counter()
+    nlp = load(config["model"])
+    load_seconds = time.perf_counter() - start
+
+    documents = base_documents() * config["scale"]
+    patterns = custom_patterns(base_documents(), config["patterns"])
+    if patterns:
+        nlp.get_pipe("entity_ruler").add_patterns(patterns)
+    disabled = ner_only_disabled(nlp) if config["components"] == "ner" else []
+
+    latencies, tokens, entities = [], 0, 0
+    with nlp.select_pipes(disable=disabled):
+        nlp(documents[0])  # warm up (first call builds caches)
+        start = time.perf_counter()
+        last = start
+        if config["mode"] == "call":
+            docs = (nlp(text) for text in documents)
+        else:
+            docs = nlp.pipe(documents, batch_size=config["batch_size"], n_process=config["processes"])
+        for doc in docs:
+            now = time.perf_counter()
+            latencies.append((now - last) * 1000)
+            last = now
+            tokens += len(doc)
+            entities += len(doc.ents)
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        **config,
+        "documents": len(documents),
+        "characters": sum(len(text) for text in documents),
+        "tokens": tokens,
+        "entities": entities,
+        "active_components": [name for name in nlp.pipe_names if name not in disabled],
+        "load_s": load_seconds,
+        "elapsed_s": elapsed,
+        "tokens_per_s": tokens / elapsed,
+        "docs_per_s": len(documents) / elapsed,
+        **{f"latency_p{pct}_ms": percentile(latencies, pct) for pct in PERCENTILES},
+        "latency_max_ms": latencies[-1],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def configurations(args):
+    for scale, components, n_patterns, mode in product(args.scales, args.components, args.patterns, args.modes):
+        for processes in (args.processes if mode == "pipe" else [1]):
+            yield {"model": args.model, "scale": scale, "components": components, "patterns": n_patterns,
+                   "mode": mode, "processes": processes, "batch_size": args.batch_size}
+
+
+def config_name(config):
+    return (f"{config['scale']}x {config['components']} patterns={config['patterns']} "
+            f"{config['mode']} processes={config['processes']}")
+
+
+def compare(current, baseline, threshold):
+    """Return a list of human-readable regressions (empty when everything is within threshold)."""
+    base = {config_name(r): r for r in baseline}
+    regressions = []
+    for result in current:
+        name = config_name(result)
+        if name in base and result["tokens_per_s"] * threshold < base[name]["tokens_per_s"]:
+            regressions.append(f"{name}: {result['tokens_per_s']:,.0f} tokens/s vs baseline "
+                               f"{base[name]['tokens_per_s']:,.0f}")
+    return regressions
+
+
+def int_list(text):
+    return [int(x) for x in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="en_core_web_sm", help="spaCy package name, or blank:<lang>")
+    parser.add_argument("--scales", type=int_list, default=[1, 10], help="corpus sizes, e.g. 1,10,100,1000")
+    parser.add_argument("--components", type=lambda s: s.split(","), default=["full", "ner"])
+    parser.add_argument("--patterns", type=int_list, default=[0, 100], help="numbers of custom ruler patterns")
+    parser.add_argument("--modes", type=lambda s: s.split(","), default=["call", "pipe"])
+    parser.add_argument("--processes", type=int_list, default=[1, 2], help="worker processes for pipe mode")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds allowed per configuration")
+    parser.add_argument("--baseline", action="store_true", help="fail if slower than the saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown factor vs baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)  # internal: run one configuration (JSON)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_config(json.loads(args.worker))))
+        return 0
+
+    results = []
+    for config in configurations(args):
+        print(f"{config_name(config)}...", flush=True)
+        proc = subprocess.run([sys.executable, __file__, "--worker", json.dumps(config)],
+                              capture_output=True, text=True, timeout=args.timeout)
+        if proc.returncode != 0:
+            print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed")
+            return 1
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"  {result['tokens_per_s']:>10,.0f} tokens/s   p50 {result['latency_p50_ms']:7.2f} ms   "
+              f"p99 {result['latency_p99_ms']:7.2f} ms   peak RSS {result['peak_rss_mb']:7.0f} MB", flush=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / f"ner_throughput-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f"Saved {out_path}")
+
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline {BASELINE_PATH}")
+
+    if args.baseline:
+        if not BASELINE_PATH.exists():
+            print("No baseline saved yet; run with --save-baseline first.")
+            return 1
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text())["results"], args.threshold)
+        if regressions:
+            print(f"Throughput regressions (> {args.threshold:.2f}x slower than baseline):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No throughput regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
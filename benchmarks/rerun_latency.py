@@ -0,0 +1,276 @@
+"""
+Headless rerun-latency benchmark for every Streamlit page in the portfolio.
+
+Each page is run through Streamlit's AppTest harness (no browser, no server). For every page we
+measure:
+  - cold start: a fresh AppTest's first run with Streamlit's caches cleared
+  - warm reruns: realistic widget interactions (changing the exit cap, toggling catch-up,
+    adding a custom entity rule, moving the body mass slider, ...) applied to a running app
+
+Results are written to benchmarks/results/ as JSON. With --baseline, the run fails (exit code 1)
+when any p50 or p90 latency is more than --threshold times slower than the saved baseline.
+
+Usage (from the repository root):
+
+    python benchmarks/rerun_latency.py --save-baseline       # record benchmarks/baselines/rerun_latency.json
+    python benchmarks/rerun_latency.py --baseline            # compare against it
+    python benchmarks/rerun_latency.py --only "Deal Visualizer" --repeats 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "rerun_latency.json"
+
+# Deal inputs normally produced by the Deal Visualizer and Waterfall pages:
+DEAL_STATE = {
+    "purchase_price": 1000000,
+    "units": 10,
+    "current_rent": 1000,
+    "renovated_rent": 1200,
+    "renovation_cost_per_unit": 10000,
+    "occupancy_pre": 90,
+    "occupancy_post": 95,
+    "expense_ratio": 40,
+    "expense_ratio_decimal": 0.40,
+    "hold_period": 5,
+    "stabilized_year": 2,
+    "total_project_cost": 1100000,
+    "value_after_renovation": 1641600.0,
+    "noi_renovated": 82080.0,
+    "interest_rate": 5.0,
+    "debt_ratio": 0.6,
+    "debt": 660000.0,
+}
+
+
+def _widget(elements, label, index=0):
+    matches = [w for w in elements if w.label == label]
+    if len(matches) <= index:
+        raise LookupError(f"No widget labelled {label!r}")
+    return matches[index]
+
+
+# --- Interactions: each takes a running AppTest and the repeat number, and changes one widget ---
+
+def change_exit_cap(at, i):
+    _widget(at.number_input, "Exit Cap Rate (%)").set_value(5.0 + (i % 10) / 10)
+
+
+def change_units(at, i):
+    _widget(at.number_input, "Number of Units").set_value(10 + i % 5)
+
+
+def toggle_catchup(at, i):
+    _widget(at.checkbox, "Enable GP Catch-Up Tier?").set_value(i % 2 == 0)
+
+
+def move_promote(at, i):
+    _widget(at.slider, "Promote % (GP Share of Upside)").set_value(15 + i % 10)
+
+
+def pick_sample_text(at, i):
+    samples = [o for o in _widget(at.selectbox, "🗂️ Choose a sample (optional):").options if o != "-- Select --"]
+    _widget(at.selectbox, "🗂️ Choose a sample (optional):").set_value(samples[i % len(samples)])
+
+
+def add_custom_rule(at, i):
+    _widget(at.text_input, "Enter the entity label (e.g., 'FOOD')").set_value("FOOD")
+    _widget(at.text_input, "Enter the words or phrases to match (e.g., 'pickles')").set_value(f"pickles {i}")
+    _widget(at.button, "Add Custom Rule").click()
+
+
+def move_mass_slider(at, i):
+    _widget(at.slider, "Choose a maximum body mass:").set_value(3000.0 + 100 * (i % 20))
+
+
+def pick_island(at, i):
+    box = _widget(at.selectbox, "To filter by island, please select an island:")
+    box.set_value(box.options[i % len(box.options)])
+
+
+def pick_city(at, i):
+    box = _widget(at.selectbox, "Select a city", index=1)
+    box.set_value(box.options[i % len(box.options)])
+
+
+def move_salary_slider(at, i):
+    slider = _widget(at.slider, "Choose a maximum salary:")
+    slider.set_value(int(slider.min + (slider.max - slider.min) * (i % 5) / 4))
+
+
+def rerun_only(at, i):
+    pass
+
+
+PAGES = [
+    {"name": "Home", "dir": "StreamlitAppFinal", "script": "Home.py",
+     "interactions": {"rerun": rerun_only}},
+    {"name": "Deal Visualizer", "dir": "StreamlitAppFinal", "script": "pages/1_Deal_Visualizer.py",
+     "interactions": {"change exit cap": change_exit_cap, "change units": change_units}},
+    {"name": "Waterfall Modeling", "dir": "StreamlitAppFinal", "script": "pages/2_Waterfall_Modeling.py",
+     "state": DEAL_STATE,
+     "interactions": {"toggle catch-up": toggle_catchup, "move promote": move_promote}},
+    {"name": "Pro Forma", "dir": "StreamlitAppFinal", "script": "pages/3_Pro_Forma.py",
+     "state": DEAL_STATE,
+     "interactions": {"rerun": rerun_only}},
+    {"name": "Scenario Sweep", "dir": "StreamlitAppFinal", "script": "pages/4_Scenario_Sweep.py",
+     "state": DEAL_STATE,
+     "interactions": {"rerun": rerun_only}},
+    {"name": "Vintage Backtest", "dir": "StreamlitAppFinal", "script": "pages/5_Vintage_Backtest.py",
+     "interactions": {"rerun": rerun_only}},
+    {"name": "NER App", "dir": "NERStreamlitApp", "script": "app.py",
+     "interactions": {"pick sample text": pick_sample_text, "add custom rule": add_custom_rule}},
+    {"name": "Penguin App", "dir": "basic-streamlit-app", "script": "main.py",
+     "interactions": {"move mass slider": move_mass_slider, "pick island": pick_island}},
+    {"name": "Week 4 Data (Final)", "dir": "IN-CLASS", "script": "Week_4_2_streamlit_data_FINAL.py",
+     "interactions": {"pick city": pick_city}},
+    {"name": "Week 4 Data (In-Class)", "dir": "IN-CLASS", "script": "Week_4_2_streamlit_data_IN-CLASS.py",
+     "interactions": {"move salary slider": move_salary_slider}},
+]
+
+
+@contextlib.contextmanager
+def app_dir(path):
+    # The apps use paths relative to their own folder and import helper modules that live there:
+    old_cwd = os.getcwd()
+    sys.path.insert(0, str(path))
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(old_cwd)
+        sys.path.remove(str(path))
+
+
+def new_app(page, timeout):
+    at = AppTest.from_file(str(REPO_ROOT / page["dir"] / page["script"]), default_timeout=timeout)
+    for key, value in page.get("state", {}).items():
+        at.session_state[key] = value
+    return at
+
+
+def run_checked(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception[0].message}")
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[round(p / 100 * (len(ordered) - 1))]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": pct(50),
+        "p90_ms": pct(90),
+        "max_ms": ordered[-1],
+    }
+
+
+def bench_page(page, repeats, cold_repeats, timeout):
+    result = {"cold start": []}
+    with app_dir(REPO_ROOT / page["dir"]):
+        for _ in range(cold_repeats):
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            at = new_app(page, timeout)
+            start = time.perf_counter()
+            run_checked(at)
+            result["cold start"].append((time.perf_counter() - start) * 1000)
+
+        for name, interact in page["interactions"].items():
+            at = new_app(page, timeout)
+            run_checked(at)  # warm up: caches filled, models loaded
+            samples = []
+            for i in range(repeats):
+                interact(at, i)
+                start = time.perf_counter()
+                run_checked(at)
+                samples.append((time.perf_counter() - start) * 1000)
+            result[name] = samples
+    return {name: summarize(samples) for name, samples in result.items()}
+
+
+def compare(current, baseline, threshold):
+    """Return a list of human-readable regressions (empty when everything is within threshold)."""
+    regressions = []
+    for page, interactions in current.items():
+        for name, stats in interactions.items():
+            base = baseline.get(page, {}).get(name)
+            if not base:
+                continue
+            for metric in ("p50_ms", "p90_ms"):
+                if stats[metric] > base[metric] * threshold:
+                    regressions.append(
+                        f"{page} / {name}: {metric} {stats[metric]:.1f} ms vs baseline {base[metric]:.1f} ms"
+                    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=10, help="warm reruns per interaction")
+    parser.add_argument("--cold-repeats", type=int, default=3, help="cold starts per page")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per script run")
+    parser.add_argument("--only", action="append", help="benchmark only these page names")
+    parser.add_argument("--baseline", action="store_true", help="fail if slower than the saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown factor vs baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    pages = [p for p in PAGES if not args.only or p["name"] in args.only]
+    results = {}
+    for page in pages:
+        print(f"Benchmarking {page['name']}...", flush=True)
+        results[page["name"]] = bench_page(page, args.repeats, args.cold_repeats, args.timeout)
+        for name, stats in results[page["name"]].items():
+            print(f"  {name:<22} p50 {stats['p50_ms']:8.1f} ms   p90 {stats['p90_ms']:8.1f} ms")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out_path = RESULTS_DIR / f"rerun_latency-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f"Saved {out_path}")
+
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline {BASELINE_PATH}")
+
+    if args.baseline:
+        if not BASELINE_PATH.exists():
+            print("No baseline saved yet; run with --save-baseline first.")
+            return 1
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text())["results"], args.threshold)
+        if regressions:
+            print(f"Latency regressions (> {args.threshold:.2f}x baseline):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No latency regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
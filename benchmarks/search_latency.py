@@ -0,0 +1,80 @@
+"""
+Times the data apps' search-as-you-type index (IN-CLASS/text_search.py) on a large synthetic table.
+
+Builds a table of made-up names ("first last") and cities with --rows rows, indexes each column once,
+then "types" a set of queries one keystroke at a time and reports the latency per keystroke (every
+prefix of every query is one search), next to a pandas str.contains() scan of the same column for
+comparison.
+
+    python benchmarks/search_latency.py --rows 2000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "IN-CLASS"))
+from text_search import SearchIndex  # noqa: E402
+
+SYLLABLES = ["al", "be", "ca", "dra", "el", "fi", "go", "ha", "is", "jo", "ka", "li", "mar", "no", "ol",
+             "pe", "qui", "ra", "sa", "te", "ul", "vi", "wen", "xa", "yo", "zo", "an", "ber", "chi", "dé"]
+CITIES = ["New York", "Los Angeles", "Chicago", "Houston", "San Francisco", "São Paulo", "New Orleans",
+          "Santa Fe", "Saint Louis", "Salt Lake City", "Zürich", "Montréal"]
+QUERIES = {"Name": ["mar", "marlkate", "zoka", "berchi", "marlika", "elgo dra"],
+           "City": ["san", "york", "chicgo", "montreal", "lake"]}
+
+
+def make_words(rng, count, syllables):
+    parts = rng.integers(0, len(SYLLABLES), size=(count, syllables))
+    return np.array(["".join(SYLLABLES[p] for p in row).capitalize() for row in parts])
+
+
+def make_table(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    first = make_words(rng, 20_000, 3)
+    last = make_words(rng, 50_000, 4)
+    names = pd.Series(first[rng.integers(0, len(first), rows)], dtype=object) + " " + last[rng.integers(0, len(last), rows)]
+    return pd.DataFrame({"Name": names, "City": rng.choice(CITIES, rows)})
+
+
+def time_keystrokes(index, queries):
+    times = []
+    for query in queries:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            matches = index.search(query[:end], limit=20)
+            index.rows(matches["id"], limit=10_000)  # (the rows the app shows)
+            times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = make_table(args.rows)
+    print(f"{args.rows:,} rows generated in {time.perf_counter() - start:.1f} s")
+    for column, queries in QUERIES.items():
+        start = time.perf_counter()
+        index = SearchIndex(df[column])
+        built = time.perf_counter() - start
+        times = time_keystrokes(index, queries)
+        start = time.perf_counter()
+        df[column].str.contains(queries[0], case=False, regex=False)
+        scan = (time.perf_counter() - start) * 1000
+        print(f"{column}: {len(index):,} distinct values, index built in {built:.1f} s; per keystroke "
+              f"p50 {np.percentile(times, 50):.2f} ms, p90 {np.percentile(times, 90):.2f} ms, "
+              f"max {times.max():.2f} ms ({len(times)} keystrokes); str.contains scan {scan:,.0f} ms")
+        for query in queries:
+            top = index.search(query, limit=3)
+            print(f"  {query!r}: " + ", ".join(f"{r.value} ({r.match}, {r.rows:,} rows)" for r in top.itertuples()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
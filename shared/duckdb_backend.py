@@ -0,0 +1,120 @@
+"""
+Optional DuckDB query backend for the data apps.
+
+Instead of loading the whole dataset into pandas and filtering it there, ParquetTable:
+  - converts the CSV to Parquet once per file version (streamed by DuckDB, so it works for files larger than RAM)
+  - runs each selectbox / slider filter as a SQL query against the Parquet file
+  - only reads the columns it is asked for (column pruning) and lets DuckDB skip row groups that
+    cannot match the WHERE clause (predicate pushdown)
+
+Only the rows and columns needed for display ever reach pandas. Used by basic-streamlit-app and
+the IN-CLASS data apps, which find it through their shared_path.py.
+"""
+import os
+import threading
+from pathlib import Path
+
+import duckdb
+
+# Comparison operators a filter is allowed to use:
+OPERATORS = {"==": "=", "!=": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">=", "in": "IN"}
+
+
+def _quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _quote_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def csv_to_parquet(csv_path, cache_dir=None):
+    """Convert a CSV to Parquet (once per mtime/size) and return the Parquet path."""
+    csv_path = Path(csv_path)
+    stat = os.stat(csv_path)
+    cache_dir = Path(cache_dir or csv_path.parent / ".parquet_cache")
+    cache_dir.mkdir(exist_ok=True)
+    parquet_path = cache_dir / f"{csv_path.stem}-{stat.st_mtime_ns}-{stat.st_size}.parquet"
+    if not parquet_path.exists():
+        for old in cache_dir.glob(f"{csv_path.stem}-*.parquet"):
+            old.unlink()
+        tmp_path = parquet_path.with_suffix(".tmp")
+        with duckdb.connect() as con:
+            con.execute(
+                f"COPY (SELECT * FROM read_csv_auto({_quote_literal(csv_path)})) "
+                f"TO {_quote_literal(tmp_path)} (FORMAT PARQUET)"
+            )
+        tmp_path.replace(parquet_path)
+    return parquet_path
+
+
+class ParquetTable:
+    """A Parquet file (or glob of files) queried in-process with DuckDB."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._con = duckdb.connect()
+        self._lock = threading.Lock()
+        self._source = f"read_parquet({_quote_literal(self.path)})"
+
+    def _fetch_df(self, sql, params=()):
+        # A DuckDB connection isn't safe to share between threads, but cursors are:
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, list(params)).df()
+        finally:
+            cursor.close()
+
+    def columns(self):
+        return list(self._fetch_df(f"SELECT * FROM {self._source} LIMIT 0").columns)
+
+    def distinct(self, column):
+        """Distinct non-null values of one column (for selectbox options)."""
+        col = _quote_ident(column)
+        df = self._fetch_df(f"SELECT DISTINCT {col} FROM {self._source} WHERE {col} IS NOT NULL ORDER BY 1")
+        return df[column].tolist()
+
+    def min_max(self, column):
+        """Minimum and maximum of one column (for slider bounds)."""
+        col = _quote_ident(column)
+        row = self._fetch_df(f"SELECT min({col}) AS lo, max({col}) AS hi FROM {self._source}").iloc[0]
+        return row["lo"], row["hi"]
+
+    def _where(self, filters):
+        clauses, params = [], []
+        for column, op, value in filters:
+            if op not in OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {op!r}")
+            if op == "in":
+                values = list(value)
+                if not values:
+                    clauses.append("FALSE")
+                    continue
+                clauses.append(f"{_quote_ident(column)} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+            else:
+                clauses.append(f"{_quote_ident(column)} {OPERATORS[op]} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, columns=None, filters=(), order_by=None, limit=None):
+        """
+        Return a pandas DataFrame with only the requested columns and matching rows.
+
+        filters is a sequence of (column, operator, value) tuples, combined with AND,
+        e.g. [("island", "==", "Biscoe"), ("body_mass_g", "<=", 4000)].
+        """
+        select = ", ".join(_quote_ident(c) for c in columns) if columns else "*"
+        where, params = self._where(filters)
+        sql = f"SELECT {select} FROM {self._source}{where}"
+        if order_by:
+            sql += f" ORDER BY {_quote_ident(order_by)}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._fetch_df(sql, params)
+
+    def count(self, filters=()):
+        """Number of rows matching the filters, without transferring them."""
+        where, params = self._where(filters)
+        return int(self._fetch_df(f"SELECT count(*) AS n FROM {self._source}{where}", params)["n"].iloc[0])
@@ -0,0 +1,183 @@
+"""
+Lightweight per-section profiler for Streamlit reruns.
+
+Usage in a page script:
+
+    from rerun_profiler import start_page
+
+    prof = start_page("Deal Visualizer")
+    prof.lap("inputs")              # times everything until the next lap() ...
+    ...
+    with prof.section("charts"):    # ... or time an explicit block
+        ...
+    prof.finish()                   # records the total rerun and draws the debug panel
+
+For every (page, section) it records wall time, CPU time of the script thread and, when
+allocation tracking is on, the memory allocated inside the section (via tracemalloc). The last
+WINDOW samples are kept so rolling percentiles can be shown in the debug panel, which
+also offers a JSON export.
+
+The panel is shown when the URL contains ?debug=1 or the RERUN_PROFILER environment variable is set.
+Timing is always recorded since it is cheap. Allocation tracking slows down every session in the
+server process, so only whoever runs the server can turn it on, with RERUN_PROFILER_ALLOC=1. Its
+numbers are the net change in the process's traced memory, so they include other sessions
+rerunning at the same time (profile with one session for clean numbers).
+
+Every app uses this one module, from the repository's shared/ folder (see shared_path.py in each app).
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+WINDOW = 200          # samples kept per section for rolling percentiles
+PERCENTILES = (50, 90, 99)
+
+# Shared by every session in this server process (the module is imported once):
+_samples = {}
+_lock = threading.Lock()
+
+
+def _record(page, section, wall, cpu, alloc):
+    with _lock:
+        key = (page, section)
+        if key not in _samples:
+            _samples[key] = deque(maxlen=WINDOW)
+        _samples[key].append((wall, cpu, alloc))
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = round(pct / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def snapshot():
+    """Return rolling statistics for every recorded section as plain dicts (JSON-friendly)."""
+    with _lock:
+        items = [(key, list(samples)) for key, samples in _samples.items()]
+
+    rows = []
+    for (page, section), samples in items:
+        row = {"page": page, "section": section, "samples": len(samples)}
+        for i, metric in enumerate(["wall_ms", "cpu_ms", "alloc_kb"]):
+            values = sorted(s[i] for s in samples if s[i] is not None)
+            for pct in PERCENTILES:
+                row[f"{metric}_p{pct}"] = _percentile(values, pct)
+        rows.append(row)
+    return rows
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+
+
+def alloc_enabled():
+    """Allocation tracking is a server-side switch: it costs every session, not just the one viewing the panel."""
+    return os.environ.get("RERUN_PROFILER_ALLOC") == "1"
+
+
+def panel_enabled():
+    if os.environ.get("RERUN_PROFILER"):
+        return True
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+class PageRun:
+    """Timing handle for one rerun of one page."""
+
+    def __init__(self, page):
+        self.page = page
+        self.show_panel = panel_enabled()
+        self.track_alloc = alloc_enabled()
+        if self.track_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._start = self._now()
+        self._lap = None
+
+    def _now(self):
+        alloc = tracemalloc.get_traced_memory()[0] if self.track_alloc else None
+        return time.perf_counter(), time.thread_time(), alloc
+
+    def _stop(self, section, start):
+        wall, cpu, alloc = self._now()
+        alloc_kb = None if alloc is None or start[2] is None else (alloc - start[2]) / 1024
+        _record(self.page, section, (wall - start[0]) * 1000, (cpu - start[1]) * 1000, alloc_kb)
+
+    @contextmanager
+    def section(self, name):
+        start = self._now()
+        try:
+            yield
+        finally:
+            self._stop(name, start)
+
+    def timed(self, name=None):
+        """Decorator version of section()."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.section(name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def lap(self, name):
+        """End the current lap (if any) and start timing a new one called name."""
+        now = self._now()
+        if self._lap is not None:
+            self._stop(self._lap[0], self._lap[1])
+        self._lap = (name, now)
+
+    def finish(self, draw_panel=True):
+        """
+        Close the open lap, record the whole rerun and draw the debug panel if enabled.
+        Pass draw_panel=False inside an st.fragment (fragments can't write to the sidebar).
+        """
+        if self._lap is not None:
+            self._stop(*self._lap)
+            self._lap = None
+        self._stop("total rerun", self._start)
+        if self.show_panel and draw_panel:
+            render_panel(self.page)
+
+
+def start_page(page):
+    return PageRun(page)
+
+
+def render_panel(page=None):
+    """Sidebar panel with rolling percentiles per section and a JSON export."""
+    import pandas as pd
+
+    rows = snapshot()
+    with st.sidebar.expander("⏱️ Rerun Profiler", expanded=True):
+        show_all = st.checkbox("Show all pages", value=page is None, key="_rerun_profiler_all_pages")
+        visible = [r for r in rows if show_all or r["page"] == page]
+        if not visible:
+            st.write("No samples recorded yet.")
+            return
+        table = pd.DataFrame(visible).set_index(["page", "section"])
+        columns = [c for c in table.columns if c.endswith("_p50") or c.endswith("_p90") or c == "samples"]
+        st.dataframe(table[columns].astype(float).round(1))
+        if not alloc_enabled():
+            st.caption("Memory per section is off; start the server with RERUN_PROFILER_ALLOC=1 to track it.")
+        st.download_button(
+            "⬇️ Export profile (JSON)",
+            data=json.dumps(rows, indent=2),
+            file_name="rerun_profile.json",
+            mime="application/json",
+        )
+        if st.button("Reset samples", key="_rerun_profiler_reset"):
+            reset()